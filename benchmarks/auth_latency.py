@@ -0,0 +1,150 @@
+"""
+Measure event loop latency under concurrent Basic auth traffic.
+
+Every authenticated request verifies the password with PBKDF2. Verifying it
+right in the event loop (as it was before the password hasher) blocks
+all other requests for the time of hashing; thread and process pools
+keep the loop responsive.
+
+A probe task sleeps for a short interval in a loop and records how late
+it wakes up, that's the event loop lag the other requests would see.
+Requests go through the whole app in process, without network.
+
+Usage:
+    python -m benchmarks.auth_latency --requests 200 --concurrency 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TypeVar
+
+from httpx import ASGITransport, AsyncClient
+from picodi import Provide, inject, registry
+
+from benchmarks.utils import Timings
+from picodi_app.api.main import create_app
+from picodi_app.conf import DatabaseSettings, Settings, SqliteDatabaseSettings
+from picodi_app.deps import get_password_hasher, get_settings, get_user_repository
+from picodi_app.user import IUserRepository, User
+from picodi_app.utils import PasswordHasher, hash_password
+from picodi_app.weather import Coordinates
+
+T = TypeVar("T")
+
+EMAIL = "bench@localhost"
+PASSWORD = "12345678"  # noqa: S105
+PROBE_INTERVAL = 0.005
+
+
+class InlinePasswordHasher(PasswordHasher):
+    # Hashes right in the event loop, as it was before the password hasher
+    async def _run(self, fn: Callable[..., T], *args: str) -> T:
+        return fn(*args)
+
+
+@inject
+async def create_user(
+    user_repo: IUserRepository = Provide(get_user_repository),
+) -> None:
+    await user_repo.create_user(
+        User(
+            id="1",
+            email=EMAIL,
+            location=Coordinates(50.45, 30.52),
+            hashed_password=hash_password(PASSWORD),
+        )
+    )
+
+
+async def probe_loop_lag(samples: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append(time.perf_counter() - started_at - PROBE_INTERVAL)
+
+
+async def run_requests(
+    name: str, hasher: PasswordHasher, requests: int, concurrency: int
+) -> None:
+    settings = Settings(
+        database=DatabaseSettings(
+            type="sqlite",
+            settings=SqliteDatabaseSettings(db_name=":memory:", create_db=True),
+        )
+    )
+    with (
+        registry.override(get_settings, lambda: settings),
+        registry.override(get_password_hasher, lambda: hasher),
+    ):
+        await create_user()
+        transport = ASGITransport(app=create_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as api:
+            semaphore = asyncio.Semaphore(concurrency)
+            request_samples = []
+
+            async def whoami() -> None:
+                async with semaphore:
+                    started_at = time.perf_counter()
+                    resp = await api.get("/api/users/whoami", auth=(EMAIL, PASSWORD))
+                    resp.raise_for_status()
+                    request_samples.append(time.perf_counter() - started_at)
+
+            lag_samples: list[float] = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(probe_loop_lag(lag_samples, stop))
+            started_at = time.perf_counter()
+            await asyncio.gather(*[whoami() for _ in range(requests)])
+            elapsed = time.perf_counter() - started_at
+            stop.set()
+            await probe
+
+        await registry.shutdown()
+
+    print(f"{name}: {requests / elapsed:.1f} requests/s")
+    print(Timings(f"  {name}: request", request_samples).report())
+    print(Timings(f"  {name}: event loop lag", lag_samples).report())
+
+
+def create_hashers(workers: int, max_pending: int) -> list[tuple[str, PasswordHasher]]:
+    executors: list[tuple[str, Executor]] = [
+        ("thread pool", ThreadPoolExecutor(max_workers=workers)),
+        ("process pool", ProcessPoolExecutor(max_workers=workers)),
+    ]
+    return [
+        ("inline", InlinePasswordHasher(ThreadPoolExecutor(1), max_pending)),
+        *[
+            (name, PasswordHasher(executor, max_pending))
+            for name, executor in executors
+        ],
+    ]
+
+
+async def run(requests: int, concurrency: int, workers: int) -> None:
+    print(f"Requests: {requests}, concurrency: {concurrency}, workers: {workers}")
+    for name, hasher in create_hashers(workers, max_pending=concurrency):
+        try:
+            await run_requests(name, hasher, requests, concurrency)
+        finally:
+            hasher.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    # Request logs would distort measurements
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.requests, args.concurrency, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Measure 7-day forecast path: parsing Open-Meteo response,
+building API response for per-hour rows and columnar forecast,
+and whole `/api/weather/forecast` request with and without
+fast-path JSON encoding.
+
+Usage:
+    python -m benchmarks.forecast --iterations 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient, MockTransport, Response
+from picodi import registry
+
+from benchmarks.utils import ameasure, measure
+from picodi_app.api.json_encoding import encode_forecast
+from picodi_app.api.main import create_app
+from picodi_app.api.routes.weather import ForecastResp, WeatherResp
+from picodi_app.conf import DatabaseSettings, Settings, SqliteDatabaseSettings
+from picodi_app.data_access.weather import OpenMeteoWeatherClient
+from picodi_app.deps import get_settings, get_weather_client
+from picodi_app.weather import Coordinates, Forecast, IWeatherClient, WeatherData
+
+
+def create_forecast_response(days: int) -> dict[str, Any]:
+    start = datetime(2024, 6, 1)
+    hours = range(24 * days)
+    return {
+        "hourly_units": {"temperature_2m": "°F", "wind_speed_10m": "km/h"},
+        "hourly": {
+            "time": [
+                (start + timedelta(hours=hour)).isoformat(timespec="minutes")
+                for hour in hours
+            ],
+            "temperature_2m": [30 + hour % 60 + 0.3 for hour in hours],
+            "relative_humidity_2m": [20 + hour % 80 for hour in hours],
+            "precipitation_probability": [hour * 7 % 101 for hour in hours],
+            "wind_speed_10m": [hour % 40 + 0.7 for hour in hours],
+            "wind_direction_10m": [hour * 37 % 360 for hour in hours],
+        },
+    }
+
+
+class StaticWeatherClient(IWeatherClient):
+    def __init__(self, forecast: Forecast) -> None:
+        self._forecast = forecast
+
+    async def get_current_weather(
+        self, coords: Coordinates  # noqa: U100
+    ) -> WeatherData:
+        return self._forecast[0][1]
+
+    async def get_forecast(
+        self, coords: Coordinates, days: int  # noqa: U100
+    ) -> Forecast:
+        return self._forecast
+
+
+def build_response_by_rows(forecast: Forecast) -> ForecastResp:
+    # The way response was built before columnar forecast
+    return ForecastResp(
+        time=[time.isoformat() for time, _ in forecast],
+        weather_data=[WeatherResp.from_domain(weather) for _, weather in forecast],
+    )
+
+
+async def measure_parsing(days: int, iterations: int) -> Forecast:
+    resp_data = create_forecast_response(days)
+    transport = MockTransport(lambda _: Response(200, json=resp_data))
+    async with AsyncClient(transport=transport) as http_client:
+        client = OpenMeteoWeatherClient(http_client)
+        coords = Coordinates(50.45, 30.52)
+        print(
+            (
+                await ameasure(
+                    f"parse: get_forecast(days={days})",
+                    lambda: client.get_forecast(coords, days=days),
+                    iterations,
+                )
+            ).report()
+        )
+        return await client.get_forecast(coords, days=days)
+
+
+def measure_encoding(forecast: Forecast, iterations: int) -> None:
+    print(
+        measure(
+            "build response: per-hour rows",
+            lambda: build_response_by_rows(forecast),
+            iterations,
+        ).report()
+    )
+    print(
+        measure(
+            "build response: columns",
+            lambda: ForecastResp.from_domain(forecast),
+            iterations,
+        ).report()
+    )
+    print(
+        measure(
+            "encode: pydantic + JSONResponse",
+            lambda: JSONResponse(
+                ForecastResp.from_domain(forecast).model_dump(mode="json")
+            ),
+            iterations,
+        ).report()
+    )
+    print(
+        measure(
+            "encode: fast path",
+            lambda: encode_forecast(forecast),
+            iterations,
+        ).report()
+    )
+
+
+async def measure_requests(forecast: Forecast, days: int, iterations: int) -> None:
+    settings = Settings(
+        database=DatabaseSettings(
+            type="sqlite", settings=SqliteDatabaseSettings(db_name=":memory:")
+        )
+    )
+    client = StaticWeatherClient(forecast)
+    with (
+        registry.override(get_settings, lambda: settings),
+        registry.override(get_weather_client, lambda: client),
+    ):
+        transport = ASGITransport(app=create_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as api:
+            params = {"latitude": 50.45, "longitude": 30.52, "days": days}
+            # Warm up lazily initialized dependencies and check that request works
+            resp = await api.get("/api/weather/forecast", params=params, auth=("", ""))
+            resp.raise_for_status()
+            for fast_json in (False, True):
+                settings.api.fast_json_responses = fast_json
+                print(
+                    (
+                        await ameasure(
+                            f"request: fast_json_responses={fast_json}",
+                            lambda: api.get(
+                                "/api/weather/forecast", params=params, auth=("", "")
+                            ),
+                            iterations,
+                        )
+                    ).report()
+                )
+
+
+async def run(days: int, iterations: int) -> None:
+    forecast = await measure_parsing(days, iterations)
+    measure_encoding(forecast, iterations)
+    await measure_requests(forecast, days, iterations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    # Request logs would distort measurements
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.days, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
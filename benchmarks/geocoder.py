@@ -0,0 +1,91 @@
+"""
+Compare offline geocoder (memory-mapped gazetteer index)
+with Open-Meteo geocoding API.
+
+Usage:
+    python -m benchmarks.geocoder cities500.txt --remote-iterations 20
+
+Remote part makes real HTTP requests, skip it with `--remote-iterations 0`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+
+from httpx import AsyncClient
+
+from benchmarks.utils import ameasure, measure
+from picodi_app.data_access.gazetteer import (
+    GazetteerIndex,
+    OfflineGeocoderClient,
+    read_geonames,
+    write_index,
+)
+from picodi_app.data_access.weather import OpenMeteoGeocoderClient
+
+QUERIES = ["Kyiv", "London", "Berlin", "New York", "Kraków", "Par", "San", "Lviv"]
+
+
+def build_index(source: str, index_path: str) -> None:
+    with (
+        open(source, encoding="utf-8") as source_file,
+        open(index_path, "wb") as index_file,
+    ):
+        count = write_index(read_geonames(source_file), index_file)
+    print(f"Index: {count} cities, {os.path.getsize(index_path)} bytes")
+
+
+async def run(source: str, iterations: int, remote_iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index_path = os.path.join(tmp_dir, "gazetteer.idx")
+        build_index(source, index_path)
+        index = GazetteerIndex(index_path)
+        queries = itertools.cycle(QUERIES)
+        print(
+            measure(
+                "offline: GazetteerIndex.lookup",
+                lambda: index.lookup(next(queries)),
+                iterations,
+            ).report()
+        )
+        offline_client = OfflineGeocoderClient(index)
+        print(
+            (
+                await ameasure(
+                    "offline: get_coordinates_by_city",
+                    lambda: offline_client.get_coordinates_by_city(next(queries)),
+                    iterations,
+                )
+            ).report()
+        )
+        index.close()
+
+    if remote_iterations:
+        async with AsyncClient(timeout=5) as http_client:
+            remote_client = OpenMeteoGeocoderClient(http_client)
+            print(
+                (
+                    await ameasure(
+                        "open-meteo: get_coordinates_by_city",
+                        lambda: remote_client.get_coordinates_by_city(next(queries)),
+                        remote_iterations,
+                    )
+                ).report()
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("source", help="GeoNames dump file. Example: cities500.txt")
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--remote-iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.source, args.iterations, args.remote_iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Compare cache hit rates of location keying strategies:
+exact coordinates, coordinates rounded to N decimal places
+(as it was before geohash cells) and geohash cells of different precision.
+
+Every request goes through an LRU cache keyed by the strategy, so the hit rate
+is the share of requests that wouldn't call upstream. Distance shows how far
+the point weather is requested for (rounded point or cell centroid)
+is from the requested one.
+
+Recorded coordinates can be passed as a file with `latitude,longitude` lines
+(e.g. extracted from access logs), otherwise a synthetic distribution is used:
+requests clustered around a few cities with GPS-precision coordinates.
+
+Usage:
+    python -m benchmarks.location_keys --requests 100000 --cache-size 4096
+    python -m benchmarks.location_keys --coordinates recorded.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from picodi_app.cache import TTLCache
+from picodi_app.weather import Coordinates
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Iterator
+
+# (latitude, longitude, weight) of synthetic request clusters
+CITIES = [
+    (50.4501, 30.5234, 40),
+    (51.5074, -0.1278, 25),
+    (52.5200, 13.4050, 15),
+    (40.7128, -74.0060, 10),
+    (49.8397, 24.0297, 7),
+    (50.0647, 19.9450, 3),
+]
+# Spread of requests around city center in degrees (roughly 5 km)
+SPREAD = 0.05
+EARTH_RADIUS = 6_371_000
+
+
+@dataclass
+class Result:
+    name: str
+    hits: int = 0
+    requests: int = 0
+    keys: int = 0
+    total_distance: float = 0.0
+    max_distance: float = 0.0
+
+    def report(self) -> str:
+        return (
+            f"{self.name:<24} hit rate={self.hits / self.requests:7.2%}  "
+            f"keys={self.keys:<8} "
+            f"mean distance={self.total_distance / self.requests:7.1f} m  "
+            f"max distance={self.max_distance:7.1f} m"
+        )
+
+
+def synthetic_coordinates(requests: int, seed: int) -> Iterator[Coordinates]:
+    # Benchmark doesn't need cryptographically secure random
+    rng = random.Random(seed)  # noqa: S311
+    weights = [weight for _, _, weight in CITIES]
+    for _ in range(requests):
+        latitude, longitude, _ = rng.choices(CITIES, weights=weights)[0]
+        yield Coordinates(
+            latitude=round(rng.gauss(latitude, SPREAD), 6),
+            longitude=round(rng.gauss(longitude, SPREAD), 6),
+        )
+
+
+def recorded_coordinates(path: str) -> Iterator[Coordinates]:
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield Coordinates.from_string(line.strip())
+
+
+def distance(first: Coordinates, second: Coordinates) -> float:
+    lat1, lon1 = math.radians(first.latitude), math.radians(first.longitude)
+    lat2, lon2 = math.radians(second.latitude), math.radians(second.longitude)
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def rounded(precision: int) -> Callable[[Coordinates], tuple[Hashable, Coordinates]]:
+    def key(coords: Coordinates) -> tuple[Hashable, Coordinates]:
+        point = Coordinates(
+            latitude=round(coords.latitude, precision),
+            longitude=round(coords.longitude, precision),
+        )
+        return point, point
+
+    return key
+
+
+def geohash(precision: int) -> Callable[[Coordinates], tuple[Hashable, Coordinates]]:
+    def key(coords: Coordinates) -> tuple[Hashable, Coordinates]:
+        cell = coords.geohash(precision)
+        return cell, Coordinates.from_geohash(cell)
+
+    return key
+
+
+def exact(coords: Coordinates) -> tuple[Hashable, Coordinates]:
+    return coords, coords
+
+
+STRATEGIES: list[tuple[str, Callable[[Coordinates], tuple[Hashable, Coordinates]]]] = [
+    ("exact", exact),
+    ("rounded, 2 decimals", rounded(2)),
+    ("rounded, 3 decimals", rounded(3)),
+    ("geohash, precision 5", geohash(5)),
+    ("geohash, precision 6", geohash(6)),
+    ("geohash, precision 7", geohash(7)),
+]
+
+
+def run(coordinates: list[Coordinates], cache_size: int) -> None:
+    print(f"Requests: {len(coordinates)}, cache size: {cache_size}")
+    for name, key_fn in STRATEGIES:
+        cache: TTLCache[Hashable, bool] = TTLCache(max_size=cache_size)
+        result = Result(name=name, requests=len(coordinates))
+        keys = set()
+        for coords in coordinates:
+            key, point = key_fn(coords)
+            keys.add(key)
+            point_distance = distance(coords, point)
+            result.total_distance += point_distance
+            result.max_distance = max(result.max_distance, point_distance)
+            try:
+                cache.get(key)
+            except KeyError:
+                cache.set(key, True, ttl=math.inf)
+            else:
+                result.hits += 1
+        result.keys = len(keys)
+        print(result.report())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--coordinates", help="File with recorded `latitude,longitude` lines"
+    )
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.coordinates:
+        coordinates = list(recorded_coordinates(args.coordinates))
+    else:
+        coordinates = list(synthetic_coordinates(args.requests, args.seed))
+    run(coordinates, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
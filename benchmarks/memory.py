@@ -0,0 +1,136 @@
+"""
+Measure memory used by cached 7-day forecasts.
+
+"before" is forecast stored as list of `(datetime, WeatherData)` rows
+with plain (not slotted) dataclasses, as it was before compact
+domain models and columnar `Forecast`.
+
+Usage:
+    python -m benchmarks.memory --forecasts 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from picodi_app.cache import TTLCache
+from picodi_app.weather import (
+    Forecast,
+    Speed,
+    SpeedUnit,
+    Temperature,
+    TemperatureUnit,
+    WeatherData,
+    WindDirection,
+)
+
+HOURS = 24 * 7
+
+
+@dataclass
+class PlainTemperature:
+    value: float
+    unit: TemperatureUnit
+
+
+@dataclass
+class PlainSpeed:
+    value: float
+    unit: SpeedUnit
+
+
+@dataclass
+class PlainWeatherData:
+    temperature: PlainTemperature
+    humidity: float
+    precipitation: bool
+    wind_speed: PlainSpeed
+    wind_direction: WindDirection
+
+
+def _time(hour: int) -> datetime:
+    return datetime(2024, 6, 1) + timedelta(hours=hour)
+
+
+def create_plain_rows(seed: int) -> list[tuple[datetime, PlainWeatherData]]:
+    return [
+        (
+            _time(hour),
+            PlainWeatherData(
+                temperature=PlainTemperature(
+                    float(seed + hour), TemperatureUnit.celsius
+                ),
+                humidity=float(hour % 100),
+                precipitation=hour % 2 == 0,
+                wind_speed=PlainSpeed(float(hour % 40), SpeedUnit.km_h),
+                wind_direction=WindDirection.from_degrees(hour * 37 % 360),
+            ),
+        )
+        for hour in range(HOURS)
+    ]
+
+
+def create_slotted_rows(seed: int) -> list[tuple[datetime, WeatherData]]:
+    return [
+        (
+            _time(hour),
+            WeatherData(
+                temperature=Temperature(float(seed + hour), TemperatureUnit.celsius),
+                humidity=float(hour % 100),
+                precipitation=hour % 2 == 0,
+                wind_speed=Speed(float(hour % 40), SpeedUnit.km_h),
+                wind_direction=WindDirection.from_degrees(hour * 37 % 360),
+            ),
+        )
+        for hour in range(HOURS)
+    ]
+
+
+def create_forecast(seed: int) -> Forecast:
+    return Forecast(
+        time=[_time(hour) for hour in range(HOURS)],
+        temperature=[float(seed + hour) for hour in range(HOURS)],
+        temperature_unit=TemperatureUnit.celsius,
+        humidity=[float(hour % 100) for hour in range(HOURS)],
+        precipitation=[hour % 2 == 0 for hour in range(HOURS)],
+        wind_speed=[float(hour % 40) for hour in range(HOURS)],
+        wind_speed_unit=SpeedUnit.km_h,
+        wind_direction=[float(hour * 37 % 360) for hour in range(HOURS)],
+    )
+
+
+def measure_cache(name: str, factory: Callable[[int], Any], forecasts: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    cache: TTLCache[Hashable, Any] = TTLCache(max_size=forecasts)
+    for seed in range(forecasts):
+        cache.set(("forecast", seed), factory(seed), ttl=3600)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_forecast = allocated / forecasts
+    print(f"{name:<40} {per_forecast / 1024:8.1f} KiB per cached forecast")
+    return per_forecast
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--forecasts", type=int, default=1000)
+    args = parser.parse_args()
+    before = measure_cache(
+        "before: rows, plain dataclasses", create_plain_rows, args.forecasts
+    )
+    measure_cache(
+        "rows, slotted frozen dataclasses", create_slotted_rows, args.forecasts
+    )
+    after = measure_cache("after: columnar Forecast", create_forecast, args.forecasts)
+    print(f"{'after / before':<40} {after / before:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
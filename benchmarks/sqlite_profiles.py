@@ -0,0 +1,109 @@
+"""
+Measure the user repository workload on SQLite under every performance profile.
+
+For every profile a new database file is filled with users by concurrent
+`create_user` calls, then users are looked up by random emails (like
+Basic auth does) and distinct locations are read (like weather prefetch does).
+
+Usage:
+    python -m benchmarks.sqlite_profiles --users 5000 --lookups 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from benchmarks.utils import Timings
+from picodi_app.data_access.sqlite import SQLITE_PROFILES, SqlitePool, create_tables
+from picodi_app.data_access.user import SqliteUserRepository
+from picodi_app.user import User
+from picodi_app.weather import Coordinates
+
+
+async def run_concurrently(
+    fn_args: list[str], fn: Callable[[str], Awaitable[object]], concurrency: int
+) -> tuple[float, list[float]]:
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for arg in fn_args:
+        queue.put_nowait(arg)
+    samples = []
+
+    async def worker() -> None:
+        while not queue.empty():
+            arg = queue.get_nowait()
+            started_at = time.perf_counter()
+            await fn(arg)
+            samples.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return time.perf_counter() - started_at, samples
+
+
+async def run_profile(
+    name: str, database: Path, users: int, lookups: int, concurrency: int
+) -> None:
+    pool = SqlitePool(str(database), size=4, profile=SQLITE_PROFILES[name])
+    pool.write_sync(create_tables)
+    repo = SqliteUserRepository(pool)
+
+    async def create_user(email: str) -> None:
+        await repo.create_user(
+            User(
+                id=email,
+                email=email,
+                # Few hundreds of distinct locations
+                location=Coordinates(int(email.partition("@")[0]) % 300 / 10, 30.52),
+                hashed_password="hash",  # noqa: S106
+            )
+        )
+
+    emails = [f"{number}@localhost" for number in range(users)]
+    elapsed, create_samples = await run_concurrently(emails, create_user, concurrency)
+    print(f"{name}: {users / elapsed:.1f} creates/s")
+    print(Timings(f"  {name}: create_user", create_samples).report())
+
+    lookup_emails = random.choices(emails, k=lookups)  # noqa: S311
+    elapsed, lookup_samples = await run_concurrently(
+        lookup_emails, repo.get_user_by_email, concurrency
+    )
+    print(f"{name}: {lookups / elapsed:.1f} lookups/s")
+    print(Timings(f"  {name}: get_user_by_email", lookup_samples).report())
+
+    locations_samples = []
+    for _ in range(20):
+        started_at = time.perf_counter()
+        await repo.get_locations()
+        locations_samples.append(time.perf_counter() - started_at)
+    print(Timings(f"  {name}: get_locations", locations_samples).report())
+    pool.close()
+
+
+async def run(users: int, lookups: int, concurrency: int) -> None:
+    print(f"Users: {users}, lookups: {lookups}, concurrency: {concurrency}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in SQLITE_PROFILES:
+            await run_profile(
+                name, Path(tmp_dir) / f"{name}.sqlite", users, lookups, concurrency
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.users, args.lookups, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Measure throughput and commit latency of concurrent user creation in SQLite.
+
+Every commit of a file database waits for the journal to reach the disk,
+so committing every insert on its own limits writes to the number
+of syncs the disk can do per second. Group commit runs all writes queued
+in the writer (and the ones that come within the batch window) in one
+transaction with one commit.
+
+Latency is measured from the call of `create_user` till its commit.
+
+Usage:
+    python -m benchmarks.sqlite_writes --users 2000 --concurrency 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import Timings
+from picodi_app.data_access.sqlite import SqlitePool, create_tables
+from picodi_app.data_access.user import SqliteUserRepository
+from picodi_app.user import User
+from picodi_app.weather import Coordinates
+
+CONFIGS = [
+    # name, batch window, max batch size
+    ("commit per write", 0.0, 1),
+    ("group commit, no window", 0.0, 100),
+    ("group commit, 2 ms window", 0.002, 100),
+]
+
+
+async def run_config(
+    name: str,
+    database: Path,
+    batch_window: float,
+    max_batch_size: int,
+    users: int,
+    concurrency: int,
+) -> None:
+    pool = SqlitePool(
+        str(database), size=1, batch_window=batch_window, max_batch_size=max_batch_size
+    )
+    pool.write_sync(create_tables)
+    repo = SqliteUserRepository(pool)
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for number in range(users):
+        queue.put_nowait(number)
+    samples = []
+
+    async def worker() -> None:
+        while not queue.empty():
+            number = queue.get_nowait()
+            user = User(
+                id=str(number),
+                email=f"{number}@localhost",
+                location=Coordinates(50.45, 30.52),
+                hashed_password="hash",  # noqa: S106
+            )
+            started_at = time.perf_counter()
+            await repo.create_user(user)
+            samples.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started_at
+    stats = pool.write_stats()
+    pool.close()
+
+    print(
+        f"{name}: {users / elapsed:.1f} users/s, "
+        f"{stats.commits} commits, largest batch {stats.largest_batch}"
+    )
+    print(Timings(f"  {name}: commit latency", samples).report())
+
+
+async def run(users: int, concurrency: int) -> None:
+    print(f"Users: {users}, concurrency: {concurrency}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for number, (name, batch_window, max_batch_size) in enumerate(CONFIGS):
+            await run_config(
+                name,
+                Path(tmp_dir) / f"{number}.sqlite",
+                batch_window,
+                max_batch_size,
+                users,
+                concurrency,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    asyncio.run(run(args.users, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class Timings:
+    name: str
+    samples: list[float]
+
+    @property
+    def total(self) -> float:
+        return sum(self.samples)
+
+    def percentile(self, percent: int) -> float:
+        if len(self.samples) < 2:
+            return self.samples[0]
+        return statistics.quantiles(self.samples, n=100)[percent - 1]
+
+    def report(self) -> str:
+        return (
+            f"{self.name:<40} n={len(self.samples):<7} "
+            f"mean={statistics.mean(self.samples) * 1e6:10.1f} us  "
+            f"p50={self.percentile(50) * 1e6:10.1f} us  "
+            f"p99={self.percentile(99) * 1e6:10.1f} us"
+        )
+
+
+def measure(name: str, fn: Callable[[], object], iterations: int) -> Timings:
+    samples = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started_at)
+    return Timings(name=name, samples=samples)
+
+
+async def ameasure(
+    name: str, fn: Callable[[], Awaitable[object]], iterations: int
+) -> Timings:
+    samples = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started_at)
+    return Timings(name=name, samples=samples)
@@ -23,29 +23,108 @@ dependencies are placed here.
 from typing import Annotated
 
 from fastapi import Depends, HTTPException
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBasic,
+    HTTPBasicCredentials,
+    HTTPBearer,
+)
+from picodi import inject
 from picodi.integrations.fastapi import Provide
 
-from picodi_app.deps import get_user_repository
+from picodi_app.auth import CredentialsCache, InvalidTokenError, TokenSigner
+from picodi_app.deps import (
+    get_credentials_cache,
+    get_option,
+    get_password_hasher,
+    get_token_signer,
+    get_user_repository,
+)
 from picodi_app.user import IUserRepository, User
-from picodi_app.utils import verify_password
+from picodi_app.utils import PasswordHasher, PasswordHasherOverloadedError
 
-security = HTTPBasic()
+# Both schemes read `Authorization` header, so only one of them
+#   returns credentials for a request
+basic_security = HTTPBasic(auto_error=False)
+bearer_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    credentials: Annotated[HTTPBasicCredentials, Depends(security)],
-    user_repo: IUserRepository = Provide(get_user_repository, wrap=True),
+async def get_user_by_password(
+    credentials: Annotated[HTTPBasicCredentials | None, Depends(basic_security)],
 ) -> User | None:
+    if credentials is None:
+        return None
+    return await authenticate_by_password(credentials)
+
+
+# Picodi Note:
+#   Dependencies are injected only when this function is called, so requests
+#   without Basic credentials (e.g. with bearer token) don't create
+#   user repository and password hasher.
+@inject
+async def authenticate_by_password(
+    credentials: HTTPBasicCredentials,
+    user_repo: IUserRepository = Provide(get_user_repository),
+    password_hasher: PasswordHasher = Provide(get_password_hasher),
+    credentials_cache: CredentialsCache | None = Provide(get_credentials_cache),
+) -> User | None:
+    if credentials_cache is not None:
+        user = credentials_cache.get(credentials.username, credentials.password)
+        if user is not None:
+            return user
+
     user = await user_repo.get_user_by_email(credentials.username)
     if user is None:
         return None
-    if not verify_password(user.hashed_password, credentials.password):
+    try:
+        password_is_valid = await password_hasher.verify_password(
+            user.hashed_password, credentials.password
+        )
+    except PasswordHasherOverloadedError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many authentication requests, try again later",
+            headers={"Retry-After": "1"},
+        ) from None
+    if not password_is_valid:
         return None
 
+    if credentials_cache is not None:
+        credentials_cache.set(credentials.username, credentials.password, user)
     return user
 
 
+async def get_user_by_token(
+    credentials: Annotated[
+        HTTPAuthorizationCredentials | None, Depends(bearer_security)
+    ],
+    token_signer: TokenSigner | None = Provide(get_token_signer, wrap=True),
+) -> User | None:
+    if credentials is None or token_signer is None:
+        return None
+    try:
+        return token_signer.verify(credentials.credentials)
+    except InvalidTokenError:
+        return None
+
+
+async def get_current_user(
+    basic_credentials: Annotated[HTTPBasicCredentials | None, Depends(basic_security)],
+    bearer_credentials: Annotated[
+        HTTPAuthorizationCredentials | None, Depends(bearer_security)
+    ],
+    user_by_password: Annotated[User | None, Depends(get_user_by_password)],
+    user_by_token: Annotated[User | None, Depends(get_user_by_token)],
+) -> User | None:
+    if basic_credentials is None and bearer_credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Basic"},
+        )
+    return user_by_token or user_by_password
+
+
 # Picodi Note:
 #   This dependency requires `get_current_user` dependency to be resolved first.
 #   Even though `get_current_user` uses Picodi dependency `get_user_repository`,
@@ -57,3 +136,10 @@ async def get_current_user_or_raise_error(
     if user is None:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return user
+
+
+async def require_stats_enabled(
+    stats_enabled: bool = Provide(get_option(lambda s: s.api.stats_enabled), wrap=True),
+) -> None:
+    if not stats_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
@@ -0,0 +1,78 @@
+"""
+Fast-path JSON encoding of weather responses.
+
+Response bytes are written straight from domain objects with precompiled
+templates, so Pydantic response models aren't built, validated
+and serialized for every forecast hour.
+
+Output is byte-for-byte the same as FastAPI's default `JSONResponse`
+for `WeatherResp` and `ForecastResp` models, so OpenAPI schema
+stays the same. If you change these models, change templates too.
+"""
+
+from __future__ import annotations
+
+import json
+
+from fastapi import Response
+
+from picodi_app.weather import Forecast, WeatherData, WindDirection
+
+_WEATHER_TEMPLATE = (
+    '{"temperature":%d,"humidity":%d,"precipitation":%s,'
+    '"wind_speed":%d,"wind_direction":%s}'
+)
+_BOOLEANS = {False: "false", True: "true"}
+_WIND_DIRECTIONS = {
+    direction: json.dumps(direction.value) for direction in WindDirection
+}
+
+
+def encode_weather(weather: WeatherData) -> bytes:
+    return (
+        _WEATHER_TEMPLATE
+        % (
+            round(weather.temperature.in_celsius()),
+            round(weather.humidity),
+            _BOOLEANS[weather.precipitation],
+            round(weather.wind_speed.in_meters_per_second()),
+            _WIND_DIRECTIONS[weather.wind_direction],
+        )
+    ).encode()
+
+
+def encode_forecast(forecast: Forecast) -> bytes:
+    # ISO formatted datetime doesn't need escaping
+    time_data = ",".join(f'"{time.isoformat()}"' for time in forecast.time)
+    columns = zip(
+        forecast.temperatures_in_celsius(),
+        forecast.humidity,
+        forecast.precipitation,
+        forecast.wind_speeds_in_meters_per_second(),
+        forecast.wind_directions(),
+    )
+    weather_data = ",".join(
+        _WEATHER_TEMPLATE
+        % (
+            round(temp),
+            round(humidity),
+            _BOOLEANS[bool(precipitation)],
+            round(wind_speed),
+            _WIND_DIRECTIONS[wind_direction],
+        )
+        for temp, humidity, precipitation, wind_speed, wind_direction in columns
+    )
+    return f'{{"time":[{time_data}],"weather_data":[{weather_data}]}}'.encode()
+
+
+def json_response(content: bytes, response: Response) -> Response:
+    """
+    Create response with already encoded JSON `content`. Headers set
+    on `response` (FastAPI's `Response` dependency) are copied,
+    because FastAPI doesn't apply them to returned responses.
+    """
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
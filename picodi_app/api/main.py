@@ -10,7 +10,8 @@ from fastapi import APIRouter, FastAPI
 from picodi.integrations.fastapi import RequestScopeMiddleware
 from starlette.middleware import Middleware
 
-from picodi_app.api.routes import users, weather
+from picodi_app.api.routes import stats, users, weather
+from picodi_app.deps import start_email_filter, start_weather_prefetcher
 from picodi_app.utils import monitor_thread_limiter
 
 if TYPE_CHECKING:
@@ -28,9 +29,15 @@ logging.basicConfig(level=logging.INFO)
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
     await picodi.registry.init()
+    prefetcher = await start_weather_prefetcher()
+    email_filter = start_email_filter()
     try:
         yield
     finally:
+        if email_filter is not None:
+            await email_filter.close()
+        if prefetcher is not None:
+            await prefetcher.close()
         await picodi.registry.shutdown()
 
 
@@ -39,6 +46,7 @@ def create_api_router() -> APIRouter:
     api_router = APIRouter(prefix="/api")
     api_router.include_router(weather.router, prefix="/weather", tags=["weather"])
     api_router.include_router(users.router, prefix="/users", tags=["users"])
+    api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
     router.include_router(api_router)
     return router
 
@@ -0,0 +1,334 @@
+from collections.abc import Hashable
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from picodi.integrations.fastapi import Provide
+from pydantic import BaseModel, Field
+
+from picodi_app.api.fastapi_deps import require_stats_enabled
+from picodi_app.auth import CredentialsCache
+from picodi_app.cache import CacheStats, TTLCache
+from picodi_app.data_access.resilience import (
+    CircuitBreakerStats,
+    StaleStats,
+    StaleWhileRevalidate,
+)
+from picodi_app.data_access.user_bloom import EmailFilter, EmailFilterStats
+from picodi_app.data_access.weather_batching import BatchStats, CurrentWeatherBatcher
+from picodi_app.data_access.weather_prefetch import PrefetchStats, WeatherPrefetcher
+from picodi_app.data_access.weather_shared_cache import SharedCache, SharedCacheStats
+from picodi_app.deps import (
+    get_credentials_cache,
+    get_current_weather_batcher,
+    get_email_filter,
+    get_geocoder_cache,
+    get_geocoder_stale_while_revalidate,
+    get_shared_cache,
+    get_user_cache,
+    get_weather_cache,
+    get_weather_prefetcher,
+    get_weather_stale_while_revalidate,
+)
+from picodi_app.user import User
+
+# Stats are not public, endpoints respond only if they are enabled in settings
+router = APIRouter(dependencies=[Depends(require_stats_enabled)])
+
+
+class CacheStatsResp(BaseModel):
+    hits: int = Field(..., description="Number of cache hits", examples=[120])
+    misses: int = Field(..., description="Number of cache misses", examples=[30])
+    evictions: int = Field(
+        ..., description="Number of entries evicted because of size limit"
+    )
+    expirations: int = Field(..., description="Number of expired entries")
+    size: int = Field(..., description="Current number of entries", examples=[25])
+    max_size: int = Field(..., description="Maximum number of entries")
+    hit_ratio: float = Field(..., description="Hits to lookups ratio", examples=[0.8])
+
+    @classmethod
+    def from_domain(cls, stats: CacheStats) -> "CacheStatsResp":
+        return cls(
+            hits=stats.hits,
+            misses=stats.misses,
+            evictions=stats.evictions,
+            expirations=stats.expirations,
+            size=stats.size,
+            max_size=stats.max_size,
+            hit_ratio=stats.hit_ratio,
+        )
+
+
+class BatchStatsResp(BaseModel):
+    batches: int = Field(..., description="Number of sent batches", examples=[10])
+    items: int = Field(..., description="Number of batched lookups", examples=[120])
+    failed_items: int = Field(..., description="Number of failed lookups")
+    largest_batch_size: int = Field(..., description="Size of the largest batch")
+    last_batch_size: int = Field(..., description="Size of the last batch")
+    last_batch_latency: float = Field(
+        ..., description="Latency of the last batch in seconds"
+    )
+    avg_batch_size: float = Field(..., description="Average batch size")
+    avg_batch_latency: float = Field(
+        ..., description="Average batch latency in seconds"
+    )
+
+    @classmethod
+    def from_domain(cls, stats: BatchStats) -> "BatchStatsResp":
+        return cls(
+            batches=stats.batches,
+            items=stats.items,
+            failed_items=stats.failed_items,
+            largest_batch_size=stats.largest_batch_size,
+            last_batch_size=stats.last_batch_size,
+            last_batch_latency=stats.last_batch_latency,
+            avg_batch_size=stats.avg_batch_size,
+            avg_batch_latency=stats.avg_batch_latency,
+        )
+
+
+class CircuitBreakerStatsResp(BaseModel):
+    state: str = Field(
+        ..., description="Circuit state", examples=["closed", "open", "half_open"]
+    )
+    successes: int = Field(..., description="Number of successful upstream calls")
+    failures: int = Field(..., description="Number of failed upstream calls")
+    slow_calls: int = Field(..., description="Number of slow upstream calls")
+    rejected: int = Field(
+        ..., description="Number of upstream calls rejected by open circuit"
+    )
+    times_opened: int = Field(..., description="How many times the circuit opened")
+
+    @classmethod
+    def from_domain(cls, stats: CircuitBreakerStats) -> "CircuitBreakerStatsResp":
+        return cls(
+            state=stats.state.value,
+            successes=stats.successes,
+            failures=stats.failures,
+            slow_calls=stats.slow_calls,
+            rejected=stats.rejected,
+            times_opened=stats.times_opened,
+        )
+
+
+class ResilienceStatsResp(BaseModel):
+    circuit_breaker: CircuitBreakerStatsResp = Field(
+        ..., description="Circuit breaker statistics"
+    )
+    stale_served: int = Field(..., description="Number of stale responses served")
+    background_refreshes: int = Field(
+        ..., description="Number of background refreshes of stale values"
+    )
+    failed_refreshes: int = Field(
+        ..., description="Number of failed background refreshes"
+    )
+
+    @classmethod
+    def from_domain(
+        cls, breaker_stats: CircuitBreakerStats, stale_stats: StaleStats
+    ) -> "ResilienceStatsResp":
+        return cls(
+            circuit_breaker=CircuitBreakerStatsResp.from_domain(breaker_stats),
+            stale_served=stale_stats.stale_served,
+            background_refreshes=stale_stats.background_refreshes,
+            failed_refreshes=stale_stats.failed_refreshes,
+        )
+
+
+class PrefetchStatsResp(BaseModel):
+    running: bool = Field(..., description="Whether prefetcher is running")
+    runs: int = Field(..., description="Number of prefetch runs")
+    cells: int = Field(
+        ..., description="Number of distinct location cells in the last run"
+    )
+    refreshed: int = Field(..., description="Number of refreshed cache entries")
+    failed: int = Field(..., description="Number of failed refreshes")
+    warmed: int = Field(..., description="Number of warmed locations of new users")
+    skipped: int = Field(
+        ..., description="Number of runs skipped because another worker did them"
+    )
+    last_run_duration: float = Field(
+        ..., description="Duration of the last run in seconds"
+    )
+
+    @classmethod
+    def from_domain(cls, running: bool, stats: PrefetchStats) -> "PrefetchStatsResp":
+        return cls(
+            running=running,
+            runs=stats.runs,
+            cells=stats.cells,
+            refreshed=stats.refreshed,
+            failed=stats.failed,
+            warmed=stats.warmed,
+            skipped=stats.skipped,
+            last_run_duration=stats.last_run_duration,
+        )
+
+
+class EmailFilterStatsResp(BaseModel):
+    enabled: bool = Field(..., description="Whether email filter is enabled")
+    ready: bool = Field(..., description="Whether filter is built or loaded")
+    rejected: int = Field(
+        ..., description="Number of lookups of unknown emails answered by filter"
+    )
+    passed: int = Field(..., description="Number of lookups passed to user storage")
+    rebuilds: int = Field(..., description="Number of rebuilds in this process")
+    syncs: int = Field(..., description="Number of loads of shared filter")
+    emails: int = Field(..., description="Approximate number of emails in filter")
+    size: int = Field(..., description="Size of filter in bits")
+    hashes: int = Field(..., description="Number of hash functions")
+    estimated_false_positive_rate: float = Field(
+        ..., description="False positive rate estimated from share of set bits"
+    )
+    last_rebuild_duration: float = Field(
+        ..., description="Duration of the last rebuild in seconds"
+    )
+
+    @classmethod
+    def from_domain(cls, email_filter: EmailFilter | None) -> "EmailFilterStatsResp":
+        stats = email_filter.stats() if email_filter is not None else EmailFilterStats()
+        return cls(
+            enabled=email_filter is not None,
+            ready=stats.ready,
+            rejected=stats.rejected,
+            passed=stats.passed,
+            rebuilds=stats.rebuilds,
+            syncs=stats.syncs,
+            emails=stats.emails,
+            size=stats.size,
+            hashes=stats.hashes,
+            estimated_false_positive_rate=stats.estimated_false_positive_rate,
+            last_rebuild_duration=stats.last_rebuild_duration,
+        )
+
+
+class SharedCacheStatsResp(BaseModel):
+    enabled: bool = Field(..., description="Whether shared cache is enabled")
+    hits: int = Field(..., description="Number of cache hits in this process")
+    misses: int = Field(..., description="Number of cache misses in this process")
+    errors: int = Field(..., description="Number of failed calls to cache backend")
+    stored_bytes: int = Field(..., description="Total size of stored payloads in bytes")
+    compressed: int = Field(..., description="Number of compressed payloads")
+    expirations: int = Field(
+        ..., description="Number of expired entries deleted by this process"
+    )
+    evictions: int = Field(
+        ...,
+        description="Number of entries evicted by this process because of size limit",
+    )
+
+    @classmethod
+    def from_domain(cls, cache: SharedCache | None) -> "SharedCacheStatsResp":
+        stats = cache.stats() if cache is not None else SharedCacheStats()
+        return cls(
+            enabled=cache is not None,
+            hits=stats.hits,
+            misses=stats.misses,
+            errors=stats.errors,
+            stored_bytes=stats.stored_bytes,
+            compressed=stats.compressed,
+            expirations=stats.expirations,
+            evictions=stats.evictions,
+        )
+
+
+@router.get(
+    "/weather-cache",
+    description="Get weather cache statistics",
+)
+async def weather_cache_stats(
+    cache: TTLCache[Hashable, Any] = Provide(get_weather_cache, wrap=True),
+) -> CacheStatsResp:
+    return CacheStatsResp.from_domain(cache.stats())
+
+
+@router.get(
+    "/geocoder-cache",
+    description="Get geocoder cache statistics",
+)
+async def geocoder_cache_stats(
+    cache: TTLCache[Hashable, Any] = Provide(get_geocoder_cache, wrap=True),
+) -> CacheStatsResp:
+    return CacheStatsResp.from_domain(cache.stats())
+
+
+@router.get(
+    "/user-cache",
+    description="Get statistics of users cache",
+)
+async def user_cache_stats(
+    cache: TTLCache[str, User | None] = Provide(get_user_cache, wrap=True),
+) -> CacheStatsResp:
+    return CacheStatsResp.from_domain(cache.stats())
+
+
+@router.get(
+    "/email-filter",
+    description="Get statistics of Bloom filter of registered emails",
+)
+async def email_filter_stats(
+    email_filter: EmailFilter | None = Provide(get_email_filter, wrap=True),
+) -> EmailFilterStatsResp:
+    return EmailFilterStatsResp.from_domain(email_filter)
+
+
+@router.get(
+    "/credentials-cache",
+    description="Get statistics of verified credentials cache",
+)
+async def credentials_cache_stats(
+    cache: CredentialsCache | None = Provide(get_credentials_cache, wrap=True),
+) -> CacheStatsResp:
+    return CacheStatsResp.from_domain(
+        cache.stats() if cache is not None else CacheStats()
+    )
+
+
+@router.get(
+    "/shared-cache",
+    description="Get statistics of shared cache of weather and geocoder clients",
+)
+async def shared_cache_stats(
+    cache: SharedCache | None = Provide(get_shared_cache, wrap=True),
+) -> SharedCacheStatsResp:
+    return SharedCacheStatsResp.from_domain(cache)
+
+
+@router.get(
+    "/weather-batching",
+    description="Get statistics of current weather lookups batching",
+)
+async def weather_batching_stats(
+    batcher: CurrentWeatherBatcher = Provide(get_current_weather_batcher, wrap=True),
+) -> BatchStatsResp:
+    return BatchStatsResp.from_domain(batcher.stats())
+
+
+@router.get(
+    "/weather-resilience",
+    description="Get weather upstream circuit breaker and stale data statistics",
+)
+async def weather_resilience_stats(
+    swr: StaleWhileRevalidate = Provide(get_weather_stale_while_revalidate, wrap=True),
+) -> ResilienceStatsResp:
+    return ResilienceStatsResp.from_domain(swr.breaker.stats(), swr.stats())
+
+
+@router.get(
+    "/geocoder-resilience",
+    description="Get geocoder upstream circuit breaker and stale data statistics",
+)
+async def geocoder_resilience_stats(
+    swr: StaleWhileRevalidate = Provide(get_geocoder_stale_while_revalidate, wrap=True),
+) -> ResilienceStatsResp:
+    return ResilienceStatsResp.from_domain(swr.breaker.stats(), swr.stats())
+
+
+@router.get(
+    "/weather-prefetch",
+    description="Get statistics of weather prefetching for users' locations",
+)
+async def weather_prefetch_stats(
+    prefetcher: WeatherPrefetcher = Provide(get_weather_prefetcher, wrap=True),
+) -> PrefetchStatsResp:
+    return PrefetchStatsResp.from_domain(prefetcher.running, prefetcher.stats())
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBasic
-from pydantic import BaseModel
+from picodi.integrations.fastapi import Provide
+from pydantic import BaseModel, Field
 
-from picodi_app.api.fastapi_deps import get_current_user_or_raise_error
+from picodi_app.api.fastapi_deps import (
+    get_current_user_or_raise_error,
+    get_user_by_password,
+)
+from picodi_app.auth import TokenSigner
+from picodi_app.deps import get_token_signer
 from picodi_app.user import User
 
 router = APIRouter()
@@ -14,11 +22,48 @@ class UserResp(BaseModel):
     email: str
 
 
+class TokenResp(BaseModel):
+    access_token: str = Field(..., description="Signed bearer token")
+    token_type: str = Field("bearer", description="Always `bearer`")
+    expires_in: int = Field(
+        ..., description="Token lifetime in seconds", examples=[900]
+    )
+
+
 @router.get(
     "/whoami",
-    description="Get current user. Requires authentication (Basic Auth).",
+    description=(
+        "Get current user. Requires authentication (Basic Auth or bearer token)."
+    ),
 )
 async def whoami(
     current_user: User = Depends(get_current_user_or_raise_error),
 ) -> UserResp:
     return UserResp(id=current_user.id, email=current_user.email)
+
+
+@router.post(
+    "/token",
+    description=(
+        "Exchange Basic Auth credentials for a short-lived bearer token. "
+        "Requests with the token skip password verification. "
+        "Disabled if auth token secret is not set."
+    ),
+)
+async def create_token(
+    user: Annotated[User | None, Depends(get_user_by_password)],
+    token_signer: TokenSigner | None = Provide(get_token_signer, wrap=True),
+) -> TokenResp:
+    if token_signer is None:
+        raise HTTPException(
+            status_code=503, detail="Bearer tokens are disabled on this server"
+        )
+    if user is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Basic"},
+        )
+    return TokenResp(
+        access_token=token_signer.issue(user), expires_in=int(token_signer.ttl)
+    )
@@ -1,27 +1,41 @@
+import asyncio
+import logging
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from picodi.integrations.fastapi import Provide
 from pydantic import BaseModel, Field
 from starlette import status
 
 from picodi_app.api.fastapi_deps import get_current_user
-from picodi_app.deps import get_geocoder_client, get_weather_client
+from picodi_app.api.json_encoding import encode_forecast, encode_weather, json_response
+from picodi_app.deps import get_geocoder_client, get_option, get_weather_client
 from picodi_app.user import User
 from picodi_app.weather import (
+    CantGetDataError,
     City,
     Coordinates,
+    Forecast,
     IGeocoderClient,
     IWeatherClient,
     WeatherData,
+    track_data_freshness,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+STALE_RESPONSE_WARNING = '110 - "Response is Stale"'
+
 
 class CoordinatesResp(BaseModel):
-    latitude: float = Field(..., description="Latitude", examples=[50.45466])
-    longitude: float = Field(..., description="Longitude", examples=[30.5238])
+    latitude: float = Field(
+        ..., ge=-90, le=90, description="Latitude", examples=[50.45466]
+    )
+    longitude: float = Field(
+        ..., ge=-180, le=180, description="Longitude", examples=[30.5238]
+    )
 
     def to_domain(self) -> Coordinates:
         return Coordinates(
@@ -69,8 +83,8 @@ class WeatherResp(BaseModel):
 
 async def get_coordinates(
     user: Annotated[User | None, Depends(get_current_user)],
-    latitude: Annotated[float | None, Query(example=50.45466)] = None,
-    longitude: Annotated[float | None, Query(example=30.5238)] = None,
+    latitude: Annotated[float | None, Query(ge=-90, le=90, example=50.45466)] = None,
+    longitude: Annotated[float | None, Query(ge=-180, le=180, example=30.5238)] = None,
 ) -> Coordinates:
     if latitude and longitude:
         return Coordinates(latitude=latitude, longitude=longitude)
@@ -82,8 +96,11 @@ async def get_coordinates(
     return user.location
 
 
+# Endpoints return raw `Response` on the fast path, so response models
+#   are set explicitly to keep them in OpenAPI schema
 @router.get(
     "/current",
+    response_model=WeatherResp,
     description=(
         "Get current weather. "
         "For authenticated users, it can use user's location from profile. "
@@ -91,22 +108,154 @@ async def get_coordinates(
     ),
 )
 async def get_current_weather(
+    response: Response,
     coords: Coordinates = Depends(get_coordinates),
     weather_client: IWeatherClient = Provide(get_weather_client, wrap=True),
-) -> WeatherResp:
-    weather = await weather_client.get_current_weather(coords)
+    fast_json: bool = Provide(
+        get_option(lambda s: s.api.fast_json_responses), wrap=True
+    ),
+) -> WeatherResp | Response:
+    with track_data_freshness() as tracker:
+        weather = await weather_client.get_current_weather(coords)
+    if tracker.stale:
+        response.headers["Warning"] = STALE_RESPONSE_WARNING
+    if fast_json:
+        return json_response(encode_weather(weather), response)
     return WeatherResp.from_domain(weather)
 
 
+class CurrentWeatherBatchReq(BaseModel):
+    locations: list[CoordinatesResp] = Field(
+        ..., min_length=1, description="Locations to get current weather for"
+    )
+
+
+class CurrentWeatherBatchItemResp(BaseModel):
+    coordinates: CoordinatesResp = Field(..., description="Requested coordinates")
+    weather: WeatherResp | None = Field(
+        ..., description="Current weather, null if it can't be got"
+    )
+    error: str | None = Field(
+        ..., description="Error message", examples=["Can't get current weather data"]
+    )
+    stale: bool = Field(..., description="Whether weather data is stale")
+
+
+class CurrentWeatherBatchResp(BaseModel):
+    results: list[CurrentWeatherBatchItemResp] = Field(
+        ..., description="Results in the same order as requested locations"
+    )
+
+
+async def _get_current_weather_item(
+    weather_client: IWeatherClient,
+    coords: Coordinates,
+    semaphore: asyncio.Semaphore,
+) -> CurrentWeatherBatchItemResp:
+    weather: WeatherResp | None = None
+    error: str | None = None
+    async with semaphore:
+        # Every lookup runs in its own task (and context),
+        #   so freshness is tracked for every item separately
+        with track_data_freshness() as tracker:
+            try:
+                weather = WeatherResp.from_domain(
+                    await weather_client.get_current_weather(coords)
+                )
+            except CantGetDataError as e:
+                error = str(e)
+            except Exception:  # noqa: PIE786
+                # One broken location must not fail the whole batch,
+                #   details of unexpected errors are not exposed
+                logger.exception("Can't get current weather for %s", coords)
+                error = "Can't get current weather data"
+    return CurrentWeatherBatchItemResp(
+        coordinates=CoordinatesResp(
+            latitude=coords.latitude, longitude=coords.longitude
+        ),
+        weather=weather,
+        error=error,
+        stale=tracker.stale,
+    )
+
+
+@router.post(
+    "/current/batch",
+    description=(
+        "Get current weather for many locations in one request. "
+        "Identical locations are looked up once. "
+        "Errors are reported for every location separately"
+    ),
+)
+async def get_current_weather_batch(
+    response: Response,
+    batch: CurrentWeatherBatchReq,
+    weather_client: IWeatherClient = Provide(get_weather_client, wrap=True),
+    limit: int = Provide(
+        get_option(lambda s: s.api.current_weather_batch_limit), wrap=True
+    ),
+    concurrency: int = Provide(
+        get_option(lambda s: s.api.current_weather_batch_concurrency), wrap=True
+    ),
+) -> CurrentWeatherBatchResp:
+    if len(batch.locations) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Too many locations, max {limit} are allowed",
+        )
+    locations = [location.to_domain() for location in batch.locations]
+    # `dict.fromkeys` keeps order of unique locations
+    unique_locations = list(dict.fromkeys(locations))
+    semaphore = asyncio.Semaphore(concurrency)
+    items = await asyncio.gather(
+        *[
+            _get_current_weather_item(weather_client, coords, semaphore)
+            for coords in unique_locations
+        ]
+    )
+    items_by_location = dict(zip(unique_locations, items, strict=True))
+    if any(item.stale for item in items):
+        response.headers["Warning"] = STALE_RESPONSE_WARNING
+    return CurrentWeatherBatchResp(
+        results=[items_by_location[coords] for coords in locations]
+    )
+
+
 class ForecastResp(BaseModel):
     time: list[str] = Field(
         ..., description="Time", examples=[["2021-08-01T12:00:00Z"]]
     )
     weather_data: list[WeatherResp] = Field(..., description="Weather data")
 
+    @classmethod
+    def from_domain(cls, forecast: Forecast) -> "ForecastResp":
+        # Conversions are done for whole columns instead of building
+        #   `WeatherData` object for every hour
+        columns = zip(
+            forecast.temperatures_in_celsius(),
+            forecast.humidity,
+            forecast.precipitation,
+            forecast.wind_speeds_in_meters_per_second(),
+            forecast.wind_directions(),
+        )
+        return cls(
+            time=[time.isoformat() for time in forecast.time],
+            weather_data=[
+                WeatherResp(
+                    temperature=round(temp),
+                    humidity=round(humidity),
+                    precipitation=bool(precipitation),
+                    wind_speed=round(wind_speed),
+                    wind_direction=wind_direction.value,
+                )
+                for temp, humidity, precipitation, wind_speed, wind_direction in columns
+            ],
+        )
+
 
 @router.get(
     "/forecast",
+    response_model=ForecastResp,
     description=(
         "Get forecast for n days. "
         "For authenticated users, it can use user's location from profile. "
@@ -114,18 +263,21 @@ class ForecastResp(BaseModel):
     ),
 )
 async def get_forecast(
+    response: Response,
     coords: Coordinates = Depends(get_coordinates),
     days: Annotated[int, Query(..., ge=1, le=7)] = 1,
     weather_client: IWeatherClient = Provide(get_weather_client, wrap=True),
-) -> ForecastResp:
-    forecast = await weather_client.get_forecast(coords, days=days)
-    time_data = []
-    weather_data = []
-    for time, weather in forecast:
-        time_data.append(time.isoformat())
-        weather_data.append(WeatherResp.from_domain(weather))
-
-    return ForecastResp(time=time_data, weather_data=weather_data)
+    fast_json: bool = Provide(
+        get_option(lambda s: s.api.fast_json_responses), wrap=True
+    ),
+) -> ForecastResp | Response:
+    with track_data_freshness() as tracker:
+        forecast = await weather_client.get_forecast(coords, days=days)
+    if tracker.stale:
+        response.headers["Warning"] = STALE_RESPONSE_WARNING
+    if fast_json:
+        return json_response(encode_forecast(forecast), response)
+    return ForecastResp.from_domain(forecast)
 
 
 @router.get(
@@ -133,8 +285,12 @@ async def get_forecast(
     description="Get city coordinates by city name",
 )
 async def geocode(
+    response: Response,
     city: Annotated[str, Query(..., example="Kyiv")],
     geocoder_client: IGeocoderClient = Provide(get_geocoder_client, wrap=True),
 ) -> list[CityResp]:
-    results = await geocoder_client.get_coordinates_by_city(city)
+    with track_data_freshness() as tracker:
+        results = await geocoder_client.get_coordinates_by_city(city)
+    if tracker.stale:
+        response.headers["Warning"] = STALE_RESPONSE_WARNING
     return [CityResp.from_domain(city) for city in results]
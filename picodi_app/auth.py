@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from collections.abc import AsyncIterator, Callable, Sequence
+
+from picodi_app.cache import CacheStats, TTLCache
+from picodi_app.user import IUserRepository, User
+from picodi_app.weather import Coordinates
+
+
+class CredentialsCache:
+    """
+    Short-lived cache of successfully verified credentials, so repeated
+    requests with the same Basic auth header skip the user lookup
+    and password verification.
+
+    Passwords are never stored: entry of the user keeps HMAC of email
+    and password with a random secret of the process, and it's compared
+    with HMAC of provided credentials in constant time.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache[str, tuple[bytes, User]],
+        ttl: float,
+        secret: bytes | None = None,
+    ) -> None:
+        self._cache = cache
+        self._ttl = ttl
+        self._secret = secret or secrets.token_bytes(32)
+
+    def get(self, email: str, password: str) -> User | None:
+        try:
+            digest, user = self._cache.get(email)
+        except KeyError:
+            return None
+        if not hmac.compare_digest(digest, self._digest(email, password)):
+            return None
+        return user
+
+    def set(self, email: str, password: str, user: User) -> None:
+        self._cache.set(email, (self._digest(email, password), user), ttl=self._ttl)
+
+    def invalidate(self, email: str) -> None:
+        self._cache.delete(email)
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def _digest(self, email: str, password: str) -> bytes:
+        # Separator can't be a part of email, so different
+        #   email and password pairs can't produce the same message
+        message = f"{email}\0{password}".encode()
+        return hmac.digest(self._secret, message, hashlib.sha256)
+
+
+class CredentialsCacheUserRepository(IUserRepository):
+    """
+    User repository that drops cached credentials of rewritten users.
+    """
+
+    def __init__(
+        self, repo: IUserRepository, credentials_cache: CredentialsCache
+    ) -> None:
+        self._repo = repo
+        self._credentials_cache = credentials_cache
+
+    async def get_user_by_email(self, email: str) -> User | None:
+        return await self._repo.get_user_by_email(email)
+
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        return await self._repo.get_users_by_emails(emails)
+
+    async def create_user(self, user: User) -> None:
+        await self._repo.create_user(user)
+        self._credentials_cache.invalidate(user.email)
+
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        skipped = await self._repo.create_users(users)
+        for user in users:
+            self._credentials_cache.invalidate(user.email)
+        return skipped
+
+    async def get_locations(self) -> list[Coordinates]:
+        return await self._repo.get_locations()
+
+    def iter_emails(self) -> AsyncIterator[str]:
+        return self._repo.iter_emails()
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class TokenSigner:
+    """
+    Issues and verifies short-lived bearer tokens signed with HMAC-SHA256.
+
+    Token carries id, email and location of the user, so it's verified
+    without the user lookup and password hashing. Format is
+    `<payload>.<signature>`, both parts are base64url encoded
+    without padding. Secret must be the same in all workers.
+    """
+
+    def __init__(
+        self, secret: bytes, ttl: float, clock: Callable[[], float] = time.time
+    ) -> None:
+        if not secret:
+            raise ValueError("Secret must not be empty")
+        self._secret = secret
+        self._ttl = ttl
+        self._clock = clock
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def issue(self, user: User) -> str:
+        payload = json.dumps(
+            {
+                "sub": user.id,
+                "email": user.email,
+                "loc": user.location.to_string(),
+                "exp": int(self._clock() + self._ttl),
+            },
+            separators=(",", ":"),
+        ).encode()
+        encoded_payload = _b64encode(payload)
+        return f"{encoded_payload}.{_b64encode(self._sign(encoded_payload))}"
+
+    def verify(self, token: str) -> User:
+        """
+        Get the user from the token.
+        User restored from the token doesn't have a password hash.
+
+        :raises InvalidTokenError: if token is malformed, forged or expired.
+        """
+        encoded_payload, _, encoded_signature = token.partition(".")
+        try:
+            signature = _b64decode(encoded_signature)
+        except ValueError:
+            raise InvalidTokenError("Malformed token") from None
+        if not hmac.compare_digest(signature, self._sign(encoded_payload)):
+            raise InvalidTokenError("Invalid token signature")
+        try:
+            payload = json.loads(_b64decode(encoded_payload))
+            expires_at = payload["exp"]
+            user = User(
+                id=payload["sub"],
+                email=payload["email"],
+                location=Coordinates.from_string(payload["loc"]),
+                # Token doesn't carry password hash, it's not needed
+                #   after authentication
+                hashed_password="",  # noqa: S106
+            )
+        except (ValueError, KeyError, TypeError):
+            raise InvalidTokenError("Malformed token") from None
+        if expires_at <= self._clock():
+            raise InvalidTokenError("Token expired")
+        return user
+
+    def _sign(self, encoded_payload: str) -> bytes:
+        return hmac.digest(self._secret, encoded_payload.encode(), hashlib.sha256)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+    except (binascii.Error, UnicodeEncodeError):
+        raise ValueError("Invalid base64 data") from None
@@ -0,0 +1,84 @@
+"""
+Bloom filter: compact probabilistic set.
+
+Lookup of an item that was added always returns `True`, lookup
+of an item that wasn't added returns `False` with probability
+of `1 - false_positive_rate`, so a negative answer is definite.
+Items can't be removed.
+
+Bits are laid out like in Redis strings (bit 0 is the most significant bit
+of the first byte), so the filter can be shared through Redis
+with `SETBIT` and `GET`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    def __init__(self, size: int, hashes: int, bits: bytes | None = None) -> None:
+        if size < 1 or hashes < 1:
+            raise ValueError("size and hashes must be greater than 0")
+        self._size = size
+        self._hashes = hashes
+        length = (size + 7) // 8
+        if bits is None:
+            self._bits = bytearray(length)
+        elif len(bits) == length:
+            self._bits = bytearray(bits)
+        else:
+            raise ValueError(f"Expected {length} bytes, got {len(bits)}")
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float) -> BloomFilter:
+        """
+        Create the smallest filter that keeps `false_positive_rate`
+        with `capacity` items added.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        size = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        hashes = max(round(size / capacity * math.log(2)), 1)
+        return cls(size, hashes)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def hashes(self) -> int:
+        return self._hashes
+
+    def positions(self, item: str) -> list[int]:
+        """
+        Get positions of bits set for the item.
+        """
+        # Double hashing: k positions from two independent 64-bit hashes
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self._size for i in range(self._hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self.positions(item):
+            self._bits[position >> 3] |= 0x80 >> (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (0x80 >> (position & 7))
+            for position in self.positions(item)
+        )
+
+    def estimated_false_positive_rate(self) -> float:
+        """
+        Estimate false positive rate from the share of set bits.
+        """
+        set_bits = sum(byte.bit_count() for byte in self._bits)
+        return (set_bits / self._size) ** self._hashes
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._bits)
@@ -0,0 +1,92 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+    max_size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return round(self.hits / total, 4)
+
+
+class TTLCache(Generic[K, V]):
+    """
+    In-memory LRU cache with per-entry time to live.
+    When the cache is full, the least recently used entry is evicted.
+    Not thread-safe, it's intended to be used from one event loop.
+    """
+
+    def __init__(
+        self, max_size: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be greater than 0")
+        self._max_size = max_size
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: K) -> V:
+        """
+        Get a value by key.
+
+        :raises KeyError: if value not exists or expired.
+        """
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            raise
+        if expires_at <= self._clock():
+            del self._data[key]
+            self._expirations += 1
+            self._misses += 1
+            raise KeyError(key)
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float) -> None:
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def delete(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            size=len(self._data),
+            max_size=self._max_size,
+        )
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from picodi import Provide, inject
+
+from picodi_app.data_access.gazetteer import read_code_names, read_geonames, write_index
+from picodi_app.deps import cli_registry, get_option
+
+
+@cli_registry.lifespan()
+@inject
+def build_index(
+    source: str,
+    output: str | None = None,
+    min_population: int = 0,
+    countries_path: str | None = None,
+    admin1_path: str | None = None,
+    default_output: str = Provide(get_option(lambda s: s.geocoder.index_path)),
+) -> int:
+    countries = _read_code_names(countries_path, name_column=4)
+    admin1 = _read_code_names(admin1_path, name_column=1)
+    output = output or default_output
+
+    # Write to a temporary file and then replace the old index,
+    #   so running workers that mapped the old index aren't affected
+    tmp_output = f"{output}.tmp"
+    with (
+        open(source, encoding="utf-8") as source_file,
+        open(tmp_output, "wb") as output_file,
+    ):
+        records = read_geonames(
+            source_file,
+            min_population=min_population,
+            countries=countries,
+            admin1=admin1,
+        )
+        count = write_index(records, output_file)
+    os.replace(tmp_output, output)
+    return count
+
+
+def _read_code_names(path: str | None, name_column: int) -> dict[str, str]:
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as file:
+        return read_code_names(file, name_column=name_column)
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Build offline geocoder index from GeoNames dump"
+    )
+    parser.add_argument(
+        "source", type=str, help="GeoNames dump file. Example: cities500.txt"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Index file. Default: `geocoder.index_path` from settings",
+    )
+    parser.add_argument(
+        "--min-population",
+        type=int,
+        default=0,
+        help="Skip cities with population less than this value",
+    )
+    parser.add_argument(
+        "--countries",
+        type=str,
+        default=None,
+        help="GeoNames countryInfo.txt file to show country names in descriptions",
+    )
+    parser.add_argument(
+        "--admin1",
+        type=str,
+        default=None,
+        help="GeoNames admin1CodesASCII.txt file to show region names in descriptions",
+    )
+    parsed_args = parser.parse_args(args=args)
+    started_at = time.perf_counter()
+    count = build_index(
+        parsed_args.source,
+        output=parsed_args.output,
+        min_population=parsed_args.min_population,
+        countries_path=parsed_args.countries,
+        admin1_path=parsed_args.admin1,
+    )
+    print(f"Indexed {count} cities in {time.perf_counter() - started_at:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
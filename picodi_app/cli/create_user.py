@@ -6,9 +6,14 @@ from typing import TYPE_CHECKING, Any
 
 from picodi import Provide, inject
 
-from picodi_app.deps import cli_registry, get_user_repository
-from picodi_app.user import IUserRepository, User, generate_new_user_id
-from picodi_app.utils import hash_password
+from picodi_app.deps import cli_registry, get_password_hasher, get_user_repository
+from picodi_app.user import (
+    IUserRepository,
+    User,
+    UserAlreadyExistsError,
+    generate_new_user_id,
+)
+from picodi_app.utils import PasswordHasher
 from picodi_app.weather import Coordinates
 
 if TYPE_CHECKING:
@@ -26,22 +31,29 @@ async def create_user(
     password: str,
     location: Coordinates,
     user_repo: IUserRepository = Provide(get_user_repository),
+    password_hasher: PasswordHasher = Provide(get_password_hasher),
 ) -> None:
     new_user = User(
         id=generate_new_user_id(),
         email=email,
         location=location,
-        hashed_password=hash_password(password),
+        hashed_password=await password_hasher.hash_password(password),
     )
-    await user_repo.create_user(new_user)
+    try:
+        await user_repo.create_user(new_user)
+    except UserAlreadyExistsError:
+        raise SystemExit("ERROR: User with this email already exists") from None
 
 
 def _validate_location(location: str) -> tuple[float, float]:
     try:
         lat, lon = location.split(",")
-        return float(lat), float(lon)
+        latitude, longitude = float(lat), float(lon)
     except ValueError:
         raise SystemExit("ERROR: Invalid location format. Should be 'lat,lon'")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise SystemExit("ERROR: Location is out of range")
+    return latitude, longitude
 
 
 def main(args: list[str] | None = None) -> Coroutine[Any, Any, None]:
@@ -0,0 +1,289 @@
+"""
+Import users from CSV or JSONL file.
+
+Every row has `email`, `password` and `location` ("lat,lon") fields,
+CSV file must have a header. The file is read and imported in batches,
+so memory use doesn't depend on its size: passwords of a batch are hashed
+in a process pool while the previous batch is written to the database
+(one transaction or one pipeline per batch).
+
+Rows that can't be imported (invalid or with taken emails) are written
+to the rejected file as JSON lines with line number and reason,
+passwords are not written there.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING, Any, TextIO
+
+from picodi import Provide, inject
+
+from picodi_app.deps import cli_registry, get_user_repository
+from picodi_app.user import IUserRepository, User, generate_new_user_id
+from picodi_app.utils import hash_password
+from picodi_app.weather import Coordinates
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine
+
+Row = dict[str, Any] | None
+
+
+@dataclass
+class ImportStats:
+    imported: int = 0
+    rejected: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def processed(self) -> int:
+        return self.imported + self.rejected
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.started_at
+        return (
+            f"{self.processed} rows: {self.imported} imported, "
+            f"{self.rejected} rejected, {self.processed / elapsed:.1f} rows/s"
+        )
+
+
+class RejectedRows:
+    def __init__(self, file: TextIO, stats: ImportStats) -> None:
+        self._file = file
+        self._stats = stats
+
+    def add(self, line: int, email: Any, reason: str) -> None:
+        self._file.write(
+            json.dumps({"line": line, "email": email, "reason": reason}) + "\n"
+        )
+        self._stats.rejected += 1
+
+
+# Picodi Note:
+#   `alifespan` closes dependencies (e.g. the database pool) when import is done
+@cli_registry.alifespan()
+@inject
+async def import_users(
+    source: str,
+    rejected_path: str,
+    file_format: str = "csv",
+    batch_size: int = 500,
+    workers: int | None = None,
+    progress_interval: float = 5.0,
+    user_repo: IUserRepository = Provide(get_user_repository),
+) -> ImportStats:
+    workers = workers or os.cpu_count() or 1
+    stats = ImportStats()
+    reported_at = time.perf_counter()
+    # Files are read and written in small pieces between batches,
+    #   it's negligible compared to hashing
+    with (
+        open(source, encoding="utf-8", newline="") as source_file,  # noqa: ASYNC230
+        open(rejected_path, "w", encoding="utf-8") as rejected_file,  # noqa: ASYNC230
+        ProcessPoolExecutor(max_workers=workers) as executor,
+    ):
+        rejected = RejectedRows(rejected_file, stats)
+        write: asyncio.Task[None] | None = None
+        try:
+            for batch in _batched(read_rows(source_file, file_format), batch_size):
+                users, lines = await _prepare_users(batch, executor, workers, rejected)
+                # Only one batch is written while the next one is hashed
+                if write is not None:
+                    await write
+                write = asyncio.create_task(
+                    _write_users(user_repo, users, lines, rejected, stats)
+                )
+                if time.perf_counter() - reported_at >= progress_interval:
+                    print(stats.report(), flush=True)
+                    reported_at = time.perf_counter()
+            if write is not None:
+                await write
+        finally:
+            if write is not None and not write.done():
+                write.cancel()
+    print(f"Done. {stats.report()}")
+    return stats
+
+
+def read_rows(file: TextIO, file_format: str) -> Iterator[tuple[int, Row]]:
+    """
+    Read rows with their line numbers.
+    Row is `None` if the line can't be parsed.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == "jsonl":
+        for line_num, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_num, row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+
+def parse_row(row: Row) -> tuple[str, str, Coordinates]:
+    """
+    Get email, password and location from the row.
+
+    :raises ValueError: if row is invalid, message is the reason.
+    """
+    if row is None:
+        raise ValueError("Can't parse row")
+    email = row.get("email")
+    password = row.get("password")
+    location = row.get("location")
+    if not isinstance(email, str) or "@" not in email:
+        raise ValueError("Invalid email")
+    if not isinstance(password, str) or not password:
+        raise ValueError("Empty password")
+    try:
+        if not isinstance(location, str):
+            raise ValueError
+        coords = Coordinates.from_string(location)
+    except ValueError:
+        raise ValueError("Invalid location format") from None
+    if not (-90 <= coords.latitude <= 90 and -180 <= coords.longitude <= 180):
+        raise ValueError("Location is out of range")
+    return email, password, coords
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [hash_password(password) for password in passwords]
+
+
+async def _prepare_users(
+    batch: list[tuple[int, Row]],
+    executor: ProcessPoolExecutor,
+    workers: int,
+    rejected: RejectedRows,
+) -> tuple[list[User], dict[str, int]]:
+    parsed = []
+    for line, row in batch:
+        try:
+            parsed.append((line, *parse_row(row)))
+        except ValueError as e:
+            rejected.add(line, row.get("email") if row else None, str(e))
+
+    # One task per worker, so rows are sent to processes in few chunks
+    passwords = [password for _, _, password, _ in parsed]
+    chunk_size = max(math.ceil(len(passwords) / workers), 1)
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                executor, hash_passwords, passwords[start : start + chunk_size]
+            )
+            for start in range(0, len(passwords), chunk_size)
+        ]
+    )
+    hashed_passwords = [hashed for chunk in chunks for hashed in chunk]
+
+    users = [
+        User(
+            id=generate_new_user_id(),
+            email=email,
+            location=location,
+            hashed_password=hashed_password,
+        )
+        for (_, email, _, location), hashed_password in zip(
+            parsed, hashed_passwords, strict=True
+        )
+    ]
+    lines = {user.id: line for user, (line, *_) in zip(users, parsed, strict=True)}
+    return users, lines
+
+
+async def _write_users(
+    user_repo: IUserRepository,
+    users: list[User],
+    lines: dict[str, int],
+    rejected: RejectedRows,
+    stats: ImportStats,
+) -> None:
+    if not users:
+        return
+    skipped = await user_repo.create_users(users)
+    for user in skipped:
+        rejected.add(lines[user.id], user.email, "Email is already taken")
+    stats.imported += len(users) - len(skipped)
+
+
+def _batched(
+    items: Iterable[tuple[int, Row]], size: int
+) -> Iterator[list[tuple[int, Row]]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def main(args: list[str] | None = None) -> Coroutine[Any, Any, ImportStats]:
+    parser = argparse.ArgumentParser(description="Import users from CSV or JSONL")
+    parser.add_argument(
+        "source",
+        type=str,
+        help="File with `email`, `password` and `location` ('lat,lon') fields",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        default=None,
+        help="Format of the file. Default: by file extension, CSV if it's unknown",
+    )
+    parser.add_argument(
+        "--rejected",
+        type=str,
+        default=None,
+        help="File for rejected rows. Default: `<source>.rejected.jsonl`",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Rows hashed and written at once",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for password hashing. Default: number of CPUs",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between progress reports",
+    )
+    parsed_args = parser.parse_args(args=args)
+    file_format = parsed_args.format
+    if file_format is None:
+        _, extension = os.path.splitext(parsed_args.source)
+        file_format = "jsonl" if extension in (".jsonl", ".ndjson") else "csv"
+    return import_users(
+        parsed_args.source,
+        rejected_path=parsed_args.rejected or f"{parsed_args.source}.rejected.jsonl",
+        file_format=file_format,
+        batch_size=parsed_args.batch_size,
+        workers=parsed_args.workers,
+        progress_interval=parsed_args.progress_interval,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
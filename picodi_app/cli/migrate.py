@@ -1,17 +1,15 @@
-import sqlite3
-
 from picodi import Provide, inject
 
-from picodi_app.data_access.sqlite import create_tables
-from picodi_app.deps import cli_registry, get_sqlite_connection
+from picodi_app.data_access.sqlite import SqlitePool, create_tables
+from picodi_app.deps import cli_registry, get_sqlite_pool
 
 
 @cli_registry.lifespan()
 @inject
 def run_migrations(
-    sqlite_conn: sqlite3.Connection = Provide(get_sqlite_connection),
+    sqlite_pool: SqlitePool = Provide(get_sqlite_pool),
 ) -> None:
-    create_tables(sqlite_conn)
+    sqlite_pool.write_sync(create_tables)
 
 
 def main() -> None:
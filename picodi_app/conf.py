@@ -1,16 +1,54 @@
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class SqliteDatabaseSettings(BaseModel):
     db_name: str = "db.sqlite"
     create_db: bool = True
+    # Number of reader threads, each with its own connection.
+    #   Writes go through one dedicated writer connection
+    pool_size: int = 4
+    # Writes are committed in groups: writer takes all queued writes and waits
+    #   up to `write_batch_window` seconds for more, but takes at most
+    #   `write_batch_size` of them. Writes queue up while the previous group
+    #   is committed, so zero window is usually enough
+    write_batch_window: float = 0.0
+    write_batch_size: int = 100
+    # Performance profile: "durable" syncs every commit to the disk,
+    #   "balanced" syncs only on WAL checkpoints and gives more memory to page
+    #   cache and mmap, "fast" doesn't sync at all and may corrupt the database
+    #   on power loss. Fields below override single values of the profile
+    profile: Literal["durable", "balanced", "fast"] = "balanced"
+    journal_mode: (
+        Literal["wal", "delete", "truncate", "persist", "memory", "off"] | None
+    ) = None
+    synchronous: Literal["off", "normal", "full", "extra"] | None = None
+    mmap_size: int | None = None
+    # Negative value is size in KiB, positive - in pages
+    cache_size: int | None = None
+    temp_store: Literal["default", "file", "memory"] | None = None
+    busy_timeout: float | None = None
+    statement_cache_size: int | None = None
 
 
 class RedisDatabaseSettings(BaseModel):
     url: str = "redis://localhost:6379/0"
+    # Every command (or pipeline) holds a connection, when all of them are
+    #   busy commands wait up to `pool_timeout` seconds for a free one
+    max_connections: int = 50
+    pool_timeout: float = 5.0
+    socket_timeout: float | None = None
+    socket_connect_timeout: float | None = 5.0
+    # TCP keep-alive detects connections dropped by load balancers
+    #   and firewalls, probes are tuned by `keepalive_*` (OS defaults if not set)
+    socket_keepalive: bool = True
+    keepalive_idle: int | None = None
+    keepalive_interval: int | None = None
+    keepalive_count: int | None = None
+    # Idle connections are checked with PING before use after this many seconds
+    health_check_interval: float = 30.0
 
 
 class DatabaseSettings(BaseModel):
@@ -18,12 +56,207 @@ class DatabaseSettings(BaseModel):
     settings: SqliteDatabaseSettings | RedisDatabaseSettings = SqliteDatabaseSettings()
 
 
+class UserCacheSettings(BaseModel):
+    # Cache users looked up by email, most requests come from few active users
+    enabled: bool = True
+    max_size: int = 10000
+    ttl: float = 60.0
+    # TTL for unknown emails
+    negative_ttl: float = 5.0
+
+
+class EmailFilterSettings(BaseModel):
+    # Bloom filter of registered emails, lookups of unknown emails
+    #   (e.g. credential stuffing) don't touch the user storage.
+    #   Works only with Redis database: the filter is shared by workers and
+    #   processes (e.g. `create_user` command), only one of them rebuilds it
+    #   and the others load it every `sync_interval` seconds, so users created
+    #   by other processes are known after the next sync
+    enabled: bool = False
+    # Filter is resized on rebuild if there are more emails
+    capacity: int = 100_000
+    false_positive_rate: float = 0.01
+    rebuild_interval: float = 600.0
+    sync_interval: float = 10.0
+    # Filter is stored next to users, so the prefix must not contain "@"
+    key_prefix: str = Field("picodi:users:bloom:", pattern=r"^[^@]*$")
+
+
+class PasswordHashingSettings(BaseModel):
+    # Password hashing and verification run in a pool, so they don't block
+    #   the event loop. Thread pool is enough, as hashlib releases the GIL
+    executor: Literal["thread", "process"] = "thread"
+    # Number of pool workers, default is number of CPUs
+    workers: int | None = None
+    # Max number of jobs running or waiting for a worker,
+    #   requests above this are rejected with 503 Service Unavailable
+    max_pending: int = 64
+
+
+class CredentialsCacheSettings(BaseModel):
+    # Remember successfully verified Basic auth credentials for a short time,
+    #   so repeated requests skip user lookup and password verification
+    enabled: bool = True
+    ttl: float = 60.0
+    max_size: int = 10000
+
+
+class AuthTokenSettings(BaseModel):
+    # Secret for signing bearer tokens, must be the same for all workers.
+    #   If it's not set, bearer tokens are disabled
+    secret: str | None = None
+    # Token lifetime (in seconds)
+    ttl: float = 900.0
+
+
+class HttpClientSettings(BaseModel):
+    timeout: float = 5.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    # Requires `h2` package to be installed (`pip install httpx[http2]`)
+    http2: bool = False
+
+
+class LocationSettings(BaseModel):
+    # Locations are grouped into geohash cells of this many characters
+    #   for caching, request coalescing and prefetching (6 is roughly 1 km)
+    geohash_precision: int = 6
+    # Get weather for the centroid of the cell instead of exact coordinates,
+    #   so all locations in the cell get exactly the same data
+    snap_to_cell_centroid: bool = True
+
+
+class WeatherCacheSettings(BaseModel):
+    enabled: bool = True
+    max_size: int = 4096
+    # Open-Meteo updates current weather every 15 minutes
+    current_ttl: float = 300.0
+    forecast_ttl: float = 1800.0
+
+
+class RequestCoalescingSettings(BaseModel):
+    # Make only one upstream call for concurrent identical requests
+    enabled: bool = True
+
+
+class WeatherBatchingSettings(BaseModel):
+    # Send concurrent current weather lookups as one multi-location request
+    enabled: bool = False
+    # How long to wait for other lookups before sending a batch (in seconds)
+    window: float = 0.01
+    max_batch_size: int = 50
+
+
+class GeocoderSettings(BaseModel):
+    backend: Literal["open_meteo", "offline"] = "open_meteo"
+    # Index for "offline" backend.
+    #   Build it with `python -m picodi_app.cli.build_gazetteer_index`
+    index_path: str = "gazetteer.idx"
+    # Ask Open-Meteo if city is not found in the offline index
+    fallback_to_remote: bool = True
+
+
+class GeocoderCacheSettings(BaseModel):
+    enabled: bool = True
+    max_size: int = 4096
+    ttl: float = 86400.0
+    # TTL for empty results (e.g. typos in city names)
+    negative_ttl: float = 300.0
+
+
+class ResilienceSettings(BaseModel):
+    enabled: bool = True
+    # Circuit breaker opens when share of failed or slow calls
+    #   among last `window_size` calls reaches threshold
+    failure_rate_threshold: float = 0.5
+    slow_call_duration: float = 2.0
+    slow_call_rate_threshold: float = 0.5
+    window_size: int = 20
+    min_calls: int = 10
+    # How long the circuit stays open before trial call (in seconds)
+    reset_timeout: float = 30.0
+    # Older values are returned as stale and refreshed in background
+    soft_ttl: float = 300.0
+    # How long last known good values are kept (in seconds)
+    max_stale: float = 86400.0
+    max_size: int = 4096
+
+
+class RedisCacheSettings(BaseModel):
+    url: str = "redis://localhost:6379/2"
+    # Change it to invalidate all cached values (e.g. on format change)
+    key_prefix: str = "picodi:cache:v1:"
+
+
+class SqliteCacheSettings(BaseModel):
+    path: str = "weather_cache.sqlite"
+    max_entries: int = 10000
+    # How often expired entries are deleted and size cap is enforced (in seconds)
+    compaction_interval: float = 300.0
+    # How long to wait for a lock held by another process (in seconds)
+    busy_timeout: float = 5.0
+
+
+class SharedCacheSettings(BaseModel):
+    # Cache shared by worker processes in addition to in-process cache,
+    #   TTLs are taken from `weather_cache` and `geocoder_cache` settings.
+    #   "redis" is shared between hosts, "sqlite" - between workers on one host
+    backend: Literal["none", "redis", "sqlite"] = "none"
+    # Compress payloads of this size (in bytes) and bigger, 0 disables compression
+    compress_min_size: int = 512
+    compression_level: int = 6
+    redis: RedisCacheSettings = RedisCacheSettings()
+    sqlite: SqliteCacheSettings = SqliteCacheSettings()
+
+
+class WeatherPrefetchSettings(BaseModel):
+    # Every worker prefetches on its own, unless `shared_cache` is used:
+    #   then only one worker at a time refreshes it
+    enabled: bool = False
+    # Intervals should be shorter than weather cache TTLs
+    current_interval: float = 240.0
+    forecast_interval: float = 1500.0
+    forecast_days: list[int] = [1]
+    concurrency: int = 4
+    jitter: float = 10.0
+
+
+class ApiSettings(BaseModel):
+    # Encode weather responses straight from domain objects,
+    #   skipping Pydantic response models
+    fast_json_responses: bool = True
+    # Max number of locations in one batch request of current weather
+    current_weather_batch_limit: int = 100
+    # Max number of concurrent lookups for one batch request
+    current_weather_batch_concurrency: int = 10
+    # `/stats/*` endpoints expose internal counters without authentication,
+    #   enable them only if the API isn't reachable from outside
+    stats_enabled: bool = False
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         extra="ignore", env_nested_delimiter="__", env_ignore_empty=True
     )
 
     database: DatabaseSettings = DatabaseSettings()
+    user_cache: UserCacheSettings = UserCacheSettings()
+    email_filter: EmailFilterSettings = EmailFilterSettings()
+    password_hashing: PasswordHashingSettings = PasswordHashingSettings()
+    credentials_cache: CredentialsCacheSettings = CredentialsCacheSettings()
+    auth_tokens: AuthTokenSettings = AuthTokenSettings()
+    http_client: HttpClientSettings = HttpClientSettings()
+    locations: LocationSettings = LocationSettings()
+    weather_cache: WeatherCacheSettings = WeatherCacheSettings()
+    request_coalescing: RequestCoalescingSettings = RequestCoalescingSettings()
+    weather_batching: WeatherBatchingSettings = WeatherBatchingSettings()
+    geocoder: GeocoderSettings = GeocoderSettings()
+    geocoder_cache: GeocoderCacheSettings = GeocoderCacheSettings()
+    resilience: ResilienceSettings = ResilienceSettings()
+    shared_cache: SharedCacheSettings = SharedCacheSettings()
+    weather_prefetch: WeatherPrefetchSettings = WeatherPrefetchSettings()
+    api: ApiSettings = ApiSettings()
 
 
 def parse_settings() -> Settings:
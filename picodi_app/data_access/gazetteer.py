@@ -0,0 +1,295 @@
+"""
+Offline geocoder backed by a local gazetteer.
+
+Gazetteer is a GeoNames-style TSV file (e.g. `cities500.txt` from
+https://download.geonames.org/export/dump/). It's converted to a compact
+binary index with `python -m picodi_app.cli.build_gazetteer_index`.
+
+Index layout (all numbers are little-endian):
+
+    header    | magic, number of records, number of keys
+    records   | fixed size records: latitude, longitude, population,
+              |   name and description positions in the strings section
+    keys      | fixed size keys sorted by normalized name:
+              |   key position in the strings section, record number
+    strings   | UTF-8 encoded strings
+
+Index is memory-mapped, so lookups don't read the whole file and
+the OS page cache is shared between worker processes.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from picodi_app.weather import City, Coordinates, IGeocoderClient, normalize_city_name
+
+MAGIC = b"PGZIDX01"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<ddqIHIH")
+KEY = struct.Struct("<IHI")
+
+# GeoNames columns
+_NAME = 1
+_ASCII_NAME = 2
+_LATITUDE = 4
+_LONGITUDE = 5
+_FEATURE_CLASS = 6
+_COUNTRY_CODE = 8
+_ADMIN1_CODE = 10
+_POPULATION = 14
+_COLUMNS_COUNT = 15
+
+
+class GazetteerIndexError(Exception):
+    pass
+
+
+@dataclass
+class GazetteerRecord:
+    name: str
+    ascii_name: str
+    latitude: float
+    longitude: float
+    population: int
+    description: str
+
+
+def read_geonames(
+    lines: Iterable[str],
+    min_population: int = 0,
+    countries: dict[str, str] | None = None,
+    admin1: dict[str, str] | None = None,
+) -> Iterator[GazetteerRecord]:
+    """
+    Parse populated places from GeoNames dump.
+
+    :param countries: mapping of country code to country name.
+    :param admin1: mapping of "<country code>.<admin1 code>" to admin1 name.
+    """
+    countries = countries or {}
+    admin1 = admin1 or {}
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        columns = line.rstrip("\n").split("\t")
+        if len(columns) < _COLUMNS_COUNT or columns[_FEATURE_CLASS] != "P":
+            continue
+        population = int(columns[_POPULATION] or 0)
+        if population < min_population:
+            continue
+        country_code = columns[_COUNTRY_CODE]
+        admin1_key = f"{country_code}.{columns[_ADMIN1_CODE]}"
+        description_parts = (
+            countries.get(country_code, country_code),
+            admin1.get(admin1_key, columns[_ADMIN1_CODE]),
+        )
+        yield GazetteerRecord(
+            name=columns[_NAME],
+            ascii_name=columns[_ASCII_NAME],
+            latitude=float(columns[_LATITUDE]),
+            longitude=float(columns[_LONGITUDE]),
+            population=population,
+            description="; ".join(part for part in description_parts if part),
+        )
+
+
+def read_code_names(lines: Iterable[str], name_column: int) -> dict[str, str]:
+    """
+    Read mapping of codes to names from GeoNames `countryInfo.txt`
+    (`name_column=4`) or `admin1CodesASCII.txt` (`name_column=1`).
+    """
+    result = {}
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        columns = line.rstrip("\n").split("\t")
+        if len(columns) > name_column:
+            result[columns[0]] = columns[name_column]
+    return result
+
+
+def write_index(records: Iterable[GazetteerRecord], output: BinaryIO) -> int:
+    """
+    Write gazetteer index to `output`. Returns number of written records.
+    """
+    strings = bytearray()
+    records_data = bytearray()
+    keys: list[tuple[bytes, int]] = []
+
+    def add_string(value: bytes) -> tuple[int, int]:
+        position = len(strings)
+        strings.extend(value)
+        return position, len(value)
+
+    for record_number, record in enumerate(records):
+        name_position, name_length = add_string(record.name.encode())
+        desc_position, desc_length = add_string(record.description.encode())
+        records_data.extend(
+            RECORD.pack(
+                record.latitude,
+                record.longitude,
+                record.population,
+                name_position,
+                name_length,
+                desc_position,
+                desc_length,
+            )
+        )
+        names = {
+            normalize_city_name(record.name),
+            normalize_city_name(record.ascii_name),
+        }
+        keys.extend((name.encode(), record_number) for name in names if name)
+
+    records_count = len(records_data) // RECORD.size
+    keys.sort()
+    keys_data = bytearray()
+    for key, record_number in keys:
+        key_position, key_length = add_string(key)
+        keys_data.extend(KEY.pack(key_position, key_length, record_number))
+
+    output.write(HEADER.pack(MAGIC, records_count, len(keys)))
+    output.write(records_data)
+    output.write(keys_data)
+    output.write(strings)
+    return records_count
+
+
+class GazetteerIndex:
+    """
+    Read-only memory-mapped gazetteer index.
+    """
+
+    def __init__(self, path: str, max_candidates: int = 5000) -> None:
+        """
+        :param max_candidates: max number of keys to scan for prefix lookup.
+            Short prefixes (like "a") can match a huge part of the index.
+        """
+        self._max_candidates = max_candidates
+        with open(path, "rb") as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file can't be mapped
+                raise GazetteerIndexError(f"Invalid gazetteer index: {path}") from e
+        try:
+            magic, self._records_count, self._keys_count = HEADER.unpack_from(
+                self._mmap
+            )
+        except struct.error as e:
+            self._mmap.close()
+            raise GazetteerIndexError(f"Invalid gazetteer index: {path}") from e
+        if magic != MAGIC:
+            self._mmap.close()
+            raise GazetteerIndexError(f"Invalid gazetteer index: {path}")
+        self._records_offset = HEADER.size
+        self._keys_offset = self._records_offset + self._records_count * RECORD.size
+        self._strings_offset = self._keys_offset + self._keys_count * KEY.size
+
+    def __len__(self) -> int:
+        return self._records_count
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def lookup(self, query: str, limit: int = 10) -> list[City]:
+        """
+        Find cities which names are equal to or start with `query`.
+        Exact matches go first, then prefix matches. Both groups are
+        ranked by population.
+        """
+        prefix = normalize_city_name(query).encode()
+        if not prefix:
+            return []
+
+        exact: list[tuple[int, int]] = []
+        by_prefix: list[tuple[int, int]] = []
+        seen: set[int] = set()
+        position = self._lower_bound(prefix)
+        end = min(self._keys_count, position + self._max_candidates)
+        for key_number in range(position, end):
+            key, record_number = self._read_key(key_number)
+            if not key.startswith(prefix):
+                break
+            if record_number in seen:
+                continue
+            seen.add(record_number)
+            population = self._read_population(record_number)
+            group = exact if key == prefix else by_prefix
+            group.append((-population, record_number))
+
+        ranked = sorted(exact) + sorted(by_prefix)
+        return [self._read_city(record_number) for _, record_number in ranked[:limit]]
+
+    def _lower_bound(self, prefix: bytes) -> int:
+        low, high = 0, self._keys_count
+        while low < high:
+            middle = (low + high) // 2
+            key, _ = self._read_key(middle)
+            if key < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _read_key(self, key_number: int) -> tuple[bytes, int]:
+        key_position, key_length, record_number = KEY.unpack_from(
+            self._mmap, self._keys_offset + key_number * KEY.size
+        )
+        return self._read_string(key_position, key_length), record_number
+
+    def _read_population(self, record_number: int) -> int:
+        offset = self._records_offset + record_number * RECORD.size
+        # population goes after latitude and longitude
+        (population,) = struct.unpack_from("<q", self._mmap, offset + 16)
+        return population
+
+    def _read_city(self, record_number: int) -> City:
+        (
+            latitude,
+            longitude,
+            _,
+            name_position,
+            name_length,
+            desc_position,
+            desc_length,
+        ) = RECORD.unpack_from(
+            self._mmap, self._records_offset + record_number * RECORD.size
+        )
+        return City(
+            name=self._read_string(name_position, name_length).decode(),
+            coordinates=Coordinates(latitude=latitude, longitude=longitude),
+            description=self._read_string(desc_position, desc_length).decode(),
+        )
+
+    def _read_string(self, position: int, length: int) -> bytes:
+        start = self._strings_offset + position
+        return self._mmap[start : start + length]
+
+
+class OfflineGeocoderClient(IGeocoderClient):
+    """
+    Geocoder client that looks up cities in the local gazetteer index.
+    If nothing is found and `fallback` client is passed,
+    the lookup is repeated with the fallback client.
+    """
+
+    def __init__(
+        self,
+        index: GazetteerIndex,
+        fallback: IGeocoderClient | None = None,
+        limit: int = 10,
+    ) -> None:
+        self._index = index
+        self._fallback = fallback
+        self._limit = limit
+
+    async def get_coordinates_by_city(self, city: str) -> list[City]:
+        results = self._index.lookup(city, limit=self._limit)
+        if not results and self._fallback is not None:
+            return await self._fallback.get_coordinates_by_city(city)
+        return results
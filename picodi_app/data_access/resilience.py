@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, TypeVar
+
+from picodi_app.cache import TTLCache
+from picodi_app.weather import (
+    CantGetDataError,
+    City,
+    Coordinates,
+    Forecast,
+    IGeocoderClient,
+    IWeatherClient,
+    WeatherData,
+    is_refresh_forced,
+    mark_data_as_stale,
+    normalize_city_name,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitState(Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+@dataclass
+class CircuitBreakerStats:
+    state: CircuitState
+    successes: int = 0
+    failures: int = 0
+    slow_calls: int = 0
+    rejected: int = 0
+    times_opened: int = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for calls to upstream service.
+
+    Outcomes of the last `window_size` calls are tracked. When at least
+    `min_calls` are tracked and the share of failed calls reaches
+    `failure_rate_threshold` (or the share of calls slower than
+    `slow_call_duration` reaches `slow_call_rate_threshold`),
+    the circuit opens and calls are rejected for `reset_timeout` seconds.
+    After that one trial call is allowed (half-open state): if it succeeds,
+    the circuit closes, otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: float = 2.0,
+        slow_call_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_rate_threshold = failure_rate_threshold
+        self._slow_call_duration = slow_call_duration
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._min_calls = min_calls
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        # (failed, slow) pairs
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CircuitState.closed
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._stats = CircuitBreakerStats(state=self._state)
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check if call to upstream is allowed. Every allowed call
+        must be followed by `record_success`, `record_failure`
+        or `record_cancelled` call.
+        """
+        if self._state is CircuitState.open:
+            if self._clock() - self._opened_at < self._reset_timeout:
+                self._stats.rejected += 1
+                return False
+            self._set_state(CircuitState.half_open)
+        if self._state is CircuitState.half_open:
+            if self._trial_in_progress:
+                self._stats.rejected += 1
+                return False
+            self._trial_in_progress = True
+        return True
+
+    def record_success(self, duration: float) -> None:
+        slow = duration >= self._slow_call_duration
+        self._stats.successes += 1
+        self._stats.slow_calls += slow
+        if self._state is CircuitState.half_open:
+            self._trial_in_progress = False
+            if slow:
+                self._open()
+            else:
+                self._outcomes.clear()
+                self._set_state(CircuitState.closed)
+            return
+        self._outcomes.append((False, slow))
+        self._check_thresholds()
+
+    def record_failure(self) -> None:
+        self._stats.failures += 1
+        if self._state is CircuitState.half_open:
+            self._trial_in_progress = False
+            self._open()
+            return
+        self._outcomes.append((True, False))
+        self._check_thresholds()
+
+    def record_cancelled(self) -> None:
+        self._trial_in_progress = False
+
+    def stats(self) -> CircuitBreakerStats:
+        return CircuitBreakerStats(**vars(self._stats))
+
+    def _check_thresholds(self) -> None:
+        if self._state is not CircuitState.closed:
+            return
+        calls = len(self._outcomes)
+        if calls < self._min_calls:
+            return
+        failures = sum(failed for failed, _ in self._outcomes)
+        slow_calls = sum(slow for _, slow in self._outcomes)
+        if (
+            failures / calls >= self._failure_rate_threshold
+            or slow_calls / calls >= self._slow_call_rate_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._stats.times_opened += 1
+        self._set_state(CircuitState.open)
+
+    def _set_state(self, state: CircuitState) -> None:
+        if self._state is not state:
+            logger.warning(
+                "Circuit breaker state changed: %s -> %s", self._state, state
+            )
+        self._state = state
+        self._stats.state = state
+
+
+@dataclass
+class StaleStats:
+    stale_served: int = 0
+    background_refreshes: int = 0
+    failed_refreshes: int = 0
+
+
+class StaleWhileRevalidate:
+    """
+    Keeps last known good values for `max_stale` seconds and protects
+    upstream calls with a circuit breaker.
+
+    - value younger than `soft_ttl` is returned as is;
+    - older value is returned immediately (marked as stale)
+      and refreshed in background;
+    - if the circuit is open, last known value is returned (marked as stale),
+      or `CantGetDataError` is raised right away if there is no value;
+    - inside `force_refresh` context upstream is called even for fresh value
+      (if the circuit is closed).
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        soft_ttl: float,
+        max_stale: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._breaker = breaker
+        self._soft_ttl = soft_ttl
+        self._max_stale = max_stale
+        self._clock = clock
+        self._values: TTLCache[Hashable, tuple[float, Any]] = TTLCache(
+            max_size=max_size, clock=clock
+        )
+        self._refreshing: dict[Hashable, asyncio.Task[None]] = {}
+        self._stats = StaleStats()
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    async def get(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            fetched_at, value = self._values.get(key)
+        except KeyError:
+            if not self._breaker.allow_request():
+                raise CantGetDataError("Upstream is unavailable") from None
+            return await self._call(key, fn)
+
+        if is_refresh_forced() and self._breaker.allow_request():
+            return await self._call(key, fn)
+        if self._clock() - fetched_at < self._soft_ttl:
+            return value
+        if key not in self._refreshing and self._breaker.allow_request():
+            self._refresh_in_background(key, fn)
+        self._stats.stale_served += 1
+        mark_data_as_stale()
+        return value
+
+    def stats(self) -> StaleStats:
+        return StaleStats(**vars(self._stats))
+
+    async def close(self) -> None:
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _call(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        started_at = self._clock()
+        try:
+            value = await fn()
+        except Exception:
+            self._breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            self._breaker.record_cancelled()
+            raise
+        self._breaker.record_success(self._clock() - started_at)
+        self._values.set(key, (self._clock(), value), ttl=self._max_stale)
+        return value
+
+    def _refresh_in_background(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> None:
+        self._stats.background_refreshes += 1
+        task = asyncio.create_task(self._refresh(key, fn))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self._call(key, fn)
+        except Exception:  # noqa: PIE786
+            # Nobody awaits background refreshes, so any error is only counted
+            #   and logged, stale value is kept till the next refresh
+            self._stats.failed_refreshes += 1
+            logger.warning("Can't refresh stale value for %s", key, exc_info=True)
+
+
+class ResilientWeatherClient(IWeatherClient):
+    def __init__(
+        self,
+        client: IWeatherClient,
+        swr: StaleWhileRevalidate,
+        geohash_precision: int,
+    ) -> None:
+        self._client = client
+        self._swr = swr
+        self._geohash_precision = geohash_precision
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        return await self._swr.get(
+            ("current", coords.geohash(self._geohash_precision)),
+            lambda: self._client.get_current_weather(coords),
+        )
+
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
+        return await self._swr.get(
+            ("forecast", coords.geohash(self._geohash_precision), days),
+            lambda: self._client.get_forecast(coords, days=days),
+        )
+
+
+class ResilientGeocoderClient(IGeocoderClient):
+    def __init__(self, client: IGeocoderClient, swr: StaleWhileRevalidate) -> None:
+        self._client = client
+        self._swr = swr
+
+    async def get_coordinates_by_city(self, city: str) -> list[City]:
+        key = normalize_city_name(city)
+        if not key:
+            return []
+        return await self._swr.get(
+            key, lambda: self._client.get_coordinates_by_city(city)
+        )
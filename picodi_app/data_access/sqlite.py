@@ -1,4 +1,22 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
 import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Concatenate, ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+P = ParamSpec("P")
 
 
 def create_tables(conn: sqlite3.Connection) -> None:
@@ -12,4 +30,363 @@ def create_tables(conn: sqlite3.Connection) -> None:
         )
         """
     )
+
+
+def create_cache_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS weather_cache (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS weather_cache_expires_at"
+        " ON weather_cache (expires_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS weather_cache_accessed_at"
+        " ON weather_cache (accessed_at)"
+    )
     conn.commit()
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """
+    Performance settings applied to every connection of the pool.
+    Meaning of the values is described in https://www.sqlite.org/pragma.html
+    """
+
+    journal_mode: str = "wal"
+    synchronous: str = "full"
+    # Bytes of the database file read through memory mapping
+    mmap_size: int = 0
+    # Negative value is size of the page cache in KiB, positive - in pages
+    cache_size: int = -2000
+    temp_store: str = "default"
+    # Seconds to wait for a lock held by another connection
+    busy_timeout: float = 5.0
+    # Number of prepared statements kept by every connection
+    statement_cache_size: int = 128
+
+
+SQLITE_PROFILES = {
+    # SQLite defaults (except WAL): every commit is synced to the disk
+    "durable": SqliteProfile(),
+    # In WAL mode commits aren't synced until checkpoint, they survive
+    #   crash of the app, but the last ones may be lost on power loss
+    "balanced": SqliteProfile(
+        synchronous="normal",
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64 * 1024,
+        temp_store="memory",
+        statement_cache_size=256,
+    ),
+    # Nothing is synced, OS crash or power loss may corrupt the database
+    "fast": SqliteProfile(
+        synchronous="off",
+        mmap_size=1024 * 1024 * 1024,
+        cache_size=-256 * 1024,
+        temp_store="memory",
+        statement_cache_size=512,
+    ),
+}
+
+_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "mmap_size",
+    "cache_size",
+    "temp_store",
+    "busy_timeout",
+)
+
+
+@dataclass
+class WriteStats:
+    commits: int = 0
+    writes: int = 0
+    failed_writes: int = 0
+    largest_batch: int = 0
+
+
+@dataclass
+class _WriteJob:
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    future: Future[Any]
+
+
+class SqlitePool:
+    """
+    SQLite connections for concurrent use from the event loop.
+
+    Reads run in a pool of `size` threads, every thread has its own
+    connection, so reads don't wait for each other. File databases are
+    opened in journal mode of the `profile` (WAL by default), so readers
+    don't block the writer and see the last committed data.
+
+    Writes are queued to one dedicated writer thread with its own connection
+    (SQLite allows only one writer at a time anyway) and committed in groups:
+    the writer takes all queued writes, waiting up to `batch_window` seconds
+    for more (but not more than `max_batch_size`), and runs them in one
+    transaction with one commit. Every write runs in its own savepoint,
+    so a failed write is rolled back alone and only its caller gets the error.
+    Callers get results after the commit.
+
+    In-memory database is opened with "memdb" VFS, so all connections
+    of the pool see the same database. It lives while the pool is open.
+    It has no WAL, so readers wait (up to `busy_timeout` of the profile)
+    while the writer holds a transaction and never see uncommitted changes.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        size: int,
+        profile: SqliteProfile = SQLITE_PROFILES["durable"],
+        batch_window: float = 0.0,
+        max_batch_size: int = 100,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be greater than 0")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        self._uri = database == ":memory:"
+        if self._uri:
+            database = f"file:/picodi-{uuid.uuid4().hex}?vfs=memdb"
+        self._database = database
+        self._profile = profile
+        self._batch_window = batch_window
+        self._max_batch_size = max_batch_size
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._local = threading.local()
+        # Writer is opened first: it switches journal mode of file database
+        #   and keeps in-memory database alive
+        self._writer = self._connect()
+        if not self._uri:
+            self._writer.execute(f"PRAGMA journal_mode={profile.journal_mode}")
+        self._write_queue: queue.SimpleQueue[_WriteJob | None] = queue.SimpleQueue()
+        # Closing and queueing of writes are serialized,
+        #   so no write is queued after the stop signal of the writer
+        self._write_queue_lock = threading.Lock()
+        self._write_stats = WriteStats()
+        self._writer_thread = threading.Thread(
+            target=self._run_writer, name="sqlite-writer", daemon=True
+        )
+        self._writer_thread.start()
+        self._reader_executor = ThreadPoolExecutor(
+            max_workers=size,
+            thread_name_prefix="sqlite-reader",
+            initializer=self._open_reader,
+        )
+        self._closed = False
+
+    async def read(
+        self,
+        fn: Callable[Concatenate[sqlite3.Connection, P], T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        Run `fn` with read connection of a reader thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._reader_executor, partial(self._read, fn, *args, **kwargs)
+        )
+
+    async def write(
+        self,
+        fn: Callable[Concatenate[sqlite3.Connection, P], T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        Run `fn` with the writer connection in a transaction.
+        Changes of `fn` are committed if it succeeds and rolled back
+        otherwise, `fn` must not commit or roll back itself.
+        """
+        return await asyncio.wrap_future(self._submit_write(fn, *args, **kwargs))
+
+    def read_sync(
+        self,
+        fn: Callable[Concatenate[sqlite3.Connection, P], T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        Same as `read`, but blocks the calling thread (e.g. in CLI commands).
+        """
+        return self._reader_executor.submit(
+            partial(self._read, fn, *args, **kwargs)
+        ).result()
+
+    def write_sync(
+        self,
+        fn: Callable[Concatenate[sqlite3.Connection, P], T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        Same as `write`, but blocks the calling thread (e.g. in CLI commands).
+        """
+        return self._submit_write(fn, *args, **kwargs).result()
+
+    @property
+    def profile(self) -> SqliteProfile:
+        return self._profile
+
+    def pragmas(self) -> dict[str, Any]:
+        """
+        Get performance settings as SQLite applied them,
+        it may ignore or limit some values (e.g. `mmap_size`).
+        """
+        return self.read_sync(_read_pragmas)
+
+    def write_stats(self) -> WriteStats:
+        return WriteStats(**vars(self._write_stats))
+
+    def close(self) -> None:
+        """
+        Wait for queued writes and close all connections.
+        """
+        with self._write_queue_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._write_queue.put(None)
+        self._writer_thread.join()
+        self._reader_executor.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def _read(
+        self,
+        fn: Callable[Concatenate[sqlite3.Connection, P], T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        return fn(self._local.conn, *args, **kwargs)
+
+    def _submit_write(
+        self,
+        fn: Callable[Concatenate[sqlite3.Connection, P], T],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> Future[T]:
+        future: Future[T] = Future()
+        with self._write_queue_lock:
+            if self._closed:
+                raise RuntimeError("Pool is closed")
+            self._write_queue.put(_WriteJob(fn, args, kwargs, future))
+        return future
+
+    def _run_writer(self) -> None:
+        stopping = False
+        while not stopping:
+            job = self._write_queue.get()
+            if job is None:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self._batch_window
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        job = self._write_queue.get(timeout=timeout)
+                    else:
+                        job = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._commit(batch)
+
+    def _commit(self, batch: list[_WriteJob]) -> None:
+        # Writes cancelled by their callers are skipped
+        jobs = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        if not jobs:
+            return
+        conn = self._writer
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            results = [(job, self._run_in_savepoint(conn, job)) for job in jobs]
+            conn.execute("COMMIT")
+        except Exception as e:  # noqa: PIE786
+            # Whole transaction failed (e.g. database is locked or disk is full)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning("Can't commit %s SQLite writes", len(jobs), exc_info=True)
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+        self._write_stats.commits += 1
+        self._write_stats.largest_batch = max(
+            self._write_stats.largest_batch, len(jobs)
+        )
+        for job, result in results:
+            if not job.future.done():
+                self._write_stats.writes += 1
+                job.future.set_result(result)
+
+    def _run_in_savepoint(self, conn: sqlite3.Connection, job: _WriteJob) -> Any:
+        """
+        Run the write, on error roll back only its changes and pass
+        the error to its caller.
+        """
+        conn.execute("SAVEPOINT write")
+        try:
+            result = job.fn(conn, *job.args, **job.kwargs)
+        except Exception as e:  # noqa: PIE786
+            conn.execute("ROLLBACK TO write")
+            conn.execute("RELEASE write")
+            self._write_stats.failed_writes += 1
+            job.future.set_exception(e)
+            return None
+        conn.execute("RELEASE write")
+        return result
+
+    def _open_reader(self) -> None:
+        self._local.conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are used only by their threads, but closed by `close`.
+        #   Autocommit mode: transactions are controlled explicitly
+        profile = self._profile
+        conn = sqlite3.connect(
+            self._database,
+            timeout=profile.busy_timeout,
+            uri=self._uri,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=profile.statement_cache_size,
+        )
+        conn.execute(f"PRAGMA synchronous={profile.synchronous}")
+        conn.execute(f"PRAGMA mmap_size={int(profile.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size={int(profile.cache_size)}")
+        conn.execute(f"PRAGMA temp_store={profile.temp_store}")
+        with self._connections_lock:
+            self._connections.append(conn)
+        logger.debug("Opened SQLite connection to %s", self._database)
+        return conn
+
+
+def _read_pragmas(conn: sqlite3.Connection) -> dict[str, Any]:
+    pragmas = {}
+    for name in _PRAGMAS:
+        # Some pragmas return nothing, e.g. `mmap_size` for in-memory database
+        row = conn.execute(f"PRAGMA {name}").fetchone()
+        pragmas[name] = row[0] if row is not None else None
+    return pragmas
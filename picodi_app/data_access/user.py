@@ -1,12 +1,26 @@
+import fnmatch
 import sqlite3
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable, Sequence
 
 from redis import asyncio as aioredis
 
-from picodi_app.user import IUserRepository, User
-from picodi_app.utils import sync_to_async
+from picodi_app.data_access.sqlite import SqlitePool
+from picodi_app.user import IUserRepository, User, UserAlreadyExistsError
+from picodi_app.utils import rewrite_error
 from picodi_app.weather import Coordinates
 
+# Users are stored by email keys, other keys in the database (e.g. email filter)
+#   must not contain "@", so they are never taken for users
+USER_KEY_PATTERN = "*@*"
+
+
+def _is_user_key(key: str) -> bool:
+    return fnmatch.fnmatchcase(key, USER_KEY_PATTERN)
+
+
+# SQLite older than 3.32 limits number of query parameters to 999
+MAX_QUERY_PARAMETERS = 999
+
 
 def user_deserializer(row: tuple) -> User:
     id, email, location, hashed_password = row
@@ -25,17 +39,47 @@ def user_serializer(user: User) -> tuple[str, ...]:
 class SqliteUserRepository(IUserRepository):
     def __init__(
         self,
-        conn: sqlite3.Connection,
+        pool: SqlitePool,
         deserializer: Callable[[tuple], User] = user_deserializer,
         serializer: Callable[[User], tuple] = user_serializer,
     ) -> None:
-        self._conn = conn
+        self._pool = pool
         self._deserializer = deserializer
         self._serializer = serializer
 
-    @sync_to_async
-    def get_user_by_email(self, email: str) -> User | None:
-        cursor = self._conn.execute(
+    async def get_user_by_email(self, email: str) -> User | None:
+        return await self._pool.read(self._get_user_by_email, email)
+
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        return await self._pool.read(self._get_users_by_emails, emails)
+
+    async def create_user(self, user: User) -> None:
+        # Only `email` column is unique besides random `id`
+        async with rewrite_error(
+            sqlite3.IntegrityError,
+            new_error=UserAlreadyExistsError(f"User {user.email} already exists"),
+        ):
+            await self._pool.write(self._create_user, user)
+
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        return await self._pool.write(self._create_users, users)
+
+    async def get_locations(self) -> list[Coordinates]:
+        return await self._pool.read(self._get_locations)
+
+    async def iter_emails(self, batch_size: int = 1000) -> AsyncIterator[str]:
+        # Emails are read in batches, so a reader isn't blocked
+        #   for the whole scan and all emails aren't loaded into memory
+        last_email = ""
+        while emails := await self._pool.read(
+            self._get_emails_after, last_email, batch_size
+        ):
+            for email in emails:
+                yield email
+            last_email = emails[-1]
+
+    def _get_user_by_email(self, conn: sqlite3.Connection, email: str) -> User | None:
+        cursor = conn.execute(
             "SELECT id, email, location, hashed_password FROM users WHERE email = ?",
             (email,),
         )
@@ -44,16 +88,67 @@ class SqliteUserRepository(IUserRepository):
             return self._deserializer(user)
         return None
 
-    @sync_to_async
-    def create_user(self, user: User) -> None:
-        self._conn.execute(
+    def _create_user(self, conn: sqlite3.Connection, user: User) -> None:
+        conn.execute(
             (
                 "INSERT INTO users (id, email, location, hashed_password) "
                 "VALUES (?, ?, ?, ?)"
             ),
             self._serializer(user),
         )
-        self._conn.commit()
+
+    def _get_users_by_emails(
+        self, conn: sqlite3.Connection, emails: Sequence[str]
+    ) -> dict[str, User]:
+        users = {}
+        for start in range(0, len(emails), MAX_QUERY_PARAMETERS):
+            batch = emails[start : start + MAX_QUERY_PARAMETERS]
+            placeholders = ", ".join("?" * len(batch))
+            # Only placeholders are formatted into the query
+            query = (
+                "SELECT id, email, location, hashed_password FROM users"
+                " WHERE email IN ({})"
+            )
+            for row in conn.execute(query.format(placeholders), batch):
+                user = self._deserializer(row)
+                users[user.email] = user
+        return users
+
+    def _create_users(
+        self, conn: sqlite3.Connection, users: Sequence[User]
+    ) -> list[User]:
+        # Taken emails are looked up in the same transaction as inserts,
+        #   so they can't be taken in between
+        taken = set(self._get_users_by_emails(conn, [user.email for user in users]))
+        new_users = []
+        skipped = []
+        for user in users:
+            if user.email in taken:
+                skipped.append(user)
+            else:
+                taken.add(user.email)
+                new_users.append(user)
+        conn.executemany(
+            (
+                "INSERT INTO users (id, email, location, hashed_password) "
+                "VALUES (?, ?, ?, ?)"
+            ),
+            map(self._serializer, new_users),
+        )
+        return skipped
+
+    def _get_locations(self, conn: sqlite3.Connection) -> list[Coordinates]:
+        cursor = conn.execute("SELECT DISTINCT location FROM users")
+        return [Coordinates.from_string(location) for (location,) in cursor]
+
+    def _get_emails_after(
+        self, conn: sqlite3.Connection, email: str, limit: int
+    ) -> list[str]:
+        cursor = conn.execute(
+            "SELECT email FROM users WHERE email > ? ORDER BY email LIMIT ?",
+            (email, limit),
+        )
+        return [email for (email,) in cursor]
 
 
 class RedisUserRepository(IUserRepository):
@@ -68,11 +163,60 @@ class RedisUserRepository(IUserRepository):
         self._serializer = serializer
 
     async def get_user_by_email(self, email: str) -> User | None:
+        if not _is_user_key(email):
+            return None
         user = await self._client.get(email)
         if user:
             user_row = user.split(";;")
             return self._deserializer(user_row)
         return None
 
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        emails = [email for email in dict.fromkeys(emails) if _is_user_key(email)]
+        if not emails:
+            return {}
+        users = {}
+        for email, user in zip(emails, await self._client.mget(emails), strict=True):
+            if user:
+                users[email] = self._deserializer(user.split(";;"))
+        return users
+
     async def create_user(self, user: User) -> None:
         await self._client.set(user.email, ";;".join(self._serializer(user)))
+
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        # One round trip for the whole batch, `NX` doesn't overwrite taken emails
+        async with self._client.pipeline(transaction=False) as pipe:
+            for user in users:
+                pipe.set(user.email, ";;".join(self._serializer(user)), nx=True)
+            created = await pipe.execute()
+        return [user for user, ok in zip(users, created, strict=True) if not ok]
+
+    async def get_locations(self, batch_size: int = 500) -> list[Coordinates]:
+        locations = set()
+        batch: list[str] = []
+        async for key in self._client.scan_iter(
+            match=USER_KEY_PATTERN, count=batch_size
+        ):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                locations.update(await self._get_locations(batch))
+                batch = []
+        if batch:
+            locations.update(await self._get_locations(batch))
+        return list(locations)
+
+    async def iter_emails(self, batch_size: int = 500) -> AsyncIterator[str]:
+        async for key in self._client.scan_iter(
+            match=USER_KEY_PATTERN, count=batch_size
+        ):
+            yield key
+
+    async def _get_locations(self, keys: list[str]) -> list[Coordinates]:
+        locations = []
+        for user in await self._client.mget(keys):
+            # Skip keys that are not users
+            user_row = user.split(";;") if isinstance(user, str) else []
+            if len(user_row) == 4:
+                locations.append(self._deserializer(tuple(user_row)).location)
+        return locations
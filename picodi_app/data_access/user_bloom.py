@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from picodi_app.bloom import BloomFilter
+from picodi_app.user import IUserRepository, User
+
+if TYPE_CHECKING:
+    from picodi_app.weather import Coordinates
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmailFilterStats:
+    ready: bool = False
+    rejected: int = 0
+    passed: int = 0
+    rebuilds: int = 0
+    syncs: int = 0
+    emails: int = 0
+    size: int = 0
+    hashes: int = 0
+    estimated_false_positive_rate: float = 0.0
+    last_rebuild_duration: float = 0.0
+
+
+class RedisEmailFilterStore:
+    """
+    Keeps Bloom filter of emails in Redis, so it's shared by workers
+    and updated by every process that creates users.
+
+    Bits of the filter are stored in `<prefix>bits:<size>:<hashes>` key,
+    `<prefix>current` key points to it and keeps number of emails.
+    Client must not decode responses, bits are raw bytes.
+    """
+
+    def __init__(self, redis_client: aioredis.Redis, key_prefix: str) -> None:
+        self._client = redis_client
+        self._key_prefix = key_prefix
+
+    async def load(self) -> tuple[BloomFilter, int] | None:
+        """
+        Get the filter and number of emails in it.
+        """
+        current = await self._client.get(self._key_prefix + "current")
+        if current is None:
+            return None
+        size, hashes, emails = map(int, current.split(b":"))
+        bits = await self._client.get(self._bits_key(size, hashes))
+        if bits is None:
+            return None
+        # `SETBIT` could extend the string only up to the set bit
+        bits = bits.ljust((size + 7) // 8, b"\0")
+        return BloomFilter(size, hashes, bits), emails
+
+    async def save(self, bloom: BloomFilter, emails: int) -> None:
+        key = self._bits_key(bloom.size, bloom.hashes)
+        tmp_key = f"{key}:tmp"
+        previous = await self._client.get(self._key_prefix + "current")
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(tmp_key, bloom.to_bytes())
+            # Users are never deleted, so merging keeps emails added by other
+            #   processes while the filter was being built
+            pipe.bitop("OR", key, key, tmp_key)
+            pipe.delete(tmp_key)
+            pipe.set(
+                self._key_prefix + "current",
+                f"{bloom.size}:{bloom.hashes}:{emails}",
+            )
+            await pipe.execute()
+        if previous is not None:
+            size, hashes, _ = map(int, previous.split(b":"))
+            if (size, hashes) != (bloom.size, bloom.hashes):
+                await self._client.delete(self._bits_key(size, hashes))
+
+    async def add(self, email: str) -> None:
+        await self.add_many([email])
+
+    async def add_many(self, emails: Sequence[str]) -> None:
+        current = await self._client.get(self._key_prefix + "current")
+        if current is None:
+            return
+        size, hashes, _ = map(int, current.split(b":"))
+        key = self._bits_key(size, hashes)
+        bloom = BloomFilter(size, hashes)
+        async with self._client.pipeline(transaction=False) as pipe:
+            for email in emails:
+                for position in bloom.positions(email):
+                    pipe.setbit(key, position, 1)
+            await pipe.execute()
+
+    async def acquire_rebuild_lock(self, ttl: float) -> bool:
+        """
+        Take the right to rebuild the filter for `ttl` seconds,
+        so only one worker scans the user storage.
+        """
+        return bool(
+            await self._client.set(
+                self._key_prefix + "rebuild-lock",
+                b"1",
+                nx=True,
+                px=max(int(ttl * 1000), 1),
+            )
+        )
+
+    def _bits_key(self, size: int, hashes: int) -> str:
+        return f"{self._key_prefix}bits:{size}:{hashes}"
+
+
+class EmailFilter:
+    """
+    Bloom filter of registered emails. Lookups of emails that are
+    definitely not registered (e.g. credential stuffing) are answered
+    without touching the user storage.
+
+    The filter is built from the user storage on start and rebuilt every
+    `rebuild_interval` seconds, it's sized for `capacity` emails (or twice
+    the number of emails found on the last rebuild) and `false_positive_rate`.
+    Until it's built all emails are considered registered.
+
+    With `store`, the filter is shared between workers: only one worker
+    rebuilds it, the others load it from the store every `sync_interval`
+    seconds. New emails are added to the store right away, so users created
+    by other processes are known after the next sync.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        false_positive_rate: float,
+        rebuild_interval: float,
+        sync_interval: float,
+        store: RedisEmailFilterStore | None = None,
+    ) -> None:
+        self._capacity = capacity
+        self._false_positive_rate = false_positive_rate
+        self._rebuild_interval = rebuild_interval
+        self._sync_interval = sync_interval
+        self._store = store
+        self._filter: BloomFilter | None = None
+        # Emails added while the filter is being rebuilt
+        self._added_during_rebuild: list[str] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._stats = EmailFilterStats()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def might_exist(self, email: str) -> bool:
+        if self._filter is None:
+            return True
+        if email in self._filter:
+            self._stats.passed += 1
+            return True
+        self._stats.rejected += 1
+        return False
+
+    async def add(self, email: str) -> None:
+        await self.add_many([email])
+
+    async def add_many(self, emails: Sequence[str]) -> None:
+        if self._filter is not None:
+            for email in emails:
+                self._filter.add(email)
+            self._stats.emails += len(emails)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.extend(emails)
+        if self._store is not None:
+            try:
+                await self._store.add_many(emails)
+            except RedisError:
+                logger.warning(
+                    "Can't add emails to shared filter, they will be added "
+                    "on the next rebuild",
+                    exc_info=True,
+                )
+
+    async def rebuild(self, user_repo: IUserRepository) -> None:
+        started_at = time.perf_counter()
+        capacity = max(self._capacity, self._stats.emails * 2)
+        bloom = BloomFilter.for_capacity(capacity, self._false_positive_rate)
+        self._added_during_rebuild = []
+        try:
+            emails = 0
+            async for email in user_repo.iter_emails():
+                bloom.add(email)
+                emails += 1
+            for email in self._added_during_rebuild:
+                bloom.add(email)
+        finally:
+            self._added_during_rebuild = None
+        if emails > capacity:
+            logger.warning(
+                "Email filter is sized for %s emails, but there are %s, "
+                "it will be resized on the next rebuild",
+                capacity,
+                emails,
+            )
+        self._set_filter(bloom, emails)
+        self._stats.rebuilds += 1
+        self._stats.last_rebuild_duration = time.perf_counter() - started_at
+        if self._store is not None:
+            await self._store.save(bloom, emails)
+
+    async def sync(self) -> None:
+        """
+        Load the filter from the store.
+        """
+        if self._store is None:
+            return
+        loaded = await self._store.load()
+        if loaded is not None:
+            self._set_filter(*loaded)
+            self._stats.syncs += 1
+
+    def start(self, user_repo: IUserRepository) -> None:
+        if self.running:
+            raise RuntimeError("Email filter is already running")
+        update: Callable[[], Awaitable[None]]
+        if self._store is None:
+            update = partial(self.rebuild, user_repo)
+            interval = self._rebuild_interval
+        else:
+            update = partial(self._rebuild_or_sync, self._store, user_repo)
+            interval = self._sync_interval
+        self._task = asyncio.create_task(self._run_periodically(update, interval))
+        logger.info("Started email filter (updates every %s s)", interval)
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> EmailFilterStats:
+        stats = EmailFilterStats(**vars(self._stats))
+        if self._filter is not None:
+            stats.estimated_false_positive_rate = round(
+                self._filter.estimated_false_positive_rate(), 6
+            )
+        return stats
+
+    async def _rebuild_or_sync(
+        self, store: RedisEmailFilterStore, user_repo: IUserRepository
+    ) -> None:
+        if await store.acquire_rebuild_lock(self._rebuild_interval):
+            await self.rebuild(user_repo)
+        else:
+            await self.sync()
+
+    def _set_filter(self, bloom: BloomFilter, emails: int) -> None:
+        self._filter = bloom
+        self._stats.ready = True
+        self._stats.emails = emails
+        self._stats.size = bloom.size
+        self._stats.hashes = bloom.hashes
+
+    async def _run_periodically(
+        self, fn: Callable[[], Awaitable[None]], interval: float
+    ) -> None:
+        while True:
+            try:
+                await fn()
+            except Exception:  # noqa: PIE786
+                # Filter is an optimization, it must not stop updating
+                #   because of temporary problems (e.g. with user storage)
+                logger.exception("Email filter update failed")
+            await asyncio.sleep(interval)
+
+
+class EmailFilterUserRepository(IUserRepository):
+    """
+    User repository that returns `None` for emails that are definitely
+    not registered without calling the wrapped repository.
+    """
+
+    def __init__(self, repo: IUserRepository, email_filter: EmailFilter) -> None:
+        self._repo = repo
+        self._email_filter = email_filter
+
+    async def get_user_by_email(self, email: str) -> User | None:
+        if not self._email_filter.might_exist(email):
+            return None
+        return await self._repo.get_user_by_email(email)
+
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        emails = [email for email in emails if self._email_filter.might_exist(email)]
+        if not emails:
+            return {}
+        return await self._repo.get_users_by_emails(emails)
+
+    async def create_user(self, user: User) -> None:
+        await self._repo.create_user(user)
+        await self._email_filter.add(user.email)
+
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        skipped = await self._repo.create_users(users)
+        # Skipped emails are already registered, adding them again is harmless
+        await self._email_filter.add_many([user.email for user in users])
+        return skipped
+
+    async def get_locations(self) -> list[Coordinates]:
+        return await self._repo.get_locations()
+
+    def iter_emails(self) -> AsyncIterator[str]:
+        return self._repo.iter_emails()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from contextlib import suppress
+from functools import partial
+from typing import TYPE_CHECKING
+
+from picodi_app.cache import TTLCache
+from picodi_app.user import IUserRepository, User
+from picodi_app.utils import SingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from picodi_app.weather import Coordinates
+
+
+class WriteCounter:
+    """
+    Number of writes made through cached repositories. It must be shared
+    by all repositories using the same cache, so a lookup racing with
+    a write made through another repository isn't cached.
+    """
+
+    def __init__(self) -> None:
+        self.value = 0
+
+
+class CachedUserRepository(IUserRepository):
+    """
+    User repository that caches users looked up by email.
+    Unknown emails are cached too, but with shorter `negative_ttl`.
+    Concurrent lookups of the same email make only one call
+    to the wrapped repository.
+
+    Entry of the user is dropped when the user is written through this
+    repository. Writes made by other processes become visible
+    when the entry expires.
+    """
+
+    def __init__(
+        self,
+        repo: IUserRepository,
+        cache: TTLCache[str, User | None],
+        single_flight: SingleFlight[str, User | None],
+        writes: WriteCounter,
+        ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        self._repo = repo
+        self._cache = cache
+        self._single_flight = single_flight
+        self._writes = writes
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+
+    async def get_user_by_email(self, email: str) -> User | None:
+        with suppress(KeyError):
+            return self._cache.get(email)
+        return await self._single_flight.do(email, partial(self._load_user, email))
+
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        users = {}
+        missed = []
+        for email in dict.fromkeys(emails):
+            try:
+                user = self._cache.get(email)
+            except KeyError:
+                missed.append(email)
+                continue
+            if user is not None:
+                users[email] = user
+        if missed:
+            writes = self._writes.value
+            loaded = await self._repo.get_users_by_emails(missed)
+            if writes == self._writes.value:
+                for email in missed:
+                    self._cache_user(email, loaded.get(email))
+            users.update(loaded)
+        return users
+
+    async def create_user(self, user: User) -> None:
+        await self._repo.create_user(user)
+        self._writes.value += 1
+        self._cache.delete(user.email)
+
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        skipped = await self._repo.create_users(users)
+        self._writes.value += 1
+        for user in users:
+            self._cache.delete(user.email)
+        return skipped
+
+    async def get_locations(self) -> list[Coordinates]:
+        return await self._repo.get_locations()
+
+    def iter_emails(self) -> AsyncIterator[str]:
+        return self._repo.iter_emails()
+
+    async def _load_user(self, email: str) -> User | None:
+        writes = self._writes.value
+        user = await self._repo.get_user_by_email(email)
+        # Lookup could read the user before a write that happened meanwhile,
+        #   don't cache possibly outdated result
+        if writes == self._writes.value:
+            self._cache_user(email, user)
+        return user
+
+    def _cache_user(self, email: str, user: User | None) -> None:
+        ttl = self._ttl if user is not None else self._negative_ttl
+        self._cache.set(email, user, ttl=ttl)
@@ -8,6 +8,7 @@ from picodi_app.weather import (
     CantGetDataError,
     City,
     Coordinates,
+    Forecast,
     IGeocoderClient,
     IWeatherClient,
     Speed,
@@ -25,27 +26,69 @@ class OpenMeteoWeatherClient(IWeatherClient):
     def __init__(self, http_client: AsyncClient) -> None:
         self._http_client = http_client
 
+    CURRENT_WEATHER_FIELDS = (
+        "temperature_2m",
+        "relative_humidity_2m",
+        "precipitation",
+        "wind_speed_10m",
+        "wind_direction_10m",
+    )
+
     @rewrite_error(
         HTTPError, new_error=CantGetDataError("Can't get current weather data")
     )
     async def get_current_weather(self, coords: Coordinates) -> WeatherData:
-        needed_data = [
-            "temperature_2m",
-            "relative_humidity_2m",
-            "precipitation",
-            "wind_speed_10m",
-            "wind_direction_10m",
-        ]
         resp = await self._http_client.get(
             f"{self.BASE_URL}/forecast",
             params={
                 "latitude": coords.latitude,
                 "longitude": coords.longitude,
-                "current": ",".join(needed_data),
+                "current": ",".join(self.CURRENT_WEATHER_FIELDS),
+            },
+        )
+        resp.raise_for_status()
+        return self._parse_current_weather(resp.json())
+
+    @rewrite_error(
+        HTTPError, new_error=CantGetDataError("Can't get current weather data")
+    )
+    async def get_current_weather_batch(
+        self, coords: list[Coordinates]
+    ) -> list[WeatherData | CantGetDataError]:
+        """
+        Get current weather for several locations with one request.
+        Results are returned in the same order as `coords`. If data for some
+        location can't be parsed, `CantGetDataError` is returned in its place.
+        """
+        resp = await self._http_client.get(
+            f"{self.BASE_URL}/forecast",
+            params={
+                "latitude": ",".join(str(item.latitude) for item in coords),
+                "longitude": ",".join(str(item.longitude) for item in coords),
+                "current": ",".join(self.CURRENT_WEATHER_FIELDS),
             },
         )
         resp.raise_for_status()
         resp_data = resp.json()
+        # Open-Meteo returns an object instead of a list for one location
+        if isinstance(resp_data, dict):
+            resp_data = [resp_data]
+        if len(resp_data) != len(coords):
+            raise CantGetDataError(
+                f"Expected {len(coords)} locations in response, got {len(resp_data)}"
+            )
+
+        results: list[WeatherData | CantGetDataError] = []
+        for item in resp_data:
+            try:
+                results.append(self._parse_current_weather(item))
+            except (KeyError, TypeError, ValueError) as e:
+                error = CantGetDataError("Can't get current weather data")
+                error.__cause__ = e
+                results.append(error)
+        return results
+
+    def _parse_current_weather(self, resp_data: dict[str, Any]) -> WeatherData:
         current_units: dict[str, str] = resp_data["current_units"]
         current_data: dict[str, Any] = resp_data["current"]
         return WeatherData(
@@ -65,9 +108,7 @@ class OpenMeteoWeatherClient(IWeatherClient):
         )
 
     @rewrite_error(HTTPError, new_error=CantGetDataError("Can't get forecast data"))
-    async def get_forecast(
-        self, coords: Coordinates, days: int
-    ) -> list[tuple[datetime, WeatherData]]:
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
         needed_data = [
             "temperature_2m",
             "relative_humidity_2m",
@@ -89,40 +130,20 @@ class OpenMeteoWeatherClient(IWeatherClient):
         hourly_units: dict[str, str] = resp_data["hourly_units"]
         hourly_data: dict[str, list[Any]] = resp_data["hourly"]
 
-        time_data = hourly_data["time"]
-        temp_data = hourly_data["temperature_2m"]
-        humidity_data = hourly_data["relative_humidity_2m"]
-        precipitation_data = hourly_data["precipitation_probability"]
-        wind_speed_data = hourly_data["wind_speed_10m"]
-        wind_direction_data = hourly_data["wind_direction_10m"]
-        ziped = zip(
-            time_data,
-            temp_data,
-            humidity_data,
-            precipitation_data,
-            wind_speed_data,
-            wind_direction_data,
+        return Forecast(
+            time=map(datetime.fromisoformat, hourly_data["time"]),
+            temperature=hourly_data["temperature_2m"],
+            temperature_unit=TemperatureUnit(hourly_units["temperature_2m"]),
+            humidity=hourly_data["relative_humidity_2m"],
+            precipitation=[
+                probability > 49
+                for probability in hourly_data["precipitation_probability"]
+            ],
+            wind_speed=hourly_data["wind_speed_10m"],
+            wind_speed_unit=SpeedUnit(hourly_units["wind_speed_10m"]),
+            wind_direction=hourly_data["wind_direction_10m"],
         )
 
-        results = []
-        for time, temp, humidity, precipitation, wind_speed, wind_direction in ziped:
-            weather_data = WeatherData(
-                temperature=Temperature(
-                    value=float(temp),
-                    unit=TemperatureUnit(hourly_units["temperature_2m"]),
-                ),
-                humidity=float(humidity),
-                precipitation=precipitation > 49,
-                wind_speed=Speed(
-                    value=float(wind_speed),
-                    unit=SpeedUnit(hourly_units["wind_speed_10m"]),
-                ),
-                wind_direction=WindDirection.from_degrees(wind_direction),
-            )
-            results.append((datetime.fromisoformat(time), weather_data))
-
-        return results
-
 
 class OpenMeteoGeocoderClient(IGeocoderClient):
     BASE_URL = "https://geocoding-api.open-meteo.com/v1"
@@ -137,7 +158,8 @@ class OpenMeteoGeocoderClient(IGeocoderClient):
             params={"name": city, "count": 10, "language": "en", "format": "json"},
         )
         resp.raise_for_status()
-        results = resp.json()["results"]
+        # Open-Meteo doesn't return "results" key if nothing found
+        results = resp.json().get("results", [])
         return [
             City(
                 name=item["name"],
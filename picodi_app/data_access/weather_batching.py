@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from httpx import HTTPStatusError
+
+from picodi_app.data_access.weather import OpenMeteoWeatherClient
+from picodi_app.weather import (
+    CantGetDataError,
+    Coordinates,
+    Forecast,
+    IWeatherClient,
+    WeatherData,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchStats:
+    batches: int = 0
+    items: int = 0
+    failed_items: int = 0
+    largest_batch_size: int = 0
+    last_batch_size: int = 0
+    last_batch_latency: float = 0.0
+    total_latency: float = 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        if not self.batches:
+            return 0.0
+        return round(self.items / self.batches, 2)
+
+    @property
+    def avg_batch_latency(self) -> float:
+        if not self.batches:
+            return 0.0
+        return round(self.total_latency / self.batches, 4)
+
+
+_Pending = tuple[Coordinates, "asyncio.Future[WeatherData]"]
+
+
+class CurrentWeatherBatcher:
+    """
+    Collects concurrent current weather lookups during `window` seconds
+    (or until `max_batch_size` lookups are collected) and sends them
+    to Open-Meteo as one multi-location request.
+    """
+
+    def __init__(
+        self,
+        client: OpenMeteoWeatherClient,
+        window: float,
+        max_batch_size: int,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        self._client = client
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._pending: list[_Pending] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._stats = BatchStats()
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[WeatherData] = loop.create_future()
+        self._pending.append((coords, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+        return await future
+
+    def stats(self) -> BatchStats:
+        return BatchStats(**vars(self._stats))
+
+    async def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, future in self._pending:
+            if not future.done():
+                future.set_exception(CantGetDataError("Batcher is closed"))
+        self._pending.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._pending:
+            batch = self._pending[: self._max_batch_size]
+            del self._pending[: self._max_batch_size]
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: list[_Pending]) -> None:
+        # Callers that were cancelled while waiting don't need a result
+        batch = [(coords, future) for coords, future in batch if not future.done()]
+        if not batch:
+            return
+
+        started_at = time.perf_counter()
+        try:
+            results = await self._fetch([coords for coords, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(CantGetDataError("Batcher is closed"))
+            raise
+        except Exception as e:  # noqa: PIE786
+            # Nobody awaits this task, so any error must be passed to callers,
+            #   otherwise they wait for their results forever
+            logger.exception("Can't send current weather batch")
+            results = [_to_error(e) for _ in batch]
+        latency = time.perf_counter() - started_at
+        failed = _set_results(batch, results)
+        self._record(len(batch), failed, latency)
+
+    async def _fetch(
+        self, coords: list[Coordinates]
+    ) -> list[WeatherData | CantGetDataError]:
+        try:
+            return await self._client.get_current_weather_batch(coords)
+        except CantGetDataError as e:
+            if len(coords) > 1 and _is_bad_request(e):
+                # Open-Meteo rejects the whole batch if one of the locations
+                #   is invalid, so we retry them one by one to isolate the bad one
+                return await self._fetch_one_by_one(coords)
+            return [_copy_error(e) for _ in coords]
+        except (KeyError, TypeError, ValueError) as e:
+            error = CantGetDataError("Can't get current weather data")
+            error.__cause__ = e
+            return [_copy_error(error) for _ in coords]
+
+    async def _fetch_one_by_one(
+        self, coords: list[Coordinates]
+    ) -> list[WeatherData | CantGetDataError]:
+        results = await asyncio.gather(
+            *[self._client.get_current_weather(item) for item in coords],
+            return_exceptions=True,
+        )
+        return [
+            result if isinstance(result, WeatherData) else _to_error(result)
+            for result in results
+        ]
+
+    def _record(self, size: int, failed: int, latency: float) -> None:
+        self._stats.batches += 1
+        self._stats.items += size
+        self._stats.failed_items += failed
+        self._stats.largest_batch_size = max(self._stats.largest_batch_size, size)
+        self._stats.last_batch_size = size
+        self._stats.last_batch_latency = latency
+        self._stats.total_latency += latency
+        logger.debug(
+            "Sent current weather batch of %s locations (%s failed) in %.3f s",
+            size,
+            failed,
+            latency,
+        )
+
+
+def _set_results(
+    batch: list[_Pending], results: list[WeatherData | CantGetDataError]
+) -> int:
+    """
+    Pass results to callers that are still waiting.
+    Returns the number of failed lookups.
+    """
+    failed = 0
+    for (_, future), result in zip(batch, results, strict=True):
+        if isinstance(result, CantGetDataError):
+            failed += 1
+        if future.done():
+            continue
+        if isinstance(result, CantGetDataError):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+    return failed
+
+
+def _is_bad_request(error: CantGetDataError) -> bool:
+    cause = error.__cause__
+    return isinstance(cause, HTTPStatusError) and cause.response.status_code == 400
+
+
+def _copy_error(error: CantGetDataError) -> CantGetDataError:
+    new_error = CantGetDataError(*error.args)
+    new_error.__cause__ = error.__cause__
+    return new_error
+
+
+def _to_error(error: BaseException) -> CantGetDataError:
+    if isinstance(error, CantGetDataError):
+        return _copy_error(error)
+    new_error = CantGetDataError("Can't get current weather data")
+    new_error.__cause__ = error
+    return new_error
+
+
+class BatchingWeatherClient(IWeatherClient):
+    """
+    Weather client that sends current weather lookups through
+    `CurrentWeatherBatcher`. Forecasts are requested with the wrapped client.
+    """
+
+    def __init__(self, client: IWeatherClient, batcher: CurrentWeatherBatcher) -> None:
+        self._client = client
+        self._batcher = batcher
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        return await self._batcher.get_current_weather(coords)
+
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
+        return await self._client.get_forecast(coords, days=days)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from collections.abc import Hashable
+from contextlib import suppress
+from typing import Any
+
+from picodi_app.cache import TTLCache
+from picodi_app.weather import (
+    City,
+    Coordinates,
+    DataFreshnessTracker,
+    Forecast,
+    IGeocoderClient,
+    IWeatherClient,
+    WeatherData,
+    is_refresh_forced,
+    limit_data_ttl,
+    mark_data_as_stale,
+    normalize_city_name,
+    track_data_freshness,
+)
+
+
+def _cache_fresh(
+    cache: TTLCache[Hashable, Any],
+    key: Hashable,
+    value: Any,
+    ttl: float,
+    freshness: DataFreshnessTracker,
+) -> None:
+    # Stale values (served by resilience layer while upstream is unavailable
+    #   or being refreshed) are not cached, so the next request gets a fresh one
+    if freshness.stale:
+        mark_data_as_stale()
+        return
+    # Value must not outlive its source (e.g. entry in shared cache)
+    if freshness.ttl is not None:
+        limit_data_ttl(freshness.ttl)
+        ttl = min(ttl, freshness.ttl)
+    cache.set(key, value, ttl=ttl)
+
+
+class CachedWeatherClient(IWeatherClient):
+    """
+    Weather client that caches results of the wrapped client.
+    Entries are keyed by geohash of `geohash_precision` characters,
+    so requests for nearby locations share the same cache entry.
+    Cached values are skipped (but updated) inside `force_refresh` context.
+    """
+
+    def __init__(
+        self,
+        client: IWeatherClient,
+        cache: TTLCache[Hashable, Any],
+        current_ttl: float,
+        forecast_ttl: float,
+        geohash_precision: int,
+    ) -> None:
+        self._client = client
+        self._cache = cache
+        self._current_ttl = current_ttl
+        self._forecast_ttl = forecast_ttl
+        self._geohash_precision = geohash_precision
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        key = ("current", coords.geohash(self._geohash_precision))
+        if not is_refresh_forced():
+            with suppress(KeyError):
+                return self._cache.get(key)
+        with track_data_freshness() as tracker:
+            weather = await self._client.get_current_weather(coords)
+        _cache_fresh(self._cache, key, weather, self._current_ttl, tracker)
+        return weather
+
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
+        key = ("forecast", coords.geohash(self._geohash_precision), days)
+        if not is_refresh_forced():
+            with suppress(KeyError):
+                return self._cache.get(key)
+        with track_data_freshness() as tracker:
+            forecast = await self._client.get_forecast(coords, days=days)
+        _cache_fresh(self._cache, key, forecast, self._forecast_ttl, tracker)
+        return forecast
+
+
+class CachedGeocoderClient(IGeocoderClient):
+    """
+    Geocoder client that caches results of the wrapped client.
+    City names are normalized before lookup, so "Kraków", "krakow"
+    and " KRAKOW " share the same cache entry.
+    Empty results are cached too, but with shorter `negative_ttl`.
+    """
+
+    def __init__(
+        self,
+        client: IGeocoderClient,
+        cache: TTLCache[Hashable, Any],
+        ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        self._client = client
+        self._cache = cache
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+
+    async def get_coordinates_by_city(self, city: str) -> list[City]:
+        key = normalize_city_name(city)
+        if not key:
+            return []
+        with suppress(KeyError):
+            return self._cache.get(key)
+        # Upstream gets original spelling (only with extra whitespace removed),
+        #   it can use diacritics to rank results
+        with track_data_freshness() as tracker:
+            results = await self._client.get_coordinates_by_city(" ".join(city.split()))
+        ttl = self._ttl if results else self._negative_ttl
+        _cache_fresh(self._cache, key, results, ttl, tracker)
+        return results
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from picodi_app.utils import SingleFlight
+from picodi_app.weather import (
+    CantGetDataError,
+    City,
+    Coordinates,
+    Forecast,
+    IGeocoderClient,
+    IWeatherClient,
+    WeatherData,
+)
+
+T = TypeVar("T")
+
+
+async def _coalesce(
+    single_flight: SingleFlight[Hashable, Any],
+    key: Hashable,
+    fn: Callable[[], Awaitable[T]],
+    error_message: str,
+) -> T:
+    # Every waiter gets its own error instance,
+    #   because the same exception can't be safely raised in several tasks
+    try:
+        return await single_flight.do(key, fn)
+    except CantGetDataError as e:
+        raise CantGetDataError(*e.args) from e
+    except Exception as e:
+        raise CantGetDataError(error_message) from e
+
+
+class CoalescingWeatherClient(IWeatherClient):
+    """
+    Weather client that makes only one upstream call for concurrent
+    requests for the same location cell (geohash of `geohash_precision`
+    characters, same as cache keys).
+    """
+
+    def __init__(
+        self,
+        client: IWeatherClient,
+        single_flight: SingleFlight[Hashable, Any],
+        geohash_precision: int,
+    ) -> None:
+        self._client = client
+        self._single_flight = single_flight
+        self._geohash_precision = geohash_precision
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        return await _coalesce(
+            self._single_flight,
+            key=("current", coords.geohash(self._geohash_precision)),
+            fn=lambda: self._client.get_current_weather(coords),
+            error_message="Can't get current weather data",
+        )
+
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
+        return await _coalesce(
+            self._single_flight,
+            key=("forecast", coords.geohash(self._geohash_precision), days),
+            fn=lambda: self._client.get_forecast(coords, days=days),
+            error_message="Can't get forecast data",
+        )
+
+
+class CoalescingGeocoderClient(IGeocoderClient):
+    """
+    Geocoder client that makes only one upstream call for concurrent
+    requests with the same city name.
+    """
+
+    def __init__(
+        self, client: IGeocoderClient, single_flight: SingleFlight[Hashable, Any]
+    ) -> None:
+        self._client = client
+        self._single_flight = single_flight
+
+    async def get_coordinates_by_city(self, city: str) -> list[City]:
+        return await _coalesce(
+            self._single_flight,
+            key=("geocode", city),
+            fn=lambda: self._client.get_coordinates_by_city(city),
+            error_message="Can't get coordinates",
+        )
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Sequence,
+)
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from picodi_app.user import IUserRepository, User
+from picodi_app.weather import (
+    CantGetDataError,
+    Coordinates,
+    IWeatherClient,
+    force_refresh,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PrefetchStats:
+    runs: int = 0
+    cells: int = 0
+    refreshed: int = 0
+    failed: int = 0
+    warmed: int = 0
+    # Runs left to another process holding the lock
+    skipped: int = 0
+    last_run_duration: float = 0.0
+
+
+class WeatherPrefetcher:
+    """
+    Keeps weather for users' locations warm in the weather cache,
+    so authenticated users almost never wait for upstream.
+
+    Locations are walked every `current_interval` seconds for current weather
+    and every `forecast_interval` seconds for forecasts (intervals should be
+    shorter than cache TTLs). Locations are deduplicated by geohash cells
+    of `geohash_precision` characters (same as cache keys), weather is
+    refreshed for cell centroids with at most `concurrency` concurrent
+    upstream calls.
+    Every refresh is delayed by random jitter up to `jitter` seconds,
+    so refreshes don't hit upstream all at once.
+
+    With `lock` (e.g. of the shared cache) every run is done only by the
+    process that takes the lock, refreshed values are written through
+    the shared cache, so other processes get them from there.
+    Locations of new users are warmed only if they aren't cached yet.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Awaitable[IWeatherClient]],
+        current_interval: float,
+        forecast_interval: float,
+        forecast_days: Sequence[int],
+        concurrency: int,
+        jitter: float,
+        geohash_precision: int,
+    ) -> None:
+        self._client_factory = client_factory
+        self._current_interval = current_interval
+        self._forecast_interval = forecast_interval
+        self._forecast_days = forecast_days
+        self._jitter = jitter
+        self._geohash_precision = geohash_precision
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._user_repo: IUserRepository | None = None
+        self._lock: Callable[[str, float], Awaitable[bool]] | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._stats = PrefetchStats()
+
+    @property
+    def running(self) -> bool:
+        return self._user_repo is not None
+
+    def start(
+        self,
+        user_repo: IUserRepository,
+        lock: Callable[[str, float], Awaitable[bool]] | None = None,
+    ) -> None:
+        """
+        :param lock: takes lock by name for given number of seconds,
+            returns `False` if it's held by another process.
+        """
+        if self.running:
+            raise RuntimeError("Prefetcher is already running")
+        self._user_repo = user_repo
+        self._lock = lock
+        self._spawn(
+            self._run_periodically(
+                "prefetch:current",
+                self.prefetch_current_weather,
+                self._current_interval,
+            )
+        )
+        self._spawn(
+            self._run_periodically(
+                "prefetch:forecasts", self.prefetch_forecasts, self._forecast_interval
+            )
+        )
+        logger.info(
+            "Started weather prefetcher (current weather every %s s, "
+            "forecasts every %s s)",
+            self._current_interval,
+            self._forecast_interval,
+        )
+
+    async def close(self) -> None:
+        self._user_repo = None
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> PrefetchStats:
+        return PrefetchStats(**vars(self._stats))
+
+    def warm(self, coords: Coordinates) -> None:
+        """
+        Refresh weather for the cell of `coords` in background.
+        Does nothing if prefetcher is not running.
+        """
+        if not self.running:
+            return
+        cell = self._cell(coords)
+        if cell is None:
+            return
+        self._stats.warmed += 1
+        self._spawn(self._warm(cell))
+
+    async def prefetch_current_weather(self) -> None:
+        cells = await self._get_cells()
+        client = await self._client_factory()
+        await asyncio.gather(
+            *[
+                self._refresh(partial(client.get_current_weather, cell))
+                for cell in cells
+            ]
+        )
+
+    async def prefetch_forecasts(self) -> None:
+        cells = await self._get_cells()
+        client = await self._client_factory()
+        await asyncio.gather(
+            *[
+                self._refresh(partial(client.get_forecast, cell, days=days))
+                for cell in cells
+                for days in self._forecast_days
+            ]
+        )
+
+    async def _warm(self, cell: Coordinates) -> None:
+        # Cached values are fresh enough for a new user,
+        #   so upstream is called only for cells that aren't cached yet
+        client = await self._client_factory()
+        await asyncio.gather(
+            self._refresh(
+                partial(client.get_current_weather, cell), jitter=False, force=False
+            ),
+            *[
+                self._refresh(
+                    partial(client.get_forecast, cell, days=days),
+                    jitter=False,
+                    force=False,
+                )
+                for days in self._forecast_days
+            ],
+        )
+
+    async def _get_cells(self) -> set[Coordinates]:
+        if self._user_repo is None:
+            return set()
+        locations = await self._user_repo.get_locations()
+        cells = {
+            cell for location in locations if (cell := self._cell(location)) is not None
+        }
+        self._stats.cells = len(cells)
+        return cells
+
+    def _cell(self, coords: Coordinates) -> Coordinates | None:
+        try:
+            return coords.snapped(self._geohash_precision)
+        except ValueError:
+            # Invalid location of one user must not stop prefetching for others
+            logger.warning("Skipping invalid location %s", coords)
+            return None
+
+    async def _refresh(
+        self,
+        fn: Callable[[], Awaitable[object]],
+        jitter: bool = True,
+        force: bool = True,
+    ) -> None:
+        if jitter and self._jitter:
+            # Jitter doesn't need cryptographically secure random
+            await asyncio.sleep(random.uniform(0, self._jitter))  # noqa: S311
+        async with self._semaphore:
+            try:
+                with force_refresh() if force else nullcontext():
+                    await fn()
+            except CantGetDataError:
+                self._stats.failed += 1
+                logger.warning("Can't prefetch weather", exc_info=True)
+            else:
+                self._stats.refreshed += 1
+
+    async def _run_periodically(
+        self, name: str, fn: Callable[[], Awaitable[None]], interval: float
+    ) -> None:
+        while True:
+            # Lock is held for the whole interval, so the job is done
+            #   once per interval by any of the processes
+            if self._lock is not None and not await self._lock(name, interval):
+                self._stats.skipped += 1
+                await asyncio.sleep(interval)
+                continue
+            started_at = time.perf_counter()
+            try:
+                await fn()
+            except Exception:  # noqa: PIE786
+                # Prefetching is an optimization, it must not stop
+                #   because of temporary problems (e.g. with user storage)
+                logger.exception("Weather prefetching failed")
+            self._stats.runs += 1
+            self._stats.last_run_duration = time.perf_counter() - started_at
+            await asyncio.sleep(interval)
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class WarmingUserRepository(IUserRepository):
+    """
+    User repository that warms weather for locations of new users.
+    """
+
+    def __init__(self, repo: IUserRepository, prefetcher: WeatherPrefetcher) -> None:
+        self._repo = repo
+        self._prefetcher = prefetcher
+
+    async def get_user_by_email(self, email: str) -> User | None:
+        return await self._repo.get_user_by_email(email)
+
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        return await self._repo.get_users_by_emails(emails)
+
+    async def create_user(self, user: User) -> None:
+        await self._repo.create_user(user)
+        self._prefetcher.warm(user.location)
+
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        skipped = await self._repo.create_users(users)
+        for location in {user.location for user in users}:
+            self._prefetcher.warm(location)
+        return skipped
+
+    async def get_locations(self) -> list[Coordinates]:
+        return await self._repo.get_locations()
+
+    def iter_emails(self) -> AsyncIterator[str]:
+        return self._repo.iter_emails()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import logging
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from picodi_app.data_access.weather_shared_cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+
+class RedisCache(SharedCache):
+    """
+    Shared cache in Redis, entries expire with Redis TTLs.
+    """
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        key_prefix: str,
+        compress_min_size: int,
+        compression_level: int = 6,
+    ) -> None:
+        super().__init__(
+            compress_min_size=compress_min_size, compression_level=compression_level
+        )
+        self._client = redis_client
+        self._key_prefix = key_prefix
+
+    async def load(self, key: str) -> tuple[bytes, float] | None:
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.get(self._key_prefix + key)
+                pipe.pttl(self._key_prefix + key)
+                data, remaining_ms = await pipe.execute()
+        except RedisError:
+            self._stats.errors += 1
+            logger.warning("Can't get value from Redis cache", exc_info=True)
+            return None
+        if data is None or remaining_ms < 0:
+            return None
+        return data, remaining_ms / 1000
+
+    async def store(self, key: str, data: bytes, ttl: float) -> bool:
+        try:
+            await self._client.set(
+                self._key_prefix + key, data, px=max(int(ttl * 1000), 1)
+            )
+        except RedisError:
+            self._stats.errors += 1
+            logger.warning("Can't set value to Redis cache", exc_info=True)
+            return False
+        return True
+
+    async def acquire_lock(self, name: str, ttl: float) -> bool:
+        try:
+            return bool(
+                await self._client.set(
+                    f"{self._key_prefix}lock:{name}",
+                    b"1",
+                    nx=True,
+                    px=max(int(ttl * 1000), 1),
+                )
+            )
+        except RedisError:
+            self._stats.errors += 1
+            logger.warning("Can't acquire lock in Redis cache", exc_info=True)
+            return False
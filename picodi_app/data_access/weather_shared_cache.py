@@ -0,0 +1,337 @@
+"""
+Shared (L2) cache for weather and geocoder clients.
+
+Values are stored as compact JSON (forecasts column-wise),
+payloads bigger than `compress_min_size` bytes are compressed with zlib.
+Every payload starts with a format marker, so compressed
+and not compressed payloads can be mixed.
+Remaining TTL of cached values is reported with `limit_data_ttl`,
+so in-process (L1) cache entries don't outlive entries of the shared cache.
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+import logging
+import zlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, TypeVar
+
+from picodi_app.weather import (
+    City,
+    Coordinates,
+    Forecast,
+    IGeocoderClient,
+    IWeatherClient,
+    Speed,
+    SpeedUnit,
+    Temperature,
+    TemperatureUnit,
+    WeatherData,
+    WindDirection,
+    is_refresh_forced,
+    limit_data_ttl,
+    mark_data_as_stale,
+    normalize_city_name,
+    track_data_freshness,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def serialize_weather(weather: WeatherData) -> bytes:
+    return _dumps(
+        [
+            weather.temperature.value,
+            weather.temperature.unit.value,
+            weather.humidity,
+            weather.precipitation,
+            weather.wind_speed.value,
+            weather.wind_speed.unit.value,
+            weather.wind_direction.value,
+        ]
+    )
+
+
+def deserialize_weather(payload: bytes) -> WeatherData:
+    (
+        temperature,
+        temperature_unit,
+        humidity,
+        precipitation,
+        wind_speed,
+        wind_speed_unit,
+        wind_direction,
+    ) = json.loads(payload)
+    return WeatherData(
+        temperature=Temperature(temperature, TemperatureUnit(temperature_unit)),
+        humidity=humidity,
+        precipitation=precipitation,
+        wind_speed=Speed(wind_speed, SpeedUnit(wind_speed_unit)),
+        wind_direction=WindDirection(wind_direction),
+    )
+
+
+def serialize_forecast(forecast: Forecast) -> bytes:
+    return _dumps(
+        [
+            [time.isoformat() for time in forecast.time],
+            forecast.temperature.tolist(),
+            forecast.temperature_unit.value,
+            forecast.humidity.tolist(),
+            forecast.precipitation.tolist(),
+            forecast.wind_speed.tolist(),
+            forecast.wind_speed_unit.value,
+            forecast.wind_direction.tolist(),
+        ]
+    )
+
+
+def deserialize_forecast(payload: bytes) -> Forecast:
+    (
+        time,
+        temperature,
+        temperature_unit,
+        humidity,
+        precipitation,
+        wind_speed,
+        wind_speed_unit,
+        wind_direction,
+    ) = json.loads(payload)
+    return Forecast(
+        time=map(datetime.fromisoformat, time),
+        temperature=temperature,
+        temperature_unit=TemperatureUnit(temperature_unit),
+        humidity=humidity,
+        precipitation=precipitation,
+        wind_speed=wind_speed,
+        wind_speed_unit=SpeedUnit(wind_speed_unit),
+        wind_direction=wind_direction,
+    )
+
+
+def serialize_cities(cities: list[City]) -> bytes:
+    return _dumps(
+        [
+            [
+                city.name,
+                city.coordinates.latitude,
+                city.coordinates.longitude,
+                city.description,
+            ]
+            for city in cities
+        ]
+    )
+
+
+def deserialize_cities(payload: bytes) -> list[City]:
+    return [
+        City(
+            name=name,
+            coordinates=Coordinates(latitude=latitude, longitude=longitude),
+            description=description,
+        )
+        for name, latitude, longitude, description in json.loads(payload)
+    ]
+
+
+@dataclass
+class SharedCacheStats:
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    stored_bytes: int = 0
+    compressed: int = 0
+    # Entries removed by the cache itself
+    #   (backends like Redis expire and evict entries on their own)
+    expirations: int = 0
+    evictions: int = 0
+
+
+class SharedCache(abc.ABC):
+    """
+    Base class for caches of serialized values shared between processes.
+    Backend errors must be logged, counted and treated as cache misses,
+    so the shared cache being unavailable doesn't break the app.
+    """
+
+    def __init__(self, compress_min_size: int, compression_level: int = 6) -> None:
+        """
+        :param compress_min_size: payloads of this size (in bytes) and bigger
+            are compressed. 0 disables compression.
+        """
+        self._compress_min_size = compress_min_size
+        self._compression_level = compression_level
+        self._stats = SharedCacheStats()
+
+    def stats(self) -> SharedCacheStats:
+        return SharedCacheStats(**vars(self._stats))
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[T]],
+        ttl: Callable[[T], float],
+        serializer: Callable[[T], bytes],
+        deserializer: Callable[[bytes], T],
+    ) -> T:
+        """
+        Get value from cache or fetch it with `fetch` and store it
+        for `ttl(value)` seconds. Stale values are not stored.
+        Cached value is skipped inside `force_refresh` context.
+        """
+        if not is_refresh_forced():
+            cached = await self._get(key)
+            if cached is not None:
+                payload, remaining_ttl = cached
+                try:
+                    value = deserializer(payload)
+                except (KeyError, TypeError, ValueError):
+                    logger.warning("Can't deserialize cached value %s", key)
+                else:
+                    self._stats.hits += 1
+                    limit_data_ttl(remaining_ttl)
+                    return value
+            self._stats.misses += 1
+
+        with track_data_freshness() as freshness:
+            value = await fetch()
+        if freshness.stale:
+            mark_data_as_stale()
+            return value
+        await self._set(key, serializer(value), ttl(value))
+        return value
+
+    @abc.abstractmethod
+    async def load(self, key: str) -> tuple[bytes, float] | None:
+        """
+        Load stored data and its remaining TTL (in seconds).
+        Returns `None` if there is no data, it's expired or it can't be loaded.
+        """
+
+    @abc.abstractmethod
+    async def store(self, key: str, data: bytes, ttl: float) -> bool:
+        """
+        Store data for `ttl` seconds. Returns `False` if it can't be stored.
+        """
+
+    @abc.abstractmethod
+    async def acquire_lock(self, name: str, ttl: float) -> bool:
+        """
+        Take lock `name` for `ttl` seconds if nobody holds it,
+        so only one process does the job (e.g. prefetching).
+        Returns `False` if the lock is held or it can't be taken.
+        """
+
+    async def _get(self, key: str) -> tuple[bytes, float] | None:
+        loaded = await self.load(key)
+        if loaded is None:
+            return None
+        data, remaining_ttl = loaded
+        try:
+            return self._decode(data), remaining_ttl
+        except (ValueError, zlib.error):
+            logger.warning("Can't decode cached value %s", key)
+            return None
+
+    async def _set(self, key: str, payload: bytes, ttl: float) -> None:
+        data = self._encode(payload)
+        if await self.store(key, data, ttl):
+            self._stats.stored_bytes += len(data)
+
+    def _encode(self, payload: bytes) -> bytes:
+        if self._compress_min_size and len(payload) >= self._compress_min_size:
+            self._stats.compressed += 1
+            return _ZLIB + zlib.compress(payload, self._compression_level)
+        return _RAW + payload
+
+    def _decode(self, data: bytes) -> bytes:
+        marker, payload = data[:1], data[1:]
+        if marker == _RAW:
+            return payload
+        if marker == _ZLIB:
+            return zlib.decompress(payload)
+        raise ValueError(f"Unknown payload format: {marker!r}")
+
+
+class SharedCachedWeatherClient(IWeatherClient):
+    """
+    Weather client that caches results of the wrapped client in a shared cache,
+    so they are shared between workers and survive restarts.
+    """
+
+    def __init__(
+        self,
+        client: IWeatherClient,
+        cache: SharedCache,
+        current_ttl: float,
+        forecast_ttl: float,
+        geohash_precision: int,
+    ) -> None:
+        self._client = client
+        self._cache = cache
+        self._current_ttl = current_ttl
+        self._forecast_ttl = forecast_ttl
+        self._geohash_precision = geohash_precision
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        return await self._cache.get_or_fetch(
+            f"current:{coords.geohash(self._geohash_precision)}",
+            fetch=lambda: self._client.get_current_weather(coords),
+            ttl=lambda _: self._current_ttl,
+            serializer=serialize_weather,
+            deserializer=deserialize_weather,
+        )
+
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
+        cell = coords.geohash(self._geohash_precision)
+        return await self._cache.get_or_fetch(
+            f"forecast:{cell}:{days}",
+            fetch=lambda: self._client.get_forecast(coords, days=days),
+            ttl=lambda _: self._forecast_ttl,
+            serializer=serialize_forecast,
+            deserializer=deserialize_forecast,
+        )
+
+
+class SharedCachedGeocoderClient(IGeocoderClient):
+    """
+    Geocoder client that caches results of the wrapped client in a shared cache.
+    Empty results are cached with shorter `negative_ttl`.
+    """
+
+    def __init__(
+        self,
+        client: IGeocoderClient,
+        cache: SharedCache,
+        ttl: float,
+        negative_ttl: float,
+    ) -> None:
+        self._client = client
+        self._cache = cache
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+
+    async def get_coordinates_by_city(self, city: str) -> list[City]:
+        key = normalize_city_name(city)
+        if not key:
+            return []
+        return await self._cache.get_or_fetch(
+            f"geocode:{key}",
+            fetch=lambda: self._client.get_coordinates_by_city(city),
+            ttl=lambda results: self._ttl if results else self._negative_ttl,
+            serializer=serialize_cities,
+            deserializer=deserialize_cities,
+        )
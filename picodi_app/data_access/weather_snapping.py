@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from picodi_app.weather import Coordinates, Forecast, IWeatherClient, WeatherData
+
+
+class SnappingWeatherClient(IWeatherClient):
+    """
+    Weather client that snaps coordinates to the centroid of their geohash cell
+    of `geohash_precision` characters, so upstream is called for one canonical
+    point per cell and nearby locations get exactly the same data.
+    """
+
+    def __init__(self, client: IWeatherClient, geohash_precision: int) -> None:
+        self._client = client
+        self._geohash_precision = geohash_precision
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        return await self._client.get_current_weather(
+            coords.snapped(self._geohash_precision)
+        )
+
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
+        return await self._client.get_forecast(
+            coords.snapped(self._geohash_precision), days=days
+        )
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TypeVar
+
+from picodi_app.data_access.sqlite import create_cache_tables
+from picodi_app.data_access.weather_shared_cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Access time of an entry is updated not more often than this (in seconds),
+#   so cache hits don't turn into writes to the database every time
+_ACCESS_TIME_RESOLUTION = 1.0
+
+
+class SqliteCache(SharedCache):
+    """
+    Shared cache in SQLite database file for single-host deployments
+    without Redis: all worker processes on the host use the same file
+    and cached values survive restarts.
+
+    The database is opened in WAL mode, so readers don't block each other
+    and the writer. Queries are run in a dedicated thread,
+    so they don't block the event loop.
+
+    Every `compaction_interval` seconds (or after `max_entries / 10` writes)
+    expired entries are deleted and least recently used entries are evicted
+    to keep at most `max_entries` entries. Without writes compaction is run
+    by background task (see `start`).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        compaction_interval: float,
+        compress_min_size: int,
+        compression_level: int = 6,
+        busy_timeout: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        :param clock: wall clock, entries are shared between processes
+            and restarts, so monotonic clock can't be used.
+        """
+        super().__init__(
+            compress_min_size=compress_min_size, compression_level=compression_level
+        )
+        if max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+        self._max_entries = max_entries
+        self._compaction_interval = compaction_interval
+        self._writes_between_compactions = max(max_entries // 10, 1)
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-cache"
+        )
+        # Autocommit mode: every statement is a separate short transaction,
+        #   so readers don't hold snapshots between calls
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the last writes on power loss is fine for cache
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        create_cache_tables(self._conn)
+        self._compacted_at = self._clock()
+        self._writes = 0
+        self._closed = False
+        self._task: asyncio.Task[None] | None = None
+
+    async def load(self, key: str) -> tuple[bytes, float] | None:
+        return await self._run(self._load, key)
+
+    async def store(self, key: str, data: bytes, ttl: float) -> bool:
+        return await self._run(self._store, key, data, ttl)
+
+    async def acquire_lock(self, name: str, ttl: float) -> bool:
+        return await self._run(self._acquire_lock, name, ttl)
+
+    async def compact(self) -> None:
+        await self._run(self._compact)
+
+    def start(self) -> None:
+        """
+        Start compacting the cache in background,
+        so expired entries are deleted even if nothing is written.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._compact_periodically())
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._run(self._conn.close)
+        self._executor.shutdown()
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    async def _compact_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._compaction_interval)
+            # Writes may have compacted the cache in the meantime
+            if self._clock() - self._compacted_at < self._compaction_interval:
+                continue
+            try:
+                await self.compact()
+            except Exception:  # noqa: PIE786
+                # Compaction must not stop because of temporary problems,
+                #   database errors are already counted and logged
+                logger.exception("SQLite cache compaction failed")
+
+    def _load(self, key: str) -> tuple[bytes, float] | None:
+        now = self._clock()
+        try:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM weather_cache"
+                " WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            data, expires_at, accessed_at = row
+            if expires_at <= now:
+                return None
+            if now - accessed_at >= _ACCESS_TIME_RESOLUTION:
+                self._conn.execute(
+                    "UPDATE weather_cache SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        except sqlite3.Error:
+            self._stats.errors += 1
+            logger.warning("Can't get value from SQLite cache", exc_info=True)
+            return None
+        return data, expires_at - now
+
+    def _store(self, key: str, data: bytes, ttl: float) -> bool:
+        now = self._clock()
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO weather_cache"
+                " (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, data, now + ttl, now),
+            )
+        except sqlite3.Error:
+            self._stats.errors += 1
+            logger.warning("Can't set value to SQLite cache", exc_info=True)
+            return False
+        self._writes += 1
+        if (
+            self._writes >= self._writes_between_compactions
+            or now - self._compacted_at >= self._compaction_interval
+        ):
+            self._compact()
+        return True
+
+    def _acquire_lock(self, name: str, ttl: float) -> bool:
+        now = self._clock()
+        try:
+            # Lock is an entry without value, it's taken over only if it's expired
+            acquired = self._conn.execute(
+                "INSERT INTO weather_cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, x'', ?, ?)"
+                " ON CONFLICT (key) DO UPDATE"
+                " SET expires_at = excluded.expires_at,"
+                " accessed_at = excluded.accessed_at"
+                " WHERE weather_cache.expires_at <= ?",
+                (f"lock:{name}", now + ttl, now, now),
+            ).rowcount
+        except sqlite3.Error:
+            self._stats.errors += 1
+            logger.warning("Can't acquire lock in SQLite cache", exc_info=True)
+            return False
+        return acquired > 0
+
+    def _compact(self) -> None:
+        now = self._clock()
+        self._compacted_at = now
+        self._writes = 0
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = self._conn.execute(
+                    "DELETE FROM weather_cache WHERE expires_at <= ?", (now,)
+                ).rowcount
+                (size,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM weather_cache"
+                ).fetchone()
+                evicted = 0
+                if size > self._max_entries:
+                    evicted = self._conn.execute(
+                        "DELETE FROM weather_cache WHERE key IN ("
+                        " SELECT key FROM weather_cache"
+                        " ORDER BY accessed_at LIMIT ?"
+                        ")",
+                        (size - self._max_entries,),
+                    ).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            self._stats.errors += 1
+            logger.warning("Can't compact SQLite cache", exc_info=True)
+            return
+        self._stats.expirations += expired
+        self._stats.evictions += evicted
+        logger.debug("Compacted SQLite cache: %s expired, %s evicted", expired, evicted)
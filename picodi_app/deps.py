@@ -1,33 +1,104 @@
 from __future__ import annotations
 
+import dataclasses
 import logging
-import sqlite3
+import os
+import socket
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from typing import TYPE_CHECKING, Any
 
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 from picodi import Registry, SingletonScope, inject, registry
 from picodi.helpers import resolve
-from picodi.integrations.fastapi import Provide, RequestScope
+from picodi.integrations.fastapi import Provide
 from redis import asyncio as aioredis
 
+from picodi_app.auth import (
+    CredentialsCache,
+    CredentialsCacheUserRepository,
+    TokenSigner,
+)
+from picodi_app.cache import TTLCache
 from picodi_app.conf import (
+    AuthTokenSettings,
+    CredentialsCacheSettings,
+    EmailFilterSettings,
+    GeocoderCacheSettings,
+    HttpClientSettings,
+    LocationSettings,
+    PasswordHashingSettings,
     RedisDatabaseSettings,
+    ResilienceSettings,
     Settings,
+    SharedCacheSettings,
     SqliteDatabaseSettings,
+    UserCacheSettings,
+    WeatherBatchingSettings,
+    WeatherCacheSettings,
+    WeatherPrefetchSettings,
     parse_settings,
 )
-from picodi_app.data_access.sqlite import create_tables
+from picodi_app.data_access.gazetteer import GazetteerIndex, OfflineGeocoderClient
+from picodi_app.data_access.resilience import (
+    CircuitBreaker,
+    ResilientGeocoderClient,
+    ResilientWeatherClient,
+    StaleWhileRevalidate,
+)
+from picodi_app.data_access.sqlite import (
+    SQLITE_PROFILES,
+    SqlitePool,
+    SqliteProfile,
+    create_tables,
+)
 from picodi_app.data_access.user import RedisUserRepository, SqliteUserRepository
+from picodi_app.data_access.user_bloom import (
+    EmailFilter,
+    EmailFilterUserRepository,
+    RedisEmailFilterStore,
+)
+from picodi_app.data_access.user_cache import CachedUserRepository, WriteCounter
 from picodi_app.data_access.weather import (
     OpenMeteoGeocoderClient,
     OpenMeteoWeatherClient,
 )
+from picodi_app.data_access.weather_batching import (
+    BatchingWeatherClient,
+    CurrentWeatherBatcher,
+)
+from picodi_app.data_access.weather_cache import (
+    CachedGeocoderClient,
+    CachedWeatherClient,
+)
+from picodi_app.data_access.weather_coalescing import (
+    CoalescingGeocoderClient,
+    CoalescingWeatherClient,
+)
+from picodi_app.data_access.weather_prefetch import (
+    WarmingUserRepository,
+    WeatherPrefetcher,
+)
+from picodi_app.data_access.weather_redis_cache import RedisCache
+from picodi_app.data_access.weather_shared_cache import (
+    SharedCache,
+    SharedCachedGeocoderClient,
+    SharedCachedWeatherClient,
+)
+from picodi_app.data_access.weather_snapping import SnappingWeatherClient
+from picodi_app.data_access.weather_sqlite_cache import SqliteCache
+from picodi_app.user import IUserRepository, User
+from picodi_app.utils import PasswordHasher, SingleFlight
+from picodi_app.weather import IGeocoderClient
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator, Callable, Generator  # noqa: TC004
+    from collections.abc import (  # noqa: TC004
+        AsyncGenerator,
+        Callable,
+        Generator,
+        Hashable,
+    )
 
-    from picodi_app.user import IUserRepository
-    from picodi_app.weather import IGeocoderClient, IWeatherClient
+    from picodi_app.weather import IWeatherClient
 
 logger = logging.getLogger(__name__)
 
@@ -68,40 +139,58 @@ def get_option(
 
 
 # Picodi Note:
-#   Thanks to `SingletonScope` we can use sqlite connection
+#   Thanks to `SingletonScope` we can use sqlite pool
 #   even with ":memory:" database.
 @registry.set_scope(scope_class=SingletonScope)
 @cli_registry.set_scope(scope_class=SingletonScope)
 @inject
-def get_sqlite_connection(
+def get_sqlite_pool(
     db_settings: SqliteDatabaseSettings = Provide(
         get_option(lambda s: s.database.settings)
     ),
-) -> Generator[sqlite3.Connection, None, None]:
+) -> Generator[SqlitePool, None, None]:
     if not isinstance(db_settings, SqliteDatabaseSettings):
         raise ValueError("Invalid database settings")
-    conn = sqlite3.connect(db_settings.db_name, check_same_thread=False)
+    overrides = {
+        field.name: value
+        for field in dataclasses.fields(SqliteProfile)
+        if (value := getattr(db_settings, field.name)) is not None
+    }
+    profile = dataclasses.replace(SQLITE_PROFILES[db_settings.profile], **overrides)
+    pool = SqlitePool(
+        db_settings.db_name,
+        size=db_settings.pool_size,
+        profile=profile,
+        batch_window=db_settings.write_batch_window,
+        max_batch_size=db_settings.write_batch_size,
+    )
+    logger.info(
+        "Opened SQLite pool with %s readers. ID: %s. Must be closed on app shutdown",
+        db_settings.pool_size,
+        id(pool),
+    )
     logger.info(
-        "Connected to SQLite database. ID: %s. Must be closed on app shutdown", id(conn)
+        "SQLite profile %r: %s, statement_cache_size=%s",
+        db_settings.profile,
+        ", ".join(f"{name}={value}" for name, value in pool.pragmas().items()),
+        profile.statement_cache_size,
     )
     if db_settings.create_db:
-        create_tables(conn)
+        pool.write_sync(create_tables)
         logger.info("Created tables in SQLite database")
     try:
-        yield conn
+        yield pool
     finally:
-        conn.close()
-        logger.info("Closed SQLite connection. ID: %s", id(conn))
+        pool.close()
+        logger.info("Closed SQLite pool. ID: %s", id(pool))
 
 
 @inject
 def get_sqlite_user_repository(
-    conn: sqlite3.Connection = Provide(get_sqlite_connection),
+    pool: SqlitePool = Provide(get_sqlite_pool),
 ) -> SqliteUserRepository:
-    logger.info(
-        "Creating SqliteUserRepository instance with connection ID: %s", id(conn)
-    )
-    return SqliteUserRepository(conn)
+    logger.info("Creating SqliteUserRepository instance with pool ID: %s", id(pool))
+    return SqliteUserRepository(pool)
 
 
 @registry.set_scope(scope_class=SingletonScope)
@@ -115,7 +204,7 @@ async def get_redis_client(
     if not isinstance(db_settings, RedisDatabaseSettings):
         raise ValueError("Invalid database settings")
 
-    redis = aioredis.from_url(db_settings.url, decode_responses=True)  # type: ignore
+    redis = _create_redis_client(db_settings, decode_responses=True)
     async with redis as conn:
         logger.info(
             "Connected to Redis database. ID: %s. Must be closed on app shutdown",
@@ -125,6 +214,64 @@ async def get_redis_client(
         logger.info("Closed Redis connection. ID: %s", id(conn))
 
 
+# Picodi Note:
+#   Same as `get_redis_client`, but for binary data, so responses are not decoded.
+#   It's initialized on startup only if it's needed (see `dependencies_for_init`).
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+async def get_redis_binary_client(
+    db_settings: RedisDatabaseSettings = Provide(
+        get_option(lambda s: s.database.settings)
+    ),
+) -> AsyncGenerator[aioredis.Redis, None]:
+    if not isinstance(db_settings, RedisDatabaseSettings):
+        raise ValueError("Invalid database settings")
+
+    redis = _create_redis_client(db_settings, decode_responses=False)
+    async with redis as conn:
+        logger.info(
+            "Connected to Redis database for binary data. ID: %s. "
+            "Must be closed on app shutdown",
+            id(conn),
+        )
+        yield conn
+        logger.info("Closed Redis connection. ID: %s", id(conn))
+
+
+def _create_redis_client(
+    db_settings: RedisDatabaseSettings, decode_responses: bool
+) -> aioredis.Redis:
+    keepalive_options = {
+        option: value
+        for name, value in [
+            ("TCP_KEEPIDLE", db_settings.keepalive_idle),
+            ("TCP_KEEPINTVL", db_settings.keepalive_interval),
+            ("TCP_KEEPCNT", db_settings.keepalive_count),
+        ]
+        # Not all options are supported by every OS
+        if value is not None and (option := getattr(socket, name, None)) is not None
+    }
+    # Blocking pool waits for a free connection instead of failing
+    #   with "Too many connections"
+    pool = aioredis.BlockingConnectionPool.from_url(
+        db_settings.url,
+        max_connections=db_settings.max_connections,
+        timeout=db_settings.pool_timeout,
+        socket_timeout=db_settings.socket_timeout,
+        socket_connect_timeout=db_settings.socket_connect_timeout,
+        socket_keepalive=db_settings.socket_keepalive,
+        socket_keepalive_options=keepalive_options,
+        health_check_interval=db_settings.health_check_interval,
+        decode_responses=decode_responses,
+    )
+    logger.info(
+        "Created Redis connection pool with %s connections", db_settings.max_connections
+    )
+    # Client closes the pool when it's closed
+    return aioredis.Redis.from_pool(pool)
+
+
 # Picodi Note:
 #   Note that `get_redis_client` is an async dependency, but we inject it
 #   into a sync `get_redis_user_repository` dependency.
@@ -140,63 +287,579 @@ def get_redis_user_repository(
     return RedisUserRepository(redis)
 
 
+# Picodi Note:
+#   Cache must be shared across all requests, so we use `SingletonScope` here.
+#   Returns `None` if the cache is disabled in settings.
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_credentials_cache(
+    cache_settings: CredentialsCacheSettings = Provide(
+        get_option(lambda s: s.credentials_cache)
+    ),
+) -> CredentialsCache | None:
+    if not cache_settings.enabled:
+        return None
+    logger.info("Creating credentials cache with max size: %s", cache_settings.max_size)
+    return CredentialsCache(
+        TTLCache(max_size=cache_settings.max_size), ttl=cache_settings.ttl
+    )
+
+
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_user_cache(
+    cache_settings: UserCacheSettings = Provide(get_option(lambda s: s.user_cache)),
+) -> TTLCache[str, User | None]:
+    logger.info("Creating user cache with max size: %s", cache_settings.max_size)
+    return TTLCache(max_size=cache_settings.max_size)
+
+
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+def get_user_single_flight() -> SingleFlight[str, User | None]:
+    return SingleFlight()
+
+
+# Picodi Note:
+#   Repository is created for every request, but the counter must be shared
+#   like the cache it protects, so it's a singleton too.
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+def get_user_cache_writes() -> WriteCounter:
+    return WriteCounter()
+
+
+@inject
+def get_email_filter_store(
+    redis: aioredis.Redis = Provide(get_redis_binary_client),
+    key_prefix: str = Provide(get_option(lambda s: s.email_filter.key_prefix)),
+) -> RedisEmailFilterStore:
+    return RedisEmailFilterStore(redis, key_prefix=key_prefix)
+
+
+# Picodi Note:
+#   Filter is a singleton, it's built and rebuilt in background
+#   (see `start_email_filter`). Returns `None` if the filter is disabled.
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_email_filter(
+    filter_settings: EmailFilterSettings = Provide(
+        get_option(lambda s: s.email_filter)
+    ),
+    db_type: str = Provide(get_option(lambda s: s.database.type)),
+) -> EmailFilter | None:
+    if not filter_settings.enabled:
+        return None
+    if db_type != "redis":
+        # Without the shared store users created by other processes
+        #   would be rejected as unknown until the next rebuild
+        logger.warning("Email filter works only with Redis database, disabled")
+        return None
+    logger.info(
+        "Creating email filter for %s emails with false positive rate %s",
+        filter_settings.capacity,
+        filter_settings.false_positive_rate,
+    )
+    # Picodi Note:
+    #   Store is needed only with Redis database,
+    #   so we resolve it here instead of injecting it
+    with resolve(get_email_filter_store) as store:
+        return EmailFilter(
+            capacity=filter_settings.capacity,
+            false_positive_rate=filter_settings.false_positive_rate,
+            rebuild_interval=filter_settings.rebuild_interval,
+            sync_interval=filter_settings.sync_interval,
+            store=store,
+        )
+
+
+# Picodi Note:
+#   Signer is a singleton, it's created once for the whole life of the process.
+#   Returns `None` if the secret is not set, so bearer tokens are disabled.
+@registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_token_signer(
+    token_settings: AuthTokenSettings = Provide(get_option(lambda s: s.auth_tokens)),
+) -> TokenSigner | None:
+    if not token_settings.secret:
+        logger.warning("Auth token secret is not set, bearer tokens are disabled")
+        return None
+    return TokenSigner(token_settings.secret.encode(), ttl=token_settings.ttl)
+
+
 @inject
 def get_user_repository(
     db_type: str = Provide(get_option(lambda s: s.database.type)),
+    prefetch_enabled: bool = Provide(get_option(lambda s: s.weather_prefetch.enabled)),
+    credentials_cache: CredentialsCache | None = Provide(get_credentials_cache),
+    cache_settings: UserCacheSettings = Provide(get_option(lambda s: s.user_cache)),
+    user_cache: TTLCache[str, User | None] = Provide(get_user_cache),
+    user_single_flight: SingleFlight[str, User | None] = Provide(
+        get_user_single_flight
+    ),
+    user_cache_writes: WriteCounter = Provide(get_user_cache_writes),
+    email_filter: EmailFilter | None = Provide(get_email_filter),
 ) -> Generator[IUserRepository, None, None]:
     # Picodi Note:
     #   Tricky part here is that we want to inject only one of the repositories - either
     #   SqliteUserRepository or RedisUserRepository.
+    repo: IUserRepository
     if db_type == "sqlite":
-        with resolve(get_sqlite_user_repository) as repo:
-            yield repo
+        dependency: Callable[[], IUserRepository] = get_sqlite_user_repository
     elif db_type == "redis":
-        with resolve(get_redis_user_repository) as repo:
-            yield repo
+        dependency = get_redis_user_repository
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
 
+    with resolve(dependency) as repo:
+        if cache_settings.enabled:
+            repo = CachedUserRepository(
+                repo,
+                cache=user_cache,
+                single_flight=user_single_flight,
+                writes=user_cache_writes,
+                ttl=cache_settings.ttl,
+                negative_ttl=cache_settings.negative_ttl,
+            )
+        if email_filter is not None:
+            # Unknown emails are rejected before the cache,
+            #   so they don't evict cached users
+            repo = EmailFilterUserRepository(repo, email_filter=email_filter)
+        if prefetch_enabled:
+            # Picodi Note:
+            #   `get_weather_prefetcher` is defined below,
+            #   so we resolve it here instead of injecting it
+            with resolve(get_weather_prefetcher) as prefetcher:
+                repo = WarmingUserRepository(repo, prefetcher=prefetcher)
+        if credentials_cache is not None:
+            repo = CredentialsCacheUserRepository(
+                repo, credentials_cache=credentials_cache
+            )
+        yield repo
+
 
 # Picodi Note:
-#   We use `RequestScope` to create http client for open-meteo service.
-#   That means that even if will be created multiple repositories or services
-#   that depend on `get_open_meteo_http_client` they will share the same instance
-#   of the http client (across one request).
-#
-#   In real project we would use `httpx.AsyncClient` with connection pooling
-#   and reuse the same instance of the client across multiple requests.
-@registry.set_scope(scope_class=RequestScope)
-@cli_registry.set_scope(scope_class=RequestScope)
-async def get_open_meteo_http_client() -> AsyncGenerator[AsyncClient, None]:
-    async with AsyncClient(timeout=5) as client:
+#   Pool is created on app startup and shut down by `registry.shutdown()`
+#   on app shutdown (see `picodi_app.api.main.lifespan`).
+@registry.set_scope(scope_class=SingletonScope, auto_init=True)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_password_hasher(
+    hashing_settings: PasswordHashingSettings = Provide(
+        get_option(lambda s: s.password_hashing)
+    ),
+) -> Generator[PasswordHasher, None, None]:
+    workers = hashing_settings.workers or os.cpu_count() or 1
+    executor: Executor
+    if hashing_settings.executor == "process":
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hasher"
+        )
+    hasher = PasswordHasher(executor, max_pending=hashing_settings.max_pending)
+    logger.info(
+        "Created password hasher with %s %s workers",
+        workers,
+        hashing_settings.executor,
+    )
+    try:
+        yield hasher
+    finally:
+        hasher.shutdown()
+        logger.info("Shut down password hasher")
+
+
+# Picodi Note:
+#   We use `SingletonScope` to create one http client for open-meteo service
+#   per process. `httpx.AsyncClient` keeps a pool of connections, so requests
+#   reuse already established TCP+TLS connections instead of making new handshake
+#   on every API call.
+#   With `auto_init=True` the client is created on app startup
+#   (see `picodi_app.api.main.lifespan`) and it will be closed
+#   by `registry.shutdown()` on app shutdown.
+@registry.set_scope(scope_class=SingletonScope, auto_init=True)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+async def get_open_meteo_http_client(
+    client_settings: HttpClientSettings = Provide(get_option(lambda s: s.http_client)),
+) -> AsyncGenerator[AsyncClient, None]:
+    limits = Limits(
+        max_connections=client_settings.max_connections,
+        max_keepalive_connections=client_settings.max_keepalive_connections,
+        keepalive_expiry=client_settings.keepalive_expiry,
+    )
+    async with AsyncClient(
+        timeout=client_settings.timeout,
+        limits=limits,
+        http2=client_settings.http2,
+    ) as client:
         logger.info(
-            "Creating new httpx.AsyncClient. ID: %s. Must be closed on end of request",
+            "Creating new httpx.AsyncClient. ID: %s. Must be closed on app shutdown",
             id(client),
         )
         yield client
         logger.info("Closing httpx.AsyncClient instance. ID: %s", id(client))
 
 
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_weather_cache(
+    cache_settings: WeatherCacheSettings = Provide(
+        get_option(lambda s: s.weather_cache)
+    ),
+) -> TTLCache[Hashable, Any]:
+    logger.info("Creating weather cache with max size: %s", cache_settings.max_size)
+    return TTLCache(max_size=cache_settings.max_size)
+
+
+# Picodi Note:
+#   `SingleFlight` keeps track of upstream calls that are in progress right now.
+#   It must be shared across all requests, so we use `SingletonScope` here,
+#   but clients that use it are cheap and created for every request.
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+def get_upstream_single_flight() -> SingleFlight[Hashable, Any]:
+    return SingleFlight()
+
+
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+async def get_current_weather_batcher(
+    http_client: AsyncClient = Provide(get_open_meteo_http_client),
+    batching_settings: WeatherBatchingSettings = Provide(
+        get_option(lambda s: s.weather_batching)
+    ),
+) -> AsyncGenerator[CurrentWeatherBatcher, None]:
+    batcher = CurrentWeatherBatcher(
+        OpenMeteoWeatherClient(http_client=http_client),
+        window=batching_settings.window,
+        max_batch_size=batching_settings.max_batch_size,
+    )
+    logger.info("Created CurrentWeatherBatcher. ID: %s", id(batcher))
+    try:
+        yield batcher
+    finally:
+        await batcher.close()
+        logger.info("Closed CurrentWeatherBatcher. ID: %s", id(batcher))
+
+
+def _create_stale_while_revalidate(
+    resilience_settings: ResilienceSettings,
+) -> StaleWhileRevalidate:
+    breaker = CircuitBreaker(
+        failure_rate_threshold=resilience_settings.failure_rate_threshold,
+        slow_call_duration=resilience_settings.slow_call_duration,
+        slow_call_rate_threshold=resilience_settings.slow_call_rate_threshold,
+        window_size=resilience_settings.window_size,
+        min_calls=resilience_settings.min_calls,
+        reset_timeout=resilience_settings.reset_timeout,
+    )
+    return StaleWhileRevalidate(
+        breaker,
+        soft_ttl=resilience_settings.soft_ttl,
+        max_stale=resilience_settings.max_stale,
+        max_size=resilience_settings.max_size,
+    )
+
+
+# Picodi Note:
+#   Circuit breaker state and last known values must be shared across requests,
+#   so we use `SingletonScope`. Background refreshes are cancelled on shutdown.
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+async def get_weather_stale_while_revalidate(
+    resilience_settings: ResilienceSettings = Provide(
+        get_option(lambda s: s.resilience)
+    ),
+) -> AsyncGenerator[StaleWhileRevalidate, None]:
+    swr = _create_stale_while_revalidate(resilience_settings)
+    try:
+        yield swr
+    finally:
+        await swr.close()
+
+
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+async def get_geocoder_stale_while_revalidate(
+    resilience_settings: ResilienceSettings = Provide(
+        get_option(lambda s: s.resilience)
+    ),
+) -> AsyncGenerator[StaleWhileRevalidate, None]:
+    swr = _create_stale_while_revalidate(resilience_settings)
+    try:
+        yield swr
+    finally:
+        await swr.close()
+
+
+# Picodi Note:
+#   Shared cache is optional, so this dependency yields `None` when it's disabled
+#   and clients are not wrapped with it.
+#   Values are stored as bytes, so we don't use `decode_responses` for Redis here.
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+async def get_shared_cache(
+    cache_settings: SharedCacheSettings = Provide(get_option(lambda s: s.shared_cache)),
+) -> AsyncGenerator[SharedCache | None, None]:
+    if cache_settings.backend == "none":
+        yield None
+    elif cache_settings.backend == "redis":
+        redis = aioredis.from_url(cache_settings.redis.url)  # type: ignore
+        async with redis as conn:
+            logger.info(
+                "Connected to Redis cache. ID: %s. Must be closed on app shutdown",
+                id(conn),
+            )
+            yield RedisCache(
+                conn,
+                key_prefix=cache_settings.redis.key_prefix,
+                compress_min_size=cache_settings.compress_min_size,
+                compression_level=cache_settings.compression_level,
+            )
+            logger.info("Closed Redis cache connection. ID: %s", id(conn))
+    elif cache_settings.backend == "sqlite":
+        cache = SqliteCache(
+            cache_settings.sqlite.path,
+            max_entries=cache_settings.sqlite.max_entries,
+            compaction_interval=cache_settings.sqlite.compaction_interval,
+            busy_timeout=cache_settings.sqlite.busy_timeout,
+            compress_min_size=cache_settings.compress_min_size,
+            compression_level=cache_settings.compression_level,
+        )
+        cache.start()
+        logger.info(
+            "Opened SQLite cache %s. Must be closed on app shutdown",
+            cache_settings.sqlite.path,
+        )
+        try:
+            yield cache
+        finally:
+            await cache.close()
+            logger.info("Closed SQLite cache %s", cache_settings.sqlite.path)
+    else:
+        raise ValueError(f"Unsupported shared cache backend: {cache_settings.backend}")
+
+
 @inject
 async def get_weather_client(
     http_client: AsyncClient = Provide(get_open_meteo_http_client),
+    location_settings: LocationSettings = Provide(get_option(lambda s: s.locations)),
+    cache_settings: WeatherCacheSettings = Provide(
+        get_option(lambda s: s.weather_cache)
+    ),
+    cache: TTLCache[Hashable, Any] = Provide(get_weather_cache),
+    coalescing_enabled: bool = Provide(
+        get_option(lambda s: s.request_coalescing.enabled)
+    ),
+    single_flight: SingleFlight[Hashable, Any] = Provide(get_upstream_single_flight),
+    batching_enabled: bool = Provide(get_option(lambda s: s.weather_batching.enabled)),
+    batcher: CurrentWeatherBatcher = Provide(get_current_weather_batcher),
+    resilience_enabled: bool = Provide(get_option(lambda s: s.resilience.enabled)),
+    swr: StaleWhileRevalidate = Provide(get_weather_stale_while_revalidate),
+    shared_cache: SharedCache | None = Provide(get_shared_cache),
 ) -> IWeatherClient:
     logger.info(
         "Creating OpenMeteoWeatherClient instance with http client ID: %s",
         id(http_client),
     )
-    return OpenMeteoWeatherClient(http_client=http_client)
+    geohash_precision = location_settings.geohash_precision
+    client: IWeatherClient = OpenMeteoWeatherClient(http_client=http_client)
+    if batching_enabled:
+        client = BatchingWeatherClient(client, batcher=batcher)
+    if coalescing_enabled:
+        client = CoalescingWeatherClient(
+            client, single_flight=single_flight, geohash_precision=geohash_precision
+        )
+    if resilience_enabled:
+        client = ResilientWeatherClient(
+            client, swr=swr, geohash_precision=geohash_precision
+        )
+    if shared_cache is not None:
+        client = SharedCachedWeatherClient(
+            client,
+            cache=shared_cache,
+            current_ttl=cache_settings.current_ttl,
+            forecast_ttl=cache_settings.forecast_ttl,
+            geohash_precision=geohash_precision,
+        )
+    if cache_settings.enabled:
+        client = CachedWeatherClient(
+            client,
+            cache=cache,
+            current_ttl=cache_settings.current_ttl,
+            forecast_ttl=cache_settings.forecast_ttl,
+            geohash_precision=geohash_precision,
+        )
+    if location_settings.snap_to_cell_centroid:
+        client = SnappingWeatherClient(client, geohash_precision=geohash_precision)
+    return client
+
+
+# Picodi Note:
+#   Prefetcher is a singleton, but it's started only by the API app
+#   (see `picodi_app.api.main.lifespan`), so CLI commands and tests
+#   don't make background requests.
+#   It creates weather clients with `get_weather_client` on every run,
+#   as clients are cheap and created for every request anyway.
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_weather_prefetcher(
+    prefetch_settings: WeatherPrefetchSettings = Provide(
+        get_option(lambda s: s.weather_prefetch)
+    ),
+    geohash_precision: int = Provide(
+        get_option(lambda s: s.locations.geohash_precision)
+    ),
+) -> WeatherPrefetcher:
+    return WeatherPrefetcher(
+        client_factory=get_weather_client,
+        current_interval=prefetch_settings.current_interval,
+        forecast_interval=prefetch_settings.forecast_interval,
+        forecast_days=prefetch_settings.forecast_days,
+        concurrency=prefetch_settings.concurrency,
+        jitter=prefetch_settings.jitter,
+        geohash_precision=geohash_precision,
+    )
+
+
+# Picodi Note:
+#   This function is async, because shared cache is an async dependency
+#   that is not initialized on startup.
+@inject
+async def start_weather_prefetcher(
+    prefetch_enabled: bool = Provide(get_option(lambda s: s.weather_prefetch.enabled)),
+    prefetcher: WeatherPrefetcher = Provide(get_weather_prefetcher),
+    user_repo: IUserRepository = Provide(get_user_repository),
+    shared_cache: SharedCache | None = Provide(get_shared_cache),
+) -> WeatherPrefetcher | None:
+    if not prefetch_enabled:
+        return None
+    # With shared cache only one worker refreshes it at a time,
+    #   without it every worker keeps its own cache warm
+    prefetcher.start(
+        user_repo, lock=shared_cache.acquire_lock if shared_cache else None
+    )
+    return prefetcher
 
 
 @inject
-async def get_geocoder_client(
+def start_email_filter(
+    email_filter: EmailFilter | None = Provide(get_email_filter),
+    user_repo: IUserRepository = Provide(get_user_repository),
+) -> EmailFilter | None:
+    if email_filter is None:
+        return None
+    email_filter.start(user_repo)
+    return email_filter
+
+
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_geocoder_cache(
+    cache_settings: GeocoderCacheSettings = Provide(
+        get_option(lambda s: s.geocoder_cache)
+    ),
+) -> TTLCache[Hashable, Any]:
+    logger.info("Creating geocoder cache with max size: %s", cache_settings.max_size)
+    return TTLCache(max_size=cache_settings.max_size)
+
+
+@inject
+async def get_open_meteo_geocoder_client(
     http_client: AsyncClient = Provide(get_open_meteo_http_client),
+    coalescing_enabled: bool = Provide(
+        get_option(lambda s: s.request_coalescing.enabled)
+    ),
+    single_flight: SingleFlight[Hashable, Any] = Provide(get_upstream_single_flight),
+    cache_settings: GeocoderCacheSettings = Provide(
+        get_option(lambda s: s.geocoder_cache)
+    ),
+    cache: TTLCache[Hashable, Any] = Provide(get_geocoder_cache),
+    resilience_enabled: bool = Provide(get_option(lambda s: s.resilience.enabled)),
+    swr: StaleWhileRevalidate = Provide(get_geocoder_stale_while_revalidate),
+    shared_cache: SharedCache | None = Provide(get_shared_cache),
 ) -> IGeocoderClient:
     logger.info(
         "Creating OpenMeteoGeocoderClient instance with http client ID: %s",
         id(http_client),
     )
-    return OpenMeteoGeocoderClient(http_client=http_client)
+    client: IGeocoderClient = OpenMeteoGeocoderClient(http_client=http_client)
+    if coalescing_enabled:
+        client = CoalescingGeocoderClient(client, single_flight=single_flight)
+    if resilience_enabled:
+        client = ResilientGeocoderClient(client, swr=swr)
+    if shared_cache is not None:
+        client = SharedCachedGeocoderClient(
+            client,
+            cache=shared_cache,
+            ttl=cache_settings.ttl,
+            negative_ttl=cache_settings.negative_ttl,
+        )
+    if cache_settings.enabled:
+        client = CachedGeocoderClient(
+            client,
+            cache=cache,
+            ttl=cache_settings.ttl,
+            negative_ttl=cache_settings.negative_ttl,
+        )
+    return client
+
+
+@registry.set_scope(scope_class=SingletonScope)
+@cli_registry.set_scope(scope_class=SingletonScope)
+@inject
+def get_gazetteer_index(
+    index_path: str = Provide(get_option(lambda s: s.geocoder.index_path)),
+) -> Generator[GazetteerIndex, None, None]:
+    index = GazetteerIndex(index_path)
+    logger.info("Opened gazetteer index %s with %s cities", index_path, len(index))
+    try:
+        yield index
+    finally:
+        index.close()
+        logger.info("Closed gazetteer index %s", index_path)
+
+
+@inject
+async def get_offline_geocoder_client(
+    index: GazetteerIndex = Provide(get_gazetteer_index),
+    fallback_to_remote: bool = Provide(
+        get_option(lambda s: s.geocoder.fallback_to_remote)
+    ),
+    remote_client: IGeocoderClient = Provide(get_open_meteo_geocoder_client),
+) -> IGeocoderClient:
+    return OfflineGeocoderClient(
+        index, fallback=remote_client if fallback_to_remote else None
+    )
+
+
+@inject
+async def get_geocoder_client(
+    backend: str = Provide(get_option(lambda s: s.geocoder.backend)),
+) -> IGeocoderClient:
+    # Picodi Note:
+    #   Same as `get_user_repository` - we want to create only one
+    #   of the geocoder clients, depending on the settings.
+    #   Functions decorated with `inject` can be called directly,
+    #   Picodi will resolve their dependencies.
+    #   So the gazetteer index is opened only when "offline" backend is used.
+    if backend == "open_meteo":
+        return await get_open_meteo_geocoder_client()
+    if backend == "offline":
+        return await get_offline_geocoder_client()
+    raise ValueError(f"Unsupported geocoder backend: {backend}")
 
 
 # Picodi Note:
@@ -208,8 +871,13 @@ async def get_geocoder_client(
 @inject
 def dependencies_for_init(
     db_type: str = Provide(get_option(lambda s: s.database.type)),
+    filter_settings: EmailFilterSettings = Provide(
+        get_option(lambda s: s.email_filter)
+    ),
 ) -> list[Callable]:
     if db_type == "redis":
+        if filter_settings.enabled:
+            return [get_redis_client, get_redis_binary_client]
         return [get_redis_client]
 
     return []
@@ -0,0 +1,104 @@
+"""
+Geohash encoding of coordinates.
+
+Geohash splits the world into a grid of cells and names every cell with
+a short string; nearby points share the cell and the name prefix.
+Each character adds 5 bits of precision, approximate cell sizes are:
+
+    precision  cell size (width x height)
+    5          4.9 km x 4.9 km
+    6          1.2 km x 0.6 km
+    7          153 m x 153 m
+    8          38 m x 19 m
+
+It's used to turn raw coordinates into stable keys for caches,
+request coalescing and prefetching.
+"""
+
+from __future__ import annotations
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_INDEX = {char: index for index, char in enumerate(_BASE32)}
+
+MAX_PRECISION = 12
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int) -> str:
+    """
+    Get geohash of the cell with the point.
+
+    :raises ValueError: if coordinates or precision are out of range.
+    """
+    if not 1 <= precision <= MAX_PRECISION:
+        raise ValueError(f"Precision must be between 1 and {MAX_PRECISION}")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError(f"Invalid coordinates: {latitude},{longitude}")
+    bits = precision * 5
+    # Longitude gets the first bit and every other one after it
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    lon_index = _to_cell_index(longitude, -180.0, 360.0, lon_bits)
+    lat_index = _to_cell_index(latitude, -90.0, 180.0, lat_bits)
+
+    value = 0
+    for bit in range(bits):
+        if bit % 2 == 0:
+            lon_bits -= 1
+            value = (value << 1) | ((lon_index >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            value = (value << 1) | ((lat_index >> lat_bits) & 1)
+
+    return "".join(
+        _BASE32[(value >> shift) & 0b11111] for shift in range(bits - 5, -1, -5)
+    )
+
+
+def geohash_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """
+    Get bounds of the geohash cell as
+    `(min_latitude, max_latitude, min_longitude, max_longitude)`.
+
+    :raises ValueError: if geohash is invalid.
+    """
+    if not 1 <= len(geohash) <= MAX_PRECISION:
+        raise ValueError(f"Invalid geohash: {geohash!r}")
+    value = 0
+    for char in geohash:
+        try:
+            value = (value << 5) | _BASE32_INDEX[char]
+        except KeyError:
+            raise ValueError(f"Invalid geohash: {geohash!r}") from None
+
+    bits = len(geohash) * 5
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    lon_index = lat_index = 0
+    for bit in range(bits):
+        bit_value = (value >> (bits - 1 - bit)) & 1
+        if bit % 2 == 0:
+            lon_index = (lon_index << 1) | bit_value
+        else:
+            lat_index = (lat_index << 1) | bit_value
+
+    lat_size = 180.0 / (1 << lat_bits)
+    lon_size = 360.0 / (1 << lon_bits)
+    min_lat = -90.0 + lat_index * lat_size
+    min_lon = -180.0 + lon_index * lon_size
+    return min_lat, min_lat + lat_size, min_lon, min_lon + lon_size
+
+
+def decode_geohash(geohash: str) -> tuple[float, float]:
+    """
+    Get `(latitude, longitude)` of the geohash cell centroid.
+
+    :raises ValueError: if geohash is invalid.
+    """
+    min_lat, max_lat, min_lon, max_lon = geohash_bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def _to_cell_index(value: float, start: float, size: float, bits: int) -> int:
+    cells = 1 << bits
+    # Max value (e.g. 90 latitude) belongs to the last cell
+    return min(int((value - start) / size * cells), cells - 1)
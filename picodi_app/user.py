@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import abc
 import uuid
+from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from picodi_app.weather import Coordinates
 
 
+class UserAlreadyExistsError(Exception):
+    pass
+
+
 @dataclass
 class User:
     id: str
@@ -21,9 +28,37 @@ class IUserRepository(abc.ABC):
     @abc.abstractmethod
     async def get_user_by_email(self, email: str) -> User | None: ...
 
+    @abc.abstractmethod
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        """
+        Get users by emails in one batch.
+        Unknown emails are missing in the result.
+        """
+
     @abc.abstractmethod
     async def create_user(self, user: User) -> None: ...
 
+    @abc.abstractmethod
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        """
+        Create users in one batch. Users whose emails are already taken
+        (also by previous users of the batch) are skipped.
+
+        :return: skipped users.
+        """
+
+    @abc.abstractmethod
+    async def get_locations(self) -> list[Coordinates]:
+        """
+        Get distinct locations of all users.
+        """
+
+    @abc.abstractmethod
+    def iter_emails(self) -> AsyncIterator[str]:
+        """
+        Iterate over emails of all users.
+        """
+
 
 def generate_new_user_id() -> str:
     return uuid.uuid4().hex
@@ -1,16 +1,19 @@
 import asyncio
 import hashlib
 import os
-from collections.abc import AsyncGenerator, Callable, Coroutine
+from collections.abc import AsyncGenerator, Awaitable, Callable, Coroutine, Hashable
+from concurrent.futures import Executor
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from functools import partial, wraps
-from typing import ParamSpec, TypeVar
+from typing import Generic, ParamSpec, TypeVar
 
 import anyio
 from anyio.to_thread import current_default_thread_limiter
 
 T = TypeVar("T")
 P = ParamSpec("P")
+K = TypeVar("K", bound=Hashable)
 
 
 def sync_to_async(sync_fn: Callable[P, T]) -> Callable[P, Coroutine[None, None, T]]:
@@ -41,6 +44,65 @@ def verify_password(stored_password: str, provided_password: str) -> bool:
     return pwdhash == pwdhash_check.hex()
 
 
+class PasswordHasherOverloadedError(Exception):
+    pass
+
+
+@dataclass
+class PasswordHasherStats:
+    completed: int = 0
+    rejected: int = 0
+    pending: int = 0
+    max_pending: int = 0
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification in `executor`, so PBKDF2
+    doesn't block the event loop. Process pool gives true parallelism,
+    thread pool is cheaper and is enough too, because `hashlib`
+    releases the GIL while hashing.
+
+    At most `max_pending` jobs can be running or waiting for a worker,
+    new jobs above that are rejected with `PasswordHasherOverloadedError`
+    instead of piling up in the executor queue.
+    """
+
+    def __init__(self, executor: Executor, max_pending: int) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be greater than 0")
+        self._executor = executor
+        self._max_pending = max_pending
+        self._stats = PasswordHasherStats(max_pending=max_pending)
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_password(
+        self, stored_password: str, provided_password: str
+    ) -> bool:
+        return await self._run(verify_password, stored_password, provided_password)
+
+    def stats(self) -> PasswordHasherStats:
+        return PasswordHasherStats(**vars(self._stats))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _run(self, fn: Callable[..., T], *args: str) -> T:
+        if self._stats.pending >= self._max_pending:
+            self._stats.rejected += 1
+            raise PasswordHasherOverloadedError("Too many pending password jobs")
+        self._stats.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._stats.pending -= 1
+        self._stats.completed += 1
+        return result
+
+
 @asynccontextmanager
 async def rewrite_error(
     error: type[Exception] | tuple[type[Exception], ...], new_error: Exception
@@ -51,6 +113,37 @@ async def rewrite_error(
         raise new_error from e
 
 
+class SingleFlight(Generic[K, T]):
+    """
+    Coalesce concurrent calls with the same key into one call.
+    The first caller starts the call in a separate task, the others
+    just wait for its result. Cancelling one of the callers doesn't cancel
+    the shared call for the others.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[K, asyncio.Future[T]] = {}
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(partial(self._on_done, key))
+        return await asyncio.shield(future)
+
+    def _on_done(self, key: K, future: asyncio.Future[T]) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Mark exception as retrieved, otherwise asyncio will log it
+        #   if all callers were cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
 async def monitor_thread_limiter() -> None:
     # https://github.com/Kludex/fastapi-tips
     limiter = current_default_thread_limiter()
@@ -1,54 +1,164 @@
 from __future__ import annotations
 
 import abc
-from dataclasses import dataclass
+import unicodedata
+from array import array
+from collections.abc import Iterable, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, overload
+
+from picodi_app.geohash import decode_geohash, encode_geohash
 
 if TYPE_CHECKING:
-    from datetime import datetime
+    from collections.abc import Generator
 
 
 class CantGetDataError(Exception):
     pass
 
 
+@dataclass
+class DataFreshnessTracker:
+    stale: bool = False
+    # For how long data can be cached, if it's limited by the data source
+    #   (e.g. data was taken from a shared cache and expires there soon)
+    ttl: float | None = None
+
+
+_data_freshness_tracker: ContextVar[DataFreshnessTracker | None] = ContextVar(
+    "data_freshness_tracker", default=None
+)
+
+
+@contextmanager
+def track_data_freshness() -> Generator[DataFreshnessTracker, None, None]:
+    """
+    Track freshness of data returned by clients inside this context:
+    if it's stale (e.g. last known value was returned because upstream
+    is unavailable) and for how long it can be cached.
+    """
+    tracker = DataFreshnessTracker()
+    token = _data_freshness_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _data_freshness_tracker.reset(token)
+
+
+def mark_data_as_stale() -> None:
+    tracker = _data_freshness_tracker.get()
+    if tracker is not None:
+        tracker.stale = True
+
+
+def limit_data_ttl(ttl: float) -> None:
+    tracker = _data_freshness_tracker.get()
+    if tracker is not None:
+        tracker.ttl = ttl if tracker.ttl is None else min(tracker.ttl, ttl)
+
+
+_refresh_forced: ContextVar[bool] = ContextVar("refresh_forced", default=False)
+
+
+@contextmanager
+def force_refresh() -> Generator[None, None, None]:
+    """
+    Make clients inside this context skip locally cached values
+    and get fresh data from upstream (e.g. for prefetching).
+    """
+    token = _refresh_forced.set(True)
+    try:
+        yield
+    finally:
+        _refresh_forced.reset(token)
+
+
+def is_refresh_forced() -> bool:
+    return _refresh_forced.get()
+
+
 class TemperatureUnit(Enum):
     celsius = "°C"
     fahrenheit = "°F"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Temperature:
     value: float
     unit: TemperatureUnit
+    # Converted value is computed once, because cached instances
+    #   can be converted many times
+    _celsius: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_celsius", self._to_celsius())
 
     def in_celsius(self) -> float:
-        if self.unit == TemperatureUnit.celsius:
+        return self._celsius
+
+    def _to_celsius(self) -> float:
+        if self.unit is TemperatureUnit.celsius:
             return self.value
-        if self.unit == TemperatureUnit.fahrenheit:
+        if self.unit is TemperatureUnit.fahrenheit:
             return round(((self.value - 32) * 5 / 9), 2)
         raise ValueError(f"Unknown temperature unit: {self.unit}")
 
 
+def temperatures_in_celsius(
+    values: Iterable[float], unit: TemperatureUnit
+) -> array[float]:
+    """
+    Vectorized version of `Temperature.in_celsius`.
+    """
+    if unit is TemperatureUnit.celsius:
+        return array("d", values)
+    if unit is TemperatureUnit.fahrenheit:
+        return array("d", [round(((value - 32) * 5 / 9), 2) for value in values])
+    raise ValueError(f"Unknown temperature unit: {unit}")
+
+
 class SpeedUnit(Enum):
     km_h = "km/h"
     m_s = "m/s"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Speed:
     value: float
     unit: SpeedUnit
+    _meters_per_second: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_meters_per_second", self._to_meters_per_second())
 
     def in_meters_per_second(self) -> float:
-        if self.unit == SpeedUnit.m_s:
+        return self._meters_per_second
+
+    def _to_meters_per_second(self) -> float:
+        if self.unit is SpeedUnit.m_s:
             return self.value
-        if self.unit == SpeedUnit.km_h:
+        if self.unit is SpeedUnit.km_h:
             return round(((5 / 18) * self.value), 2)
         raise ValueError(f"Unknown speed unit: {self.unit}")
 
 
+def speeds_in_meters_per_second(
+    values: Iterable[float], unit: SpeedUnit
+) -> array[float]:
+    """
+    Vectorized version of `Speed.in_meters_per_second`.
+    """
+    if unit is SpeedUnit.m_s:
+        return array("d", values)
+    if unit is SpeedUnit.km_h:
+        return array("d", [round(((5 / 18) * value), 2) for value in values])
+    raise ValueError(f"Unknown speed unit: {unit}")
+
+
 class WindDirection(Enum):
     N = "N"
     NE = "NE"
@@ -61,13 +171,24 @@ class WindDirection(Enum):
 
     @classmethod
     def from_degrees(cls, degrees: float) -> WindDirection:
-        directions = list(cls)
+        return _WIND_DIRECTIONS[round(degrees / _WIND_SECTOR) % len(_WIND_DIRECTIONS)]
+
+    @classmethod
+    def from_degrees_many(cls, degrees: Iterable[float]) -> list[WindDirection]:
+        directions = _WIND_DIRECTIONS
         directions_length = len(directions)
-        index = round(degrees / (360 // directions_length)) % directions_length
-        return directions[index]
+        sector = _WIND_SECTOR
+        return [
+            directions[round(value / sector) % directions_length] for value in degrees
+        ]
 
 
-@dataclass
+# Lookup table for `WindDirection.from_degrees`, ordered clockwise from north
+_WIND_DIRECTIONS = tuple(WindDirection)
+_WIND_SECTOR = 360 // len(_WIND_DIRECTIONS)
+
+
+@dataclass(frozen=True, slots=True)
 class WeatherData:
     temperature: Temperature
     humidity: float
@@ -76,7 +197,7 @@ class WeatherData:
     wind_direction: WindDirection
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Coordinates:
     latitude: float
     longitude: float
@@ -89,18 +210,143 @@ class Coordinates:
     def to_string(self) -> str:
         return f"{self.latitude},{self.longitude}"
 
+    @classmethod
+    def from_geohash(cls, geohash: str) -> Coordinates:
+        """
+        Get coordinates of the geohash cell centroid.
+        """
+        latitude, longitude = decode_geohash(geohash)
+        return cls(latitude=latitude, longitude=longitude)
+
+    def geohash(self, precision: int) -> str:
+        """
+        Get geohash of the cell with these coordinates, it can be used as
+        a location key, so nearby points share it.
+        Precision 6 is roughly 1 km cell, 7 - roughly 150 m.
+        """
+        return encode_geohash(self.latitude, self.longitude, precision)
+
+    def snapped(self, precision: int) -> Coordinates:
+        """
+        Snap coordinates to the centroid of their geohash cell,
+        so all points of the cell become the same canonical point.
+        """
+        return Coordinates.from_geohash(self.geohash(precision))
+
+
+class Forecast(Sequence[tuple[datetime, WeatherData]]):
+    """
+    Hourly forecast stored column-wise: one compact array per measurement
+    instead of a `WeatherData` object per hour. Units are stored once
+    for the whole column and conversions are done for whole columns.
+
+    For backward compatibility forecast still behaves like a sequence of
+    `(time, WeatherData)` tuples, rows are built lazily on access.
+    """
+
+    __slots__ = (
+        "time",
+        "temperature",
+        "temperature_unit",
+        "humidity",
+        "precipitation",
+        "wind_speed",
+        "wind_speed_unit",
+        "wind_direction",
+    )
+
+    def __init__(
+        self,
+        time: Iterable[datetime],
+        temperature: Iterable[float],
+        temperature_unit: TemperatureUnit,
+        humidity: Iterable[float],
+        precipitation: Iterable[bool],
+        wind_speed: Iterable[float],
+        wind_speed_unit: SpeedUnit,
+        wind_direction: Iterable[float],
+    ) -> None:
+        """
+        :param wind_direction: wind direction in degrees.
+        """
+        self.time = list(time)
+        self.temperature = array("d", temperature)
+        self.temperature_unit = temperature_unit
+        self.humidity = array("d", humidity)
+        self.precipitation = array("b", precipitation)
+        self.wind_speed = array("d", wind_speed)
+        self.wind_speed_unit = wind_speed_unit
+        self.wind_direction = array("d", wind_direction)
+        columns = (
+            self.temperature,
+            self.humidity,
+            self.precipitation,
+            self.wind_speed,
+            self.wind_direction,
+        )
+        if any(len(column) != len(self.time) for column in columns):
+            raise ValueError("All forecast columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[datetime, WeatherData]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[tuple[datetime, WeatherData]]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> tuple[datetime, WeatherData] | list[tuple[datetime, WeatherData]]:
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Forecast index out of range")
+        return self._row(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Forecast):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"<Forecast: {len(self)} hours>"
+
+    def temperatures_in_celsius(self) -> array[float]:
+        return temperatures_in_celsius(self.temperature, self.temperature_unit)
+
+    def wind_speeds_in_meters_per_second(self) -> array[float]:
+        return speeds_in_meters_per_second(self.wind_speed, self.wind_speed_unit)
+
+    def wind_directions(self) -> list[WindDirection]:
+        return WindDirection.from_degrees_many(self.wind_direction)
+
+    def _row(self, index: int) -> tuple[datetime, WeatherData]:
+        return self.time[index], WeatherData(
+            temperature=Temperature(self.temperature[index], self.temperature_unit),
+            humidity=self.humidity[index],
+            precipitation=bool(self.precipitation[index]),
+            wind_speed=Speed(self.wind_speed[index], self.wind_speed_unit),
+            wind_direction=WindDirection.from_degrees(self.wind_direction[index]),
+        )
+
 
 class IWeatherClient(abc.ABC):
     @abc.abstractmethod
     async def get_current_weather(self, coords: Coordinates) -> WeatherData: ...
 
     @abc.abstractmethod
-    async def get_forecast(
-        self, coords: Coordinates, days: int
-    ) -> list[tuple[datetime, WeatherData]]: ...
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast: ...
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class City:
     name: str
     coordinates: Coordinates
@@ -110,3 +356,13 @@ class City:
 class IGeocoderClient(abc.ABC):
     @abc.abstractmethod
     async def get_coordinates_by_city(self, city: str) -> list[City]: ...
+
+
+def normalize_city_name(city: str) -> str:
+    """
+    Normalize city name for lookups: case-fold, strip diacritics
+    and collapse repeated whitespace. E.g. "  Kraków " -> "krakow".
+    """
+    decomposed = unicodedata.normalize("NFKD", city.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
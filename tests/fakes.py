@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from picodi_app.user import IUserRepository, User
+from picodi_app.weather import (
+    City,
+    Coordinates,
+    Forecast,
+    IGeocoderClient,
+    IWeatherClient,
+    Speed,
+    SpeedUnit,
+    Temperature,
+    TemperatureUnit,
+    WeatherData,
+    WindDirection,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+def create_weather_data(temperature: float = 20.0) -> WeatherData:
+    return WeatherData(
+        temperature=Temperature(temperature, TemperatureUnit.celsius),
+        humidity=50.0,
+        precipitation=False,
+        wind_speed=Speed(5.0, SpeedUnit.m_s),
+        wind_direction=WindDirection.N,
+    )
+
+
+def create_forecast(hours: int = 24) -> Forecast:
+    return Forecast(
+        time=[datetime(2024, 1, 1) + timedelta(hours=hour) for hour in range(hours)],
+        temperature=[float(hour) for hour in range(hours)],
+        temperature_unit=TemperatureUnit.celsius,
+        humidity=[50.0] * hours,
+        precipitation=[False] * hours,
+        wind_speed=[5.0] * hours,
+        wind_speed_unit=SpeedUnit.m_s,
+        wind_direction=[0.0] * hours,
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeWeatherClient(IWeatherClient):
+    def __init__(self) -> None:
+        self.current_weather_calls: list[Coordinates] = []
+        self.forecast_calls: list[tuple[Coordinates, int]] = []
+
+    async def get_current_weather(self, coords: Coordinates) -> WeatherData:
+        self.current_weather_calls.append(coords)
+        return create_weather_data(temperature=coords.latitude)
+
+    async def get_forecast(self, coords: Coordinates, days: int) -> Forecast:
+        self.forecast_calls.append((coords, days))
+        return create_forecast(hours=24 * days)
+
+
+class FakeGeocoderClient(IGeocoderClient):
+    def __init__(self, known_cities: tuple[str, ...] = ("Kyiv",)) -> None:
+        self.calls: list[str] = []
+        self._known_cities = known_cities
+
+    async def get_coordinates_by_city(self, city: str) -> list[City]:
+        self.calls.append(city)
+        if city not in self._known_cities:
+            return []
+        return [
+            City(
+                name=city,
+                coordinates=Coordinates(latitude=50.45, longitude=30.52),
+                description="Ukraine",
+            )
+        ]
+
+
+class FakeUserRepository(IUserRepository):
+    def __init__(self, users: list[User] | None = None) -> None:
+        self.users = {user.email: user for user in users or []}
+
+    async def get_user_by_email(self, email: str) -> User | None:
+        return self.users.get(email)
+
+    async def get_users_by_emails(self, emails: Sequence[str]) -> dict[str, User]:
+        return {email: self.users[email] for email in emails if email in self.users}
+
+    async def create_user(self, user: User) -> None:
+        self.users[user.email] = user
+
+    async def create_users(self, users: Sequence[User]) -> list[User]:
+        skipped = []
+        for user in users:
+            if user.email in self.users:
+                skipped.append(user)
+            else:
+                self.users[user.email] = user
+        return skipped
+
+    async def get_locations(self) -> list[Coordinates]:
+        return list({user.location for user in self.users.values()})
+
+    async def iter_emails(self) -> AsyncIterator[str]:
+        for email in list(self.users):
+            yield email
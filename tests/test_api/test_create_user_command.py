@@ -33,6 +33,12 @@ def test_cant_create_user_with_invalid_coords(invalid_coords):
         create_user_main(["me@me.com", "mypassword", invalid_coords])
 
 
+@pytest.mark.parametrize("invalid_coords", ["95.0,30.52", "50.45,-181.0"])
+def test_cant_create_user_with_out_of_range_coords(invalid_coords):
+    with pytest.raises(SystemExit, match="out of range"):
+        create_user_main(["me@me.com", "mypassword", invalid_coords])
+
+
 async def test_can_create_user_from_cli_and_use_it_in_api(api_client):
     await create_user_main(["me@me.com", "mypassword", "50.45466,30.5238"])
 
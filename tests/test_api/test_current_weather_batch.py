@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from picodi_app.deps import get_weather_client
+from picodi_app.weather import CantGetDataError
+
+from ..fakes import FakeWeatherClient
+
+pytestmark = [
+    pytest.mark.integration,
+    # Overridden `picodi_overrides` is requested dynamically,
+    #   so parametrized settings must be requested explicitly
+    pytest.mark.usefixtures("settings_for_tests"),
+]
+
+
+BROKEN_LATITUDE = 13.0
+
+
+class SlowWeatherClient(FakeWeatherClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_progress = 0
+        self.max_in_progress = 0
+
+    async def get_current_weather(self, coords):
+        if coords.latitude < 0:
+            raise CantGetDataError("Can't get current weather data")
+        if coords.latitude == BROKEN_LATITUDE:
+            raise RuntimeError("Unexpected error")
+        self.in_progress += 1
+        self.max_in_progress = max(self.max_in_progress, self.in_progress)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().get_current_weather(coords)
+        finally:
+            self.in_progress -= 1
+
+
+@pytest.fixture()
+def weather_client():
+    return SlowWeatherClient()
+
+
+@pytest.fixture()
+def picodi_overrides(picodi_overrides, weather_client):
+    return [*picodi_overrides, (get_weather_client, lambda: weather_client)]
+
+
+def location(latitude, longitude=30.52):
+    return {"latitude": latitude, "longitude": longitude}
+
+
+async def test_can_get_current_weather_for_many_locations(api_client):
+    response = await api_client.post(
+        "/weather/current/batch",
+        json={"locations": [location(50.45), location(-10.0), location(40.0)]},
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["coordinates"] for result in results] == [
+        location(50.45),
+        location(-10.0),
+        location(40.0),
+    ]
+    assert [result["error"] for result in results] == [
+        None,
+        "Can't get current weather data",
+        None,
+    ]
+    assert results[0]["weather"]["temperature"] == 50
+    assert results[1]["weather"] is None
+    assert results[2]["weather"]["temperature"] == 40
+    assert not any(result["stale"] for result in results)
+
+
+async def test_identical_locations_are_looked_up_once(api_client, weather_client):
+    response = await api_client.post(
+        "/weather/current/batch",
+        json={"locations": [location(50.45), location(40.0), location(50.45)]},
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert results[0] == results[2]
+    assert len(weather_client.current_weather_calls) == 2
+
+
+async def test_lookups_concurrency_is_limited(
+    api_client, weather_client, settings_for_tests
+):
+    settings_for_tests.api.current_weather_batch_concurrency = 3
+
+    response = await api_client.post(
+        "/weather/current/batch",
+        json={"locations": [location(float(lat)) for lat in range(10)]},
+    )
+
+    assert response.status_code == 200, response.text
+    assert len(weather_client.current_weather_calls) == 10
+    assert weather_client.max_in_progress == 3
+
+
+async def test_cant_request_more_locations_than_limit(api_client, settings_for_tests):
+    settings_for_tests.api.current_weather_batch_limit = 2
+
+    response = await api_client.post(
+        "/weather/current/batch",
+        json={"locations": [location(1.0), location(2.0), location(3.0)]},
+    )
+
+    assert response.status_code == 422, response.text
+    assert "max 2" in response.json()["detail"]
+
+
+async def test_cant_request_empty_batch(api_client):
+    response = await api_client.post("/weather/current/batch", json={"locations": []})
+
+    assert response.status_code == 422, response.text
+
+
+async def test_unexpected_error_fails_only_its_location(api_client):
+    response = await api_client.post(
+        "/weather/current/batch",
+        json={
+            "locations": [location(50.45), location(BROKEN_LATITUDE), location(40.0)]
+        },
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["error"] for result in results] == [
+        None,
+        "Can't get current weather data",
+        None,
+    ]
+    assert results[0]["weather"]["temperature"] == 50
+    assert results[1]["weather"] is None
+    assert results[2]["weather"]["temperature"] == 40
@@ -0,0 +1,32 @@
+import pytest
+
+from picodi_app.deps import get_weather_client
+
+from ..fakes import FakeWeatherClient
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def picodi_overrides(picodi_overrides):
+    return [*picodi_overrides, (get_weather_client, FakeWeatherClient)]
+
+
+@pytest.mark.parametrize(
+    "url,params",
+    [
+        ("/weather/current", {"latitude": 50.45, "longitude": 30.52}),
+        ("/weather/forecast", {"latitude": 50.45, "longitude": 30.52, "days": 7}),
+    ],
+)
+async def test_fast_json_response_is_same_as_pydantic_response(
+    api_client, settings_for_tests, url, params
+):
+    settings_for_tests.api.fast_json_responses = False
+    pydantic_response = await api_client.get(url, params=params, auth=("", ""))
+    settings_for_tests.api.fast_json_responses = True
+    fast_response = await api_client.get(url, params=params, auth=("", ""))
+
+    assert fast_response.status_code == 200, fast_response.text
+    assert fast_response.content == pydantic_response.content
+    assert fast_response.headers == pydantic_response.headers
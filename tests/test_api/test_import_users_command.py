@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from picodi_app.cli.import_users import main as import_users_main
+from picodi_app.conf import SqliteDatabaseSettings
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def settings_for_tests(settings_for_tests, tmpdir):
+    if not isinstance(settings_for_tests.database.settings, SqliteDatabaseSettings):
+        return settings_for_tests
+
+    # `import_users` will close the database connection,
+    #   so we need to use a file-based database
+    settings_for_tests.database.settings.db_name = str(tmpdir / "db.sqlite")
+    return settings_for_tests
+
+
+def read_rejected(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+async def test_can_import_users_from_csv_and_use_them_in_api(api_client, tmp_path):
+    source = tmp_path / "users.csv"
+    source.write_text(
+        "email,password,location\n"
+        'first@me.com,password1,"50.45,30.52"\n'
+        'second@me.com,password2,"51.5,0.12"\n'
+        'third@me.com,password3,"52.52,13.4"\n'
+    )
+
+    stats = await import_users_main(
+        [str(source), "--workers", "1", "--batch-size", "2"]
+    )
+
+    assert (stats.imported, stats.rejected) == (3, 0)
+    for email, password in [
+        ("first@me.com", "password1"),
+        ("third@me.com", "password3"),
+    ]:
+        response = await api_client.get("/users/whoami", auth=(email, password))
+        assert response.status_code == 200, response.text
+        assert response.json()["email"] == email
+    assert read_rejected(f"{source}.rejected.jsonl") == []
+
+
+@pytest.mark.usefixtures("user_in_db")
+async def test_invalid_and_taken_rows_are_rejected(tmp_path):
+    source = tmp_path / "users.jsonl"
+    rows = [
+        ("new@me.com", "12345678", "50.45,30.52"),
+        ("me@me.com", "12345678", "50.45,30.52"),
+        ("new@me.com", "12345678", "50.45,30.52"),
+        ("invalid", "12345678", "50.45,30.52"),
+        ("other@me.com", "", "50.45,30.52"),
+        ("other@me.com", "12345678", "50.45"),
+        ("other@me.com", "12345678", "95.0,30.52"),
+    ]
+    source.write_text(
+        "".join(
+            json.dumps(dict(zip(("email", "password", "location"), row))) + "\n"
+            for row in rows
+        )
+        + "not json\n"
+    )
+    rejected_path = tmp_path / "rejected.jsonl"
+
+    stats = await import_users_main(
+        [str(source), "--rejected", str(rejected_path), "--workers", "1"]
+    )
+
+    assert (stats.imported, stats.rejected) == (1, 7)
+    assert sorted(read_rejected(rejected_path), key=lambda row: row["line"]) == [
+        {"line": 2, "email": "me@me.com", "reason": "Email is already taken"},
+        {"line": 3, "email": "new@me.com", "reason": "Email is already taken"},
+        {"line": 4, "email": "invalid", "reason": "Invalid email"},
+        {"line": 5, "email": "other@me.com", "reason": "Empty password"},
+        {"line": 6, "email": "other@me.com", "reason": "Invalid location format"},
+        {"line": 7, "email": "other@me.com", "reason": "Location is out of range"},
+        {"line": 8, "email": None, "reason": "Can't parse row"},
+    ]
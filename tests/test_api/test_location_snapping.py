@@ -0,0 +1,92 @@
+import httpx
+import pytest
+
+from picodi_app.deps import get_open_meteo_http_client
+
+pytestmark = [
+    pytest.mark.integration,
+    # Overridden `picodi_overrides` is requested dynamically,
+    #   so parametrized settings must be requested explicitly
+    pytest.mark.usefixtures("settings_for_tests"),
+]
+
+
+def current_weather_data(latitude, longitude):
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "current_units": {"temperature_2m": "°C", "wind_speed_10m": "km/h"},
+        "current": {
+            "temperature_2m": 20.0,
+            "relative_humidity_2m": 50,
+            "precipitation": 0.0,
+            "wind_speed_10m": 10.0,
+            "wind_direction_10m": 90,
+        },
+    }
+
+
+class OpenMeteoStub:
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        latitudes = request.url.params["latitude"].split(",")
+        longitudes = request.url.params["longitude"].split(",")
+        data = [
+            current_weather_data(float(lat), float(lon))
+            for lat, lon in zip(latitudes, longitudes, strict=True)
+        ]
+        return httpx.Response(200, json=data[0] if len(data) == 1 else data)
+
+
+@pytest.fixture()
+def stub():
+    return OpenMeteoStub()
+
+
+@pytest.fixture()
+async def http_client(stub):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(stub)) as client:
+        yield client
+
+
+@pytest.fixture()
+def picodi_overrides(picodi_overrides, http_client):
+    return [*picodi_overrides, (get_open_meteo_http_client, lambda: http_client)]
+
+
+async def test_nearby_points_share_upstream_request_of_their_cell(api_client, stub):
+    for latitude, longitude in [(50.45466, 30.5238), (50.45467, 30.5239)]:
+        response = await api_client.get(
+            "/weather/current",
+            params={"latitude": latitude, "longitude": longitude},
+            auth=("", ""),
+        )
+        assert response.status_code == 200, response.text
+
+    assert len(stub.requests) == 1
+    assert stub.requests[0].url.params["latitude"] != "50.45466"
+
+
+@pytest.mark.parametrize(
+    "latitude,longitude", [(95.0, 30.0), (-91.0, 30.0), (50.0, 181.0)]
+)
+async def test_out_of_range_coordinates_are_rejected(api_client, latitude, longitude):
+    response = await api_client.get(
+        "/weather/current",
+        params={"latitude": latitude, "longitude": longitude},
+        auth=("", ""),
+    )
+
+    assert response.status_code == 422, response.text
+
+
+async def test_out_of_range_coordinates_are_rejected_in_batch(api_client):
+    response = await api_client.post(
+        "/weather/current/batch",
+        json={"locations": [{"latitude": 95, "longitude": 30}]},
+    )
+
+    assert response.status_code == 422, response.text
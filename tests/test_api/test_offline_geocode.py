@@ -0,0 +1,40 @@
+import pytest
+
+from picodi_app.conf import GeocoderSettings
+from picodi_app.data_access.gazetteer import read_geonames, write_index
+
+from ..test_gazetteer import GEONAMES_DUMP
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def settings_for_tests(settings_for_tests, tmp_path):
+    index_path = tmp_path / "gazetteer.idx"
+    with open(index_path, "wb") as file:
+        write_index(read_geonames(GEONAMES_DUMP), file)
+
+    settings_for_tests.geocoder = GeocoderSettings(
+        backend="offline",
+        index_path=str(index_path),
+        fallback_to_remote=False,
+    )
+    return settings_for_tests
+
+
+async def test_can_geocode_city_with_offline_geocoder(api_client):
+    response = await api_client.get("/weather/geocode", params={"city": "Kyiv"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()[0] == {
+        "name": "Kyiv",
+        "coordinates": {"latitude": 50.45466, "longitude": 30.5238},
+        "description": "UA; 12",
+    }
+
+
+async def test_offline_geocoder_returns_empty_list_for_unknown_city(api_client):
+    response = await api_client.get("/weather/geocode", params={"city": "Paris"})
+
+    assert response.status_code == 200, response.text
+    assert response.json() == []
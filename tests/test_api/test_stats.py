@@ -0,0 +1,133 @@
+import pytest
+from picodi.helpers import resolve
+
+from picodi_app.conf import ApiSettings
+from picodi_app.deps import get_weather_cache
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def settings_for_tests(settings_for_tests):
+    settings_for_tests.api = ApiSettings(stats_enabled=True)
+    return settings_for_tests
+
+
+async def test_stats_are_not_available_if_disabled(api_client, settings_for_tests):
+    settings_for_tests.api = ApiSettings(stats_enabled=False)
+
+    response = await api_client.get("/stats/weather-cache")
+
+    assert response.status_code == 404, response.text
+
+
+async def test_can_get_weather_cache_stats(api_client):
+    with resolve(get_weather_cache) as cache:
+        cache.set("key", "value", ttl=60)
+        cache.get("key")
+
+    response = await api_client.get("/stats/weather-cache")
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "hits": 1,
+        "misses": 0,
+        "evictions": 0,
+        "expirations": 0,
+        "size": 1,
+        "max_size": 4096,
+        "hit_ratio": 1.0,
+    }
+
+
+async def test_can_get_weather_resilience_stats(api_client):
+    response = await api_client.get("/stats/weather-resilience")
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "circuit_breaker": {
+            "state": "closed",
+            "successes": 0,
+            "failures": 0,
+            "slow_calls": 0,
+            "rejected": 0,
+            "times_opened": 0,
+        },
+        "stale_served": 0,
+        "background_refreshes": 0,
+        "failed_refreshes": 0,
+    }
+
+
+async def test_can_get_shared_cache_stats(api_client):
+    response = await api_client.get("/stats/shared-cache")
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "enabled": False,
+        "hits": 0,
+        "misses": 0,
+        "errors": 0,
+        "stored_bytes": 0,
+        "compressed": 0,
+        "expirations": 0,
+        "evictions": 0,
+    }
+
+
+async def test_can_get_credentials_cache_stats(api_client, user_in_db):
+    await api_client.get("/users/whoami", auth=(user_in_db.email, "12345678"))
+    await api_client.get("/users/whoami", auth=(user_in_db.email, "12345678"))
+
+    response = await api_client.get("/stats/credentials-cache")
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "expirations": 0,
+        "size": 1,
+        "max_size": 10000,
+        "hit_ratio": 0.5,
+    }
+
+
+async def test_can_get_user_cache_stats(api_client, user_in_db):
+    await api_client.get("/users/whoami", auth=(user_in_db.email, "wrong"))
+    await api_client.get("/users/whoami", auth=(user_in_db.email, "wrong"))
+
+    response = await api_client.get("/stats/user-cache")
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "expirations": 0,
+        "size": 1,
+        "max_size": 10000,
+        "hit_ratio": 0.5,
+    }
+
+
+async def test_can_get_email_filter_stats(api_client, settings_for_tests):
+    settings_for_tests.email_filter.enabled = True
+
+    response = await api_client.get("/stats/email-filter")
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        # Filter needs the shared store in Redis database
+        "enabled": settings_for_tests.database.type == "redis",
+        "ready": False,
+        "rejected": 0,
+        "passed": 0,
+        "rebuilds": 0,
+        "syncs": 0,
+        "emails": 0,
+        "size": 0,
+        "hashes": 0,
+        "estimated_false_positive_rate": 0.0,
+        "last_rebuild_duration": 0.0,
+    }
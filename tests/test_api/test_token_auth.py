@@ -0,0 +1,100 @@
+import pytest
+from picodi import registry
+
+from picodi_app.auth import TokenSigner
+from picodi_app.conf import AuthTokenSettings
+from picodi_app.deps import get_password_hasher, get_user_repository
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+def settings_for_tests(settings_for_tests):
+    settings_for_tests.auth_tokens = AuthTokenSettings(secret="test-secret")
+    return settings_for_tests
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.usefixtures("user_in_db")
+async def test_can_exchange_credentials_for_token(api_client):
+    response = await api_client.post("/users/token", auth=("me@me.com", "12345678"))
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["token_type"] == "bearer"
+    assert data["expires_in"] == 900
+    assert data["access_token"]
+
+
+@pytest.mark.usefixtures("user_in_db")
+async def test_cant_exchange_wrong_credentials_for_token(api_client):
+    response = await api_client.post("/users/token", auth=("me@me.com", "wrong"))
+
+    assert response.status_code == 401, response.text
+
+
+@pytest.mark.usefixtures("user_in_db")
+async def test_cant_exchange_token_for_another_token(api_client):
+    response = await api_client.post("/users/token", auth=("me@me.com", "12345678"))
+    token = response.json()["access_token"]
+
+    response = await api_client.post("/users/token", headers=bearer(token))
+
+    assert response.status_code == 401, response.text
+
+
+async def test_whoami_with_token_return_user_info(api_client, user_in_db):
+    response = await api_client.post("/users/token", auth=("me@me.com", "12345678"))
+    token = response.json()["access_token"]
+
+    response = await api_client.get("/users/whoami", headers=bearer(token))
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"id": user_in_db.id, "email": "me@me.com"}
+
+
+async def test_whoami_with_invalid_token_return_401(api_client):
+    response = await api_client.get("/users/whoami", headers=bearer("invalid"))
+
+    assert response.status_code == 401, response.text
+    assert response.json()["detail"] == "Invalid credentials"
+
+
+async def test_whoami_without_credentials_return_401(api_client):
+    response = await api_client.get("/users/whoami")
+
+    assert response.status_code == 401, response.text
+    assert response.headers["WWW-Authenticate"] == "Basic"
+
+
+async def test_tokens_are_disabled_without_secret(
+    api_client, user_in_db, settings_for_tests
+):
+    settings_for_tests.auth_tokens = AuthTokenSettings(secret=None)
+    token = TokenSigner(b"test-secret", ttl=900).issue(user_in_db)
+
+    token_response = await api_client.post(
+        "/users/token", auth=("me@me.com", "12345678")
+    )
+    whoami_response = await api_client.get("/users/whoami", headers=bearer(token))
+
+    assert token_response.status_code == 503, token_response.text
+    assert whoami_response.status_code == 401, whoami_response.text
+
+
+async def test_token_requests_dont_use_user_storage(api_client, user_in_db):
+    token = TokenSigner(b"test-secret", ttl=900).issue(user_in_db)
+
+    def unavailable():
+        raise AssertionError("Must not be resolved")
+
+    with (
+        registry.override(get_user_repository, unavailable),
+        registry.override(get_password_hasher, unavailable),
+    ):
+        response = await api_client.get("/users/whoami", headers=bearer(token))
+
+    assert response.status_code == 200, response.text
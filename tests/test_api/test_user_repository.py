@@ -0,0 +1,65 @@
+import dataclasses
+
+import pytest
+
+from picodi_app.weather import Coordinates
+
+pytestmark = pytest.mark.integration
+
+
+async def test_can_get_distinct_users_locations(user_repository, mother):
+    for number, location in enumerate(
+        [Coordinates(50.45, 30.52), Coordinates(50.45, 30.52), Coordinates(51.5, 0.12)]
+    ):
+        await user_repository.create_user(
+            mother.create_user(
+                id=str(number), email=f"{number}@localhost", location=location
+            )
+        )
+
+    locations = await user_repository.get_locations()
+
+    assert sorted(locations, key=str) == [
+        Coordinates(50.45, 30.52),
+        Coordinates(51.5, 0.12),
+    ]
+
+
+async def test_can_iterate_over_users_emails(user_repository, mother):
+    for number in range(5):
+        await user_repository.create_user(
+            mother.create_user(id=str(number), email=f"{number}@localhost")
+        )
+
+    emails = [email async for email in user_repository.iter_emails()]
+
+    assert sorted(emails) == [f"{number}@localhost" for number in range(5)]
+
+
+async def test_can_create_users_in_batch(user_repository, mother):
+    taken = mother.create_user(id="0", email="taken@localhost")
+    await user_repository.create_user(taken)
+    new_user = dataclasses.replace(taken, id="1", email="new@localhost")
+    repeated = dataclasses.replace(taken, id="2", email="new@localhost")
+    rewritten = dataclasses.replace(taken, id="3")
+
+    skipped = await user_repository.create_users([new_user, repeated, rewritten])
+
+    assert skipped == [repeated, rewritten]
+    assert await user_repository.get_user_by_email("new@localhost") == new_user
+    assert await user_repository.get_user_by_email("taken@localhost") == taken
+
+
+async def test_can_get_users_by_emails(user_repository, mother):
+    user = mother.create_user(id="0", email="0@localhost")
+    users = [
+        dataclasses.replace(user, id=str(n), email=f"{n}@localhost") for n in range(3)
+    ]
+    await user_repository.create_users(users)
+
+    found = await user_repository.get_users_by_emails(
+        ["2@localhost", "unknown@localhost", "0@localhost", "2@localhost"]
+    )
+
+    assert found == {"2@localhost": users[2], "0@localhost": users[0]}
+    assert await user_repository.get_users_by_emails([]) == {}
@@ -2,11 +2,20 @@ from datetime import datetime
 
 import pytest
 
+from picodi_app.conf import LocationSettings
 from picodi_app.weather import WindDirection
 
 pytestmark = pytest.mark.integration
 
 
+@pytest.fixture()
+def settings_for_tests(settings_for_tests):
+    # Recorded cassettes contain upstream requests for exact coordinates,
+    #   snapping is tested in `test_location_snapping`
+    settings_for_tests.locations = LocationSettings(snap_to_cell_centroid=False)
+    return settings_for_tests
+
+
 async def test_anonymous_cant_get_forecast_not_specifying_coords(api_client):
     response = await api_client.get("/weather/forecast", auth=("", ""))
 
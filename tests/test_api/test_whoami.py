@@ -1,4 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from picodi import registry
+
+from picodi_app.deps import get_password_hasher
+from picodi_app.utils import PasswordHasher, PasswordHasherOverloadedError
 
 pytestmark = pytest.mark.integration
 
@@ -44,3 +50,46 @@ async def test_whoami_with_valid_password_return_user_info(
         "id": "00000000000000000000000000000001",
         "email": "me@me.com",
     }
+
+
+class OverloadedPasswordHasher(PasswordHasher):
+    def __init__(self) -> None:
+        super().__init__(ThreadPoolExecutor(max_workers=1), max_pending=1)
+
+    async def verify_password(self, *args):  # noqa: U100
+        raise PasswordHasherOverloadedError("Too many pending password jobs")
+
+
+async def test_whoami_when_password_hasher_is_overloaded_return_503(
+    api_client, user_in_db
+):
+    with registry.override(get_password_hasher, OverloadedPasswordHasher):
+        response = await api_client.get(
+            "/users/whoami", auth=(user_in_db.email, "12345678")
+        )
+
+    assert response.status_code == 503, response.text
+    assert response.headers["Retry-After"] == "1"
+
+
+class CountingPasswordHasher(PasswordHasher):
+    def __init__(self) -> None:
+        super().__init__(ThreadPoolExecutor(max_workers=1), max_pending=1)
+        self.verifications = 0
+
+    async def verify_password(self, *args):
+        self.verifications += 1
+        return await super().verify_password(*args)
+
+
+async def test_repeated_requests_dont_verify_password_again(api_client, user_in_db):
+    hasher = CountingPasswordHasher()
+    with registry.override(get_password_hasher, lambda: hasher):
+        for _ in range(3):
+            response = await api_client.get(
+                "/users/whoami", auth=(user_in_db.email, "12345678")
+            )
+            assert response.status_code == 200, response.text
+
+    assert hasher.verifications == 1
+    hasher.shutdown()
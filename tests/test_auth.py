@@ -0,0 +1,121 @@
+import base64
+
+import pytest
+
+from picodi_app.auth import (
+    CredentialsCache,
+    CredentialsCacheUserRepository,
+    InvalidTokenError,
+    TokenSigner,
+)
+from picodi_app.cache import TTLCache
+from picodi_app.weather import Coordinates
+
+from .fakes import FakeClock, FakeUserRepository
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def credentials_cache(clock):
+    return CredentialsCache(TTLCache(max_size=10, clock=clock), ttl=60)
+
+
+def test_cached_credentials_return_user(credentials_cache, mother):
+    user = mother.create_user(email="me@me.com")
+    credentials_cache.set("me@me.com", "12345678", user)
+
+    assert credentials_cache.get("me@me.com", "12345678") is user
+
+
+def test_cached_credentials_with_other_password_return_none(credentials_cache, mother):
+    credentials_cache.set("me@me.com", "12345678", mother.create_user())
+
+    assert credentials_cache.get("me@me.com", "87654321") is None
+
+
+def test_cached_credentials_expire(credentials_cache, mother, clock):
+    credentials_cache.set("me@me.com", "12345678", mother.create_user())
+
+    clock.now += 61
+
+    assert credentials_cache.get("me@me.com", "12345678") is None
+
+
+def test_password_is_not_stored_in_cache(clock, mother):
+    cache = TTLCache(max_size=10, clock=clock)
+    credentials_cache = CredentialsCache(cache, ttl=60)
+
+    credentials_cache.set("me@me.com", "12345678", mother.create_user())
+
+    digest, _ = cache.get("me@me.com")
+    assert b"12345678" not in digest
+
+
+async def test_credentials_of_rewritten_user_are_invalidated(credentials_cache, mother):
+    user = mother.create_user(email="me@me.com")
+    credentials_cache.set("me@me.com", "12345678", user)
+    repo = CredentialsCacheUserRepository(
+        FakeUserRepository(), credentials_cache=credentials_cache
+    )
+
+    await repo.create_user(user)
+
+    assert credentials_cache.get("me@me.com", "12345678") is None
+    assert await repo.get_user_by_email("me@me.com") is user
+
+
+@pytest.fixture()
+def token_signer(clock):
+    return TokenSigner(b"secret", ttl=900, clock=clock)
+
+
+def test_user_can_be_restored_from_token(token_signer, mother):
+    user = mother.create_user(
+        id="00000000000000000000000000000001",
+        email="me@me.com",
+        location=Coordinates(50.45, 30.52),
+    )
+
+    restored = token_signer.verify(token_signer.issue(user))
+
+    assert restored.id == "00000000000000000000000000000001"
+    assert restored.email == "me@me.com"
+    assert restored.location == Coordinates(50.45, 30.52)
+    assert not restored.hashed_password
+
+
+def test_expired_token_is_rejected(token_signer, mother, clock):
+    token = token_signer.issue(mother.create_user())
+
+    clock.now += 900
+
+    with pytest.raises(InvalidTokenError, match="Token expired"):
+        token_signer.verify(token)
+
+
+def test_token_signed_with_other_secret_is_rejected(token_signer, mother, clock):
+    token = TokenSigner(b"other", ttl=900, clock=clock).issue(mother.create_user())
+
+    with pytest.raises(InvalidTokenError, match="Invalid token signature"):
+        token_signer.verify(token)
+
+
+def test_token_with_modified_payload_is_rejected(token_signer, mother):
+    token = token_signer.issue(mother.create_user(email="me@me.com"))
+    payload, signature = token.split(".")
+    forged_payload = base64.urlsafe_b64encode(
+        base64.urlsafe_b64decode(payload + "==").replace(b"me@me.com", b"he@me.com")
+    ).rstrip(b"=")
+
+    with pytest.raises(InvalidTokenError, match="Invalid token signature"):
+        token_signer.verify(f"{forged_payload.decode()}.{signature}")
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "a.b.c", "a.!!!"])
+def test_malformed_token_is_rejected(token_signer, token):
+    with pytest.raises(InvalidTokenError, match="Malformed token|Invalid token"):
+        token_signer.verify(token)
@@ -0,0 +1,77 @@
+import pytest
+
+from picodi_app.bloom import BloomFilter
+
+
+def test_added_items_are_always_found():
+    bloom = BloomFilter.for_capacity(1000, false_positive_rate=0.01)
+    emails = [f"user{number}@localhost" for number in range(1000)]
+
+    for email in emails:
+        bloom.add(email)
+
+    assert all(email in bloom for email in emails)
+
+
+def test_empty_filter_doesnt_contain_anything():
+    bloom = BloomFilter.for_capacity(1000, false_positive_rate=0.01)
+
+    assert "me@me.com" not in bloom
+
+
+@pytest.mark.parametrize("false_positive_rate", [0.1, 0.01, 0.001])
+def test_false_positive_rate_is_close_to_configured(false_positive_rate):
+    capacity = 10_000
+    bloom = BloomFilter.for_capacity(capacity, false_positive_rate)
+    for number in range(capacity):
+        bloom.add(f"user{number}@localhost")
+
+    lookups = 100_000
+    false_positives = sum(
+        f"unknown{number}@localhost" in bloom for number in range(lookups)
+    )
+
+    assert false_positives / lookups < false_positive_rate * 1.5
+    assert bloom.estimated_false_positive_rate() == pytest.approx(
+        false_positive_rate, rel=0.5
+    )
+
+
+def test_filter_is_sized_from_capacity_and_false_positive_rate():
+    bloom = BloomFilter.for_capacity(1000, false_positive_rate=0.01)
+
+    # ~9.6 bits and 7 hash functions per item for 1% false positives
+    assert bloom.size == 9586
+    assert bloom.hashes == 7
+
+
+def test_filter_can_be_restored_from_bytes():
+    bloom = BloomFilter(1000, 3)
+    bloom.add("me@me.com")
+
+    restored = BloomFilter(1000, 3, bloom.to_bytes())
+
+    assert "me@me.com" in restored
+
+
+def test_bits_are_laid_out_like_in_redis():
+    bloom = BloomFilter(16, 1)
+    position = bloom.positions("me@me.com")[0]
+
+    bloom.add("me@me.com")
+
+    # Redis `SETBIT key 0 1` sets the most significant bit of the first byte
+    assert int.from_bytes(bloom.to_bytes(), "big") == 1 << (15 - position)
+
+
+@pytest.mark.parametrize(
+    "capacity, false_positive_rate", [(0, 0.01), (100, 0), (100, 1)]
+)
+def test_cant_create_filter_with_invalid_parameters(capacity, false_positive_rate):
+    with pytest.raises(ValueError, match="must be"):
+        BloomFilter.for_capacity(capacity, false_positive_rate)
+
+
+def test_cant_restore_filter_from_bytes_of_wrong_length():
+    with pytest.raises(ValueError, match="Expected 125 bytes"):
+        BloomFilter(1000, 3, b"\0")
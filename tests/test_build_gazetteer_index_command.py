@@ -0,0 +1,17 @@
+from picodi_app.cli.build_gazetteer_index import main as build_index_main
+from picodi_app.data_access.gazetteer import GazetteerIndex
+
+from .test_gazetteer import GEONAMES_DUMP
+
+
+def test_build_gazetteer_index_command(tmp_path, capsys):
+    source = tmp_path / "cities.txt"
+    source.write_text("".join(GEONAMES_DUMP), encoding="utf-8")
+    output = tmp_path / "gazetteer.idx"
+
+    build_index_main([str(source), "--output", str(output), "--min-population", "1000"])
+
+    assert "Indexed 5 cities" in capsys.readouterr().out
+    index = GazetteerIndex(str(output))
+    assert [city.name for city in index.lookup("kra")] == ["Kraków"]
+    index.close()
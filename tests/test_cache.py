@@ -0,0 +1,73 @@
+import pytest
+
+from picodi_app.cache import TTLCache
+
+from .fakes import FakeClock
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+def test_get_missing_key_raises_key_error(clock):
+    cache = TTLCache(max_size=10, clock=clock)
+
+    with pytest.raises(KeyError):
+        cache.get("missing")
+
+    assert cache.stats().misses == 1
+
+
+def test_get_stored_value(clock):
+    cache = TTLCache(max_size=10, clock=clock)
+    cache.set("key", "value", ttl=10)
+
+    assert cache.get("key") == "value"
+    assert cache.stats().hits == 1
+
+
+def test_expired_value_is_removed(clock):
+    cache = TTLCache(max_size=10, clock=clock)
+    cache.set("key", "value", ttl=10)
+    clock.now = 10
+
+    with pytest.raises(KeyError):
+        cache.get("key")
+
+    stats = cache.stats()
+    assert stats.expirations == 1
+    assert stats.misses == 1
+    assert stats.size == 0
+
+
+def test_least_recently_used_value_is_evicted(clock):
+    cache = TTLCache(max_size=2, clock=clock)
+    cache.set("first", 1, ttl=10)
+    cache.set("second", 2, ttl=10)
+    cache.get("first")
+
+    cache.set("third", 3, ttl=10)
+
+    assert cache.get("first") == 1
+    assert cache.get("third") == 3
+    with pytest.raises(KeyError):
+        cache.get("second")
+    assert cache.stats().evictions == 1
+
+
+def test_hit_ratio(clock):
+    cache = TTLCache(max_size=10, clock=clock)
+    cache.set("key", "value", ttl=10)
+    cache.get("key")
+    cache.get("key")
+    cache.get("key")
+    with pytest.raises(KeyError):
+        cache.get("missing")
+
+    assert cache.stats().hit_ratio == 0.75
+
+
+def test_cant_create_cache_with_zero_size():
+    with pytest.raises(ValueError, match="max_size"):
+        TTLCache(max_size=0)
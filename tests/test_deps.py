@@ -0,0 +1,72 @@
+import socket
+
+import picodi
+from picodi.helpers import resolve
+
+from picodi_app.conf import (
+    DatabaseSettings,
+    RedisDatabaseSettings,
+    Settings,
+    SqliteDatabaseSettings,
+)
+from picodi_app.deps import (
+    get_open_meteo_http_client,
+    get_redis_client,
+    get_settings,
+    get_sqlite_pool,
+)
+
+
+async def test_open_meteo_http_client_is_shared_between_resolves():
+    async with resolve(get_open_meteo_http_client) as first_client:
+        async with resolve(get_open_meteo_http_client) as second_client:
+            assert first_client is second_client
+
+
+async def test_open_meteo_http_client_is_closed_on_shutdown():
+    async with resolve(get_open_meteo_http_client) as client:
+        assert client.is_closed is False
+
+    await picodi.registry.shutdown()
+
+    assert client.is_closed is True
+
+
+def test_sqlite_pool_uses_profile_with_overridden_values(tmp_path):
+    settings = Settings(
+        database=DatabaseSettings(
+            type="sqlite",
+            settings=SqliteDatabaseSettings(
+                db_name=str(tmp_path / "db.sqlite"), profile="fast", cache_size=-1024
+            ),
+        )
+    )
+
+    with picodi.registry.override(get_settings, lambda: settings):
+        with resolve(get_sqlite_pool) as pool:
+            pragmas = pool.pragmas()
+        picodi.registry.shutdown()
+
+    assert pragmas["synchronous"] == 0
+    assert pragmas["cache_size"] == -1024
+
+
+async def test_redis_client_uses_pool_settings():
+    settings = Settings(
+        database=DatabaseSettings(
+            type="redis",
+            settings=RedisDatabaseSettings(
+                max_connections=7, pool_timeout=1, keepalive_count=3
+            ),
+        )
+    )
+
+    with picodi.registry.override(get_settings, lambda: settings):
+        async with resolve(get_redis_client) as client:
+            pool = client.connection_pool
+        await picodi.registry.shutdown()
+
+    assert pool.max_connections == 7
+    assert pool.timeout == 1
+    assert pool.connection_kwargs["socket_keepalive"] is True
+    assert pool.connection_kwargs["socket_keepalive_options"] == {socket.TCP_KEEPCNT: 3}
@@ -0,0 +1,161 @@
+import pytest
+
+from picodi_app.data_access.gazetteer import (
+    GazetteerIndex,
+    GazetteerIndexError,
+    OfflineGeocoderClient,
+    read_code_names,
+    read_geonames,
+    write_index,
+)
+from picodi_app.weather import City, Coordinates, IGeocoderClient
+
+
+def geonames_row(id, name, ascii_name, lat, lon, country, admin1, population):
+    columns = [
+        str(id),
+        name,
+        ascii_name,
+        "",
+        str(lat),
+        str(lon),
+        "P",
+        "PPL",
+        country,
+        "",
+        admin1,
+        "",
+        "",
+        "",
+        str(population),
+        "",
+        "",
+        "Europe/Kyiv",
+        "2024-01-01",
+    ]
+    return "\t".join(columns) + "\n"
+
+
+GEONAMES_DUMP = [
+    geonames_row(1, "Kyiv", "Kyiv", 50.45466, 30.5238, "UA", "12", 2797553),
+    geonames_row(2, "Kyivska", "Kyivska", 50.1, 30.1, "UA", "13", 1000),
+    geonames_row(3, "Kraków", "Krakow", 50.06143, 19.93658, "PL", "77", 755050),
+    geonames_row(4, "Kramatorsk", "Kramatorsk", 48.72305, 37.55629, "UA", "05", 150),
+    geonames_row(5, "London", "London", 51.50853, -0.12574, "GB", "ENG", 8961989),
+    geonames_row(6, "London", "London", 42.98339, -81.23304, "CA", "08", 346765),
+    "# comment line\n",
+    "broken line\n",
+]
+
+
+@pytest.fixture()
+def index_path(tmp_path):
+    path = tmp_path / "gazetteer.idx"
+    records = read_geonames(
+        GEONAMES_DUMP,
+        countries={"UA": "Ukraine", "PL": "Poland"},
+        admin1={"UA.12": "Kyiv City"},
+    )
+    with open(path, "wb") as file:
+        write_index(records, file)
+    return str(path)
+
+
+@pytest.fixture()
+def index(index_path):
+    index = GazetteerIndex(index_path)
+    yield index
+    index.close()
+
+
+def test_index_contains_all_valid_rows(index):
+    assert len(index) == 6
+
+
+def test_exact_lookup(index):
+    result = index.lookup("Kyiv")
+
+    assert result[0] == City(
+        name="Kyiv",
+        coordinates=Coordinates(latitude=50.45466, longitude=30.5238),
+        description="Ukraine; Kyiv City",
+    )
+
+
+def test_exact_matches_go_before_prefix_matches(index):
+    result = index.lookup("kyiv")
+
+    assert [city.name for city in result] == ["Kyiv", "Kyivska"]
+
+
+def test_prefix_matches_are_ranked_by_population(index):
+    result = index.lookup("Kra")
+
+    assert [city.name for city in result] == ["Kraków", "Kramatorsk"]
+
+
+def test_same_names_are_ranked_by_population(index):
+    result = index.lookup("london")
+
+    assert [city.description for city in result] == ["GB; ENG", "CA; 08"]
+
+
+@pytest.mark.parametrize("query", ["Kraków", "krakow", "  KRAKOW "])
+def test_lookup_ignores_case_diacritics_and_spaces(index, query):
+    result = index.lookup(query)
+
+    assert [city.name for city in result] == ["Kraków"]
+
+
+def test_lookup_respects_limit(index):
+    result = index.lookup("k", limit=2)
+
+    assert [city.name for city in result] == ["Kyiv", "Kraków"]
+
+
+@pytest.mark.parametrize("query", ["Paris", "", "   "])
+def test_lookup_returns_empty_list_if_nothing_found(index, query):
+    assert index.lookup(query) == []
+
+
+def test_cant_open_invalid_index(tmp_path):
+    path = tmp_path / "invalid.idx"
+    path.write_bytes(b"not an index file")
+
+    with pytest.raises(GazetteerIndexError):
+        GazetteerIndex(str(path))
+
+
+def test_read_code_names():
+    lines = ["# comment\n", "UA.12\tKyiv City\tKyiv City\t703447\n"]
+
+    assert read_code_names(lines, name_column=1) == {"UA.12": "Kyiv City"}
+
+
+class FallbackGeocoderClient(IGeocoderClient):
+    def __init__(self):
+        self.calls = []
+
+    async def get_coordinates_by_city(self, city):
+        self.calls.append(city)
+        return [City(name=city, coordinates=Coordinates(1.0, 2.0), description="")]
+
+
+async def test_offline_geocoder_dont_use_fallback_if_city_found(index):
+    fallback = FallbackGeocoderClient()
+    client = OfflineGeocoderClient(index, fallback=fallback)
+
+    result = await client.get_coordinates_by_city("Kyiv")
+
+    assert result[0].name == "Kyiv"
+    assert fallback.calls == []
+
+
+async def test_offline_geocoder_uses_fallback_if_city_not_found(index):
+    fallback = FallbackGeocoderClient()
+    client = OfflineGeocoderClient(index, fallback=fallback)
+
+    result = await client.get_coordinates_by_city("Paris")
+
+    assert [city.name for city in result] == ["Paris"]
+    assert fallback.calls == ["Paris"]
@@ -0,0 +1,64 @@
+import pytest
+
+from picodi_app.geohash import decode_geohash, encode_geohash, geohash_bounds
+from picodi_app.weather import Coordinates
+
+
+@pytest.mark.parametrize(
+    "latitude,longitude,precision,expected",
+    [
+        (57.64911, 10.40744, 11, "u4pruydqqvj"),
+        (50.45466, 30.5238, 6, "u8vxn8"),
+        (40.7128, -74.006, 5, "dr5re"),
+        (-33.8688, 151.2093, 7, "r3gx2f7"),
+        (90, 180, 3, "zzz"),
+        (-90, -180, 3, "000"),
+    ],
+)
+def test_encode_geohash(latitude, longitude, precision, expected):
+    assert encode_geohash(latitude, longitude, precision) == expected
+
+
+@pytest.mark.parametrize(
+    "latitude,longitude,precision",
+    [(91, 0, 6), (0, -181, 6), (0, 0, 0), (0, 0, 13)],
+)
+def test_cant_encode_invalid_coordinates_or_precision(latitude, longitude, precision):
+    with pytest.raises(ValueError, match="Invalid coordinates|Precision must be"):
+        encode_geohash(latitude, longitude, precision)
+
+
+@pytest.mark.parametrize("geohash", ["", "u8vxna", "u8vxn8u8vxn8u"])
+def test_cant_decode_invalid_geohash(geohash):
+    with pytest.raises(ValueError, match="Invalid geohash"):
+        decode_geohash(geohash)
+
+
+def test_decoded_centroid_is_in_the_middle_of_the_cell():
+    min_lat, max_lat, min_lon, max_lon = geohash_bounds("u8vxn8")
+
+    latitude, longitude = decode_geohash("u8vxn8")
+
+    assert min_lat < 50.45466 < max_lat
+    assert min_lon < 30.5238 < max_lon
+    assert latitude == (min_lat + max_lat) / 2
+    assert longitude == (min_lon + max_lon) / 2
+    assert encode_geohash(latitude, longitude, 6) == "u8vxn8"
+
+
+def test_nearby_coordinates_share_geohash():
+    first = Coordinates(50.45466, 30.5238)
+    second = Coordinates(50.4547, 30.5239)
+
+    assert first.geohash(6) == second.geohash(6)
+    assert first.snapped(6) == second.snapped(6) == Coordinates.from_geohash("u8vxn8")
+
+
+def test_snapped_coordinates_stay_in_the_same_cell():
+    coords = Coordinates(-33.8688, 151.2093)
+
+    snapped = coords.snapped(7)
+
+    assert snapped != coords
+    assert snapped.geohash(7) == coords.geohash(7)
+    assert snapped.snapped(7) == snapped
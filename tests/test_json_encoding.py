@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from picodi_app.api.json_encoding import encode_forecast, encode_weather, json_response
+from picodi_app.api.routes.weather import ForecastResp, WeatherResp
+from picodi_app.weather import (
+    Forecast,
+    Speed,
+    SpeedUnit,
+    Temperature,
+    TemperatureUnit,
+    WeatherData,
+    WindDirection,
+)
+
+from .fakes import create_forecast
+
+
+def encode_with_pydantic(model):
+    return JSONResponse(model.model_dump(mode="json")).body
+
+
+@pytest.mark.parametrize(
+    "weather",
+    [
+        WeatherData(
+            temperature=Temperature(-3.5, TemperatureUnit.celsius),
+            humidity=74.5,
+            precipitation=True,
+            wind_speed=Speed(2.5, SpeedUnit.m_s),
+            wind_direction=WindDirection.SW,
+        ),
+        WeatherData(
+            temperature=Temperature(100.4, TemperatureUnit.fahrenheit),
+            humidity=0.0,
+            precipitation=False,
+            wind_speed=Speed(33.3, SpeedUnit.km_h),
+            wind_direction=WindDirection.N,
+        ),
+    ],
+)
+def test_weather_encoding_is_same_as_pydantic(weather):
+    result = encode_weather(weather)
+
+    assert result == encode_with_pydantic(WeatherResp.from_domain(weather))
+
+
+def test_forecast_encoding_is_same_as_pydantic():
+    hours = 24 * 7
+    forecast = Forecast(
+        time=[datetime(2024, 6, 1) + timedelta(hours=hour) for hour in range(hours)],
+        temperature=[-40 + hour * 0.75 for hour in range(hours)],
+        temperature_unit=TemperatureUnit.fahrenheit,
+        humidity=[hour * 0.6 for hour in range(hours)],
+        precipitation=[hour % 3 == 0 for hour in range(hours)],
+        wind_speed=[hour * 0.5 for hour in range(hours)],
+        wind_speed_unit=SpeedUnit.km_h,
+        wind_direction=[hour * 11.25 for hour in range(hours)],
+    )
+
+    result = encode_forecast(forecast)
+
+    assert result == encode_with_pydantic(ForecastResp.from_domain(forecast))
+
+
+def test_empty_forecast_encoding_is_same_as_pydantic():
+    forecast = create_forecast(hours=0)
+
+    result = encode_forecast(forecast)
+
+    assert result == encode_with_pydantic(ForecastResp.from_domain(forecast))
+
+
+def test_json_response_keeps_headers_set_on_response_dependency():
+    sub_response = Response()
+    del sub_response.headers["content-length"]
+    sub_response.headers["Warning"] = '110 - "Response is Stale"'
+
+    response = json_response(b"{}", sub_response)
+
+    assert response.body == b"{}"
+    assert response.headers["Warning"] == '110 - "Response is Stale"'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["content-length"] == "2"
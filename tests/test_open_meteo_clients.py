@@ -0,0 +1,15 @@
+import httpx
+
+from picodi_app.data_access.weather import OpenMeteoGeocoderClient
+
+
+async def test_geocoder_returns_empty_list_if_city_not_found():
+    def handler(_request):
+        return httpx.Response(200, json={"generationtime_ms": 0.5})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        client = OpenMeteoGeocoderClient(http)
+
+        result = await client.get_coordinates_by_city("Krakuw")
+
+    assert result == []
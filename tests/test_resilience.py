@@ -0,0 +1,236 @@
+import asyncio
+
+import pytest
+
+from picodi_app.data_access.resilience import (
+    CircuitBreaker,
+    CircuitState,
+    ResilientWeatherClient,
+    StaleWhileRevalidate,
+)
+from picodi_app.weather import (
+    CantGetDataError,
+    Coordinates,
+    force_refresh,
+    track_data_freshness,
+)
+
+from .fakes import FakeClock, FakeWeatherClient
+
+
+class FlakyWeatherClient(FakeWeatherClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.available = True
+        self.error: Exception = CantGetDataError("Upstream is down")
+
+    async def get_current_weather(self, coords):
+        if not self.available:
+            self.current_weather_calls.append(coords)
+            raise self.error
+        return await super().get_current_weather(coords)
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def breaker(clock):
+    return CircuitBreaker(
+        failure_rate_threshold=0.5,
+        slow_call_duration=1.0,
+        slow_call_rate_threshold=0.5,
+        window_size=4,
+        min_calls=4,
+        reset_timeout=30,
+        clock=clock,
+    )
+
+
+@pytest.fixture()
+def upstream():
+    return FlakyWeatherClient()
+
+
+@pytest.fixture()
+async def swr(breaker, clock):
+    swr = StaleWhileRevalidate(
+        breaker, soft_ttl=60, max_stale=3600, max_size=100, clock=clock
+    )
+    yield swr
+    await swr.close()
+
+
+@pytest.fixture()
+def weather_client(upstream, swr):
+    return ResilientWeatherClient(upstream, swr=swr, geohash_precision=6)
+
+
+def test_circuit_opens_when_failure_rate_reaches_threshold(breaker):
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_success(0.1)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state is CircuitState.open
+    assert breaker.allow_request() is False
+    assert breaker.stats().rejected == 1
+
+
+def test_circuit_doesnt_open_before_min_calls(breaker):
+    for _ in range(3):
+        breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state is CircuitState.closed
+
+
+def test_circuit_opens_when_slow_call_rate_reaches_threshold(breaker):
+    for duration in (0.1, 0.1, 1.5, 1.5):
+        breaker.allow_request()
+        breaker.record_success(duration)
+
+    assert breaker.state is CircuitState.open
+
+
+def test_circuit_allows_one_trial_call_after_reset_timeout(breaker, clock):
+    for _ in range(4):
+        breaker.allow_request()
+        breaker.record_failure()
+
+    clock.now += 30
+
+    assert breaker.allow_request() is True
+    assert breaker.state is CircuitState.half_open
+    assert breaker.allow_request() is False
+
+
+def test_successful_trial_call_closes_circuit(breaker, clock):
+    for _ in range(4):
+        breaker.allow_request()
+        breaker.record_failure()
+    clock.now += 30
+
+    breaker.allow_request()
+    breaker.record_success(0.1)
+
+    assert breaker.state is CircuitState.closed
+    assert breaker.stats().times_opened == 1
+
+
+def test_failed_trial_call_opens_circuit_again(breaker, clock):
+    for _ in range(4):
+        breaker.allow_request()
+        breaker.record_failure()
+    clock.now += 30
+
+    breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.open
+    assert breaker.allow_request() is False
+    assert breaker.stats().times_opened == 2
+
+
+async def test_fresh_value_is_returned_without_upstream_call(weather_client, upstream):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    with track_data_freshness() as tracker:
+        await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 1
+    assert tracker.stale is False
+
+
+async def test_outdated_value_is_served_stale_and_refreshed_in_background(
+    weather_client, upstream, swr, clock
+):
+    first = await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 61
+
+    with track_data_freshness() as tracker:
+        second = await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await asyncio.sleep(0)
+
+    assert second == first
+    assert tracker.stale is True
+    assert len(upstream.current_weather_calls) == 2
+    assert swr.stats().stale_served == 1
+    assert swr.stats().background_refreshes == 1
+
+
+async def test_last_known_value_is_served_when_circuit_is_open(
+    weather_client, upstream, breaker, clock
+):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    upstream.available = False
+    clock.now += 61
+    for _ in range(4):
+        breaker.allow_request()
+        breaker.record_failure()
+
+    with track_data_freshness() as tracker:
+        weather = await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert weather.temperature.value == 50.45
+    assert tracker.stale is True
+    assert len(upstream.current_weather_calls) == 1
+
+
+async def test_fails_fast_when_circuit_is_open_and_there_is_no_value(
+    weather_client, upstream
+):
+    upstream.available = False
+    for _ in range(4):
+        with pytest.raises(CantGetDataError):
+            await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    with pytest.raises(CantGetDataError, match="Upstream is unavailable"):
+        await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 4
+
+
+async def test_failed_background_refresh_is_counted(
+    weather_client, upstream, swr, clock
+):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    upstream.available = False
+    clock.now += 61
+
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await asyncio.sleep(0)
+
+    assert swr.stats().failed_refreshes == 1
+    assert swr.breaker.stats().failures == 1
+
+
+async def test_unexpected_error_of_background_refresh_is_counted(
+    weather_client, upstream, swr, clock
+):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    upstream.available = False
+    upstream.error = RuntimeError("Unexpected error")
+    clock.now += 61
+
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await asyncio.sleep(0)
+
+    assert swr.stats().failed_refreshes == 1
+    assert swr.breaker.stats().failures == 1
+
+
+async def test_fresh_value_is_refreshed_when_refresh_is_forced(
+    weather_client, upstream
+):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    with force_refresh(), track_data_freshness() as tracker:
+        await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 2
+    assert tracker.stale is False
@@ -3,7 +3,7 @@ from picodi.helpers import resolve
 
 from picodi_app.cli.migrate import main as migrate_main
 from picodi_app.conf import SqliteDatabaseSettings
-from picodi_app.deps import get_sqlite_connection
+from picodi_app.deps import get_sqlite_pool
 
 
 @pytest.fixture()
@@ -19,9 +19,11 @@ def settings_for_tests(settings_for_tests, tmpdir):
 def test_run_migration_command():
     migrate_main()
 
-    with resolve(get_sqlite_connection) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
+    with resolve(get_sqlite_pool) as pool:
+        tables = pool.read_sync(
+            lambda conn: conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table';"
+            ).fetchall()
+        )
 
     assert ("users",) in tables
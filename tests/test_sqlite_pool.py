@@ -0,0 +1,209 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from picodi_app.data_access.sqlite import (
+    SQLITE_PROFILES,
+    SqlitePool,
+    SqliteProfile,
+    create_tables,
+)
+from picodi_app.data_access.user import SqliteUserRepository
+from picodi_app.user import UserAlreadyExistsError
+
+
+@pytest.fixture(params=["memory", "file"])
+def pool(request, tmp_path):
+    database = ":memory:" if request.param == "memory" else str(tmp_path / "db.sqlite")
+    pool = SqlitePool(database, size=3, batch_window=0.01)
+    pool.write_sync(create_tables)
+    yield pool
+    pool.close()
+
+
+def insert_user(conn, email):
+    conn.execute(
+        "INSERT INTO users (id, email, location, hashed_password) "
+        "VALUES (?, ?, '50.45,30.52', '')",
+        (email, email),
+    )
+
+
+def count_users(conn):
+    return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+async def test_readers_see_committed_writes(pool):
+    await pool.write(insert_user, "me@me.com")
+
+    counts = await asyncio.gather(*[pool.read(count_users) for _ in range(10)])
+
+    assert counts == [1] * 10
+
+
+async def test_failed_write_is_rolled_back(pool):
+    def insert_and_fail(conn):
+        insert_user(conn, "me@me.com")
+        insert_user(conn, "me@me.com")
+
+    with pytest.raises(sqlite3.IntegrityError, match="UNIQUE"):
+        await pool.write(insert_and_fail)
+
+    assert await pool.read(count_users) == 0
+
+
+async def test_readers_dont_see_uncommitted_writes(pool):
+    inserted = threading.Event()
+    release = threading.Event()
+
+    def insert_wait_and_fail(conn):
+        insert_user(conn, "me@me.com")
+        inserted.set()
+        release.wait(timeout=5)
+        raise ValueError("Write failed")
+
+    write = asyncio.create_task(pool.write(insert_wait_and_fail))
+    await asyncio.to_thread(inserted.wait, 5)
+    read = asyncio.create_task(pool.read(count_users))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    with pytest.raises(ValueError, match="Write failed"):
+        await write
+    assert await read == 0
+
+
+async def test_concurrent_writes_are_committed_together(pool):
+    before = pool.write_stats()
+
+    await asyncio.gather(*[pool.write(insert_user, f"{i}@me.com") for i in range(10)])
+
+    after = pool.write_stats()
+    assert await pool.read(count_users) == 10
+    assert after.writes - before.writes == 10
+    assert after.commits - before.commits < 10
+
+
+async def test_failed_write_doesnt_affect_other_writes_in_batch(pool):
+    await pool.write(insert_user, "taken@me.com")
+
+    results = await asyncio.gather(
+        pool.write(insert_user, "first@me.com"),
+        pool.write(insert_user, "taken@me.com"),
+        pool.write(insert_user, "second@me.com"),
+        return_exceptions=True,
+    )
+
+    assert results[0] is None
+    assert isinstance(results[1], sqlite3.IntegrityError)
+    assert results[2] is None
+    assert await pool.read(count_users) == 3
+    assert pool.write_stats().failed_writes == 1
+
+
+async def test_write_results_are_returned_to_callers(pool):
+    def insert_and_count(conn, email):
+        insert_user(conn, email)
+        return count_users(conn)
+
+    counts = await asyncio.gather(
+        *[pool.write(insert_and_count, f"{i}@me.com") for i in range(3)]
+    )
+
+    assert sorted(counts) == [1, 2, 3]
+
+
+async def test_creating_user_with_taken_email_raises_error(pool, mother):
+    repo = SqliteUserRepository(pool)
+    await repo.create_user(mother.create_user(id="1", email="me@me.com"))
+
+    with pytest.raises(UserAlreadyExistsError, match="me@me.com"):
+        await repo.create_user(mother.create_user(id="2", email="me@me.com"))
+
+
+def test_cant_write_to_closed_pool():
+    pool = SqlitePool(":memory:", size=1)
+    pool.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.write_sync(create_tables)
+
+
+async def test_every_reader_thread_has_own_connection(pool):
+    barrier = threading.Barrier(3, timeout=5)
+
+    def get_connection(conn):
+        # Make all readers busy at once, so every read gets its own thread
+        barrier.wait()
+        return threading.get_ident(), id(conn)
+
+    results = await asyncio.gather(*[pool.read(get_connection) for _ in range(3)])
+
+    assert len({thread for thread, _ in results}) == 3
+    assert len({conn for _, conn in results}) == 3
+
+
+async def test_file_database_is_opened_in_wal_mode(tmp_path):
+    pool = SqlitePool(str(tmp_path / "db.sqlite"), size=1)
+
+    mode = await pool.read(lambda conn: conn.execute("PRAGMA journal_mode").fetchone())
+    pool.close()
+
+    assert mode == ("wal",)
+
+
+def test_profile_is_applied_to_all_connections(tmp_path):
+    profile = SqliteProfile(
+        synchronous="off", mmap_size=1024 * 1024, cache_size=-1024, temp_store="memory"
+    )
+    pool = SqlitePool(str(tmp_path / "db.sqlite"), size=1, profile=profile)
+
+    reader_pragmas = pool.pragmas()
+    writer_pragmas = pool.write_sync(
+        lambda conn: conn.execute("PRAGMA cache_size").fetchone()[0]
+    )
+    pool.close()
+
+    assert reader_pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 0,
+        "mmap_size": 1024 * 1024,
+        "cache_size": -1024,
+        "temp_store": 2,
+        "busy_timeout": 5000,
+    }
+    assert writer_pragmas == -1024
+
+
+@pytest.mark.parametrize("profile", list(SQLITE_PROFILES))
+def test_all_profiles_can_be_applied(profile):
+    pool = SqlitePool(":memory:", size=1, profile=SQLITE_PROFILES[profile])
+    pool.write_sync(create_tables)
+
+    users = pool.read_sync(count_users)
+    pool.close()
+
+    assert users == 0
+
+
+def test_in_memory_databases_of_different_pools_are_separate():
+    first = SqlitePool(":memory:", size=1)
+    second = SqlitePool(":memory:", size=1)
+    first.write_sync(create_tables)
+
+    tables = second.read_sync(
+        lambda conn: conn.execute("SELECT name FROM sqlite_master").fetchall()
+    )
+    first.close()
+    second.close()
+
+    assert tables == []
+
+
+def test_pool_can_be_closed_twice():
+    pool = SqlitePool(":memory:", size=1)
+
+    pool.close()
+    pool.close()
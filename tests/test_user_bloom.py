@@ -0,0 +1,244 @@
+import asyncio
+import os
+from dataclasses import replace
+
+import pytest
+from redis import asyncio as aioredis
+
+from picodi_app.data_access.user import RedisUserRepository
+from picodi_app.data_access.user_bloom import (
+    EmailFilter,
+    EmailFilterUserRepository,
+    RedisEmailFilterStore,
+)
+from picodi_app.user import User
+from picodi_app.weather import Coordinates
+
+from .fakes import FakeUserRepository
+
+
+class CountingUserRepository(FakeUserRepository):
+    def __init__(self, users=None) -> None:
+        super().__init__(users)
+        self.lookups = 0
+
+    async def get_user_by_email(self, email):
+        self.lookups += 1
+        return await super().get_user_by_email(email)
+
+
+@pytest.fixture()
+def upstream(mother):
+    user = mother.create_user()
+    return CountingUserRepository(
+        [replace(user, email=f"{number}@localhost") for number in range(100)]
+    )
+
+
+def create_email_filter(store=None):
+    return EmailFilter(
+        capacity=1000,
+        false_positive_rate=0.001,
+        rebuild_interval=600,
+        sync_interval=10,
+        store=store,
+    )
+
+
+@pytest.fixture()
+def email_filter():
+    return create_email_filter()
+
+
+@pytest.fixture()
+def repo(upstream, email_filter):
+    return EmailFilterUserRepository(upstream, email_filter=email_filter)
+
+
+async def test_all_emails_might_exist_until_filter_is_built(repo, upstream):
+    assert await repo.get_user_by_email("unknown@localhost") is None
+
+    assert upstream.lookups == 1
+
+
+async def test_lookup_of_unknown_email_doesnt_touch_repository(
+    repo, upstream, email_filter
+):
+    await email_filter.rebuild(upstream)
+
+    assert await repo.get_user_by_email("unknown@localhost") is None
+    assert (await repo.get_user_by_email("1@localhost")).email == "1@localhost"
+
+    assert upstream.lookups == 1
+    assert email_filter.stats().rejected == 1
+    assert email_filter.stats().emails == 100
+
+
+async def test_batch_lookup_skips_unknown_emails(repo, upstream, email_filter):
+    await email_filter.rebuild(upstream)
+
+    users = await repo.get_users_by_emails(["1@localhost", "unknown@localhost"])
+
+    assert list(users) == ["1@localhost"]
+    assert email_filter.stats().rejected == 1
+
+
+async def test_created_user_is_added_to_filter(repo, upstream, email_filter, mother):
+    await email_filter.rebuild(upstream)
+
+    await repo.create_user(mother.create_user(email="new@localhost"))
+
+    assert (await repo.get_user_by_email("new@localhost")).email == "new@localhost"
+
+
+async def test_users_created_in_batch_are_added_to_filter(
+    repo, upstream, email_filter, mother
+):
+    await email_filter.rebuild(upstream)
+    user = mother.create_user()
+
+    await repo.create_users(
+        [
+            replace(user, id=str(number), email=f"new{number}@localhost")
+            for number in range(3)
+        ]
+    )
+
+    assert email_filter.might_exist("new0@localhost")
+    assert email_filter.might_exist("new2@localhost")
+    assert email_filter.stats().emails == 103
+
+
+async def test_filter_is_built_on_start_and_rebuilt_periodically(upstream, mother):
+    email_filter = EmailFilter(
+        capacity=1000,
+        false_positive_rate=0.001,
+        rebuild_interval=0.01,
+        sync_interval=10,
+    )
+    email_filter.start(upstream)
+    await asyncio.sleep(0)
+    assert email_filter.stats().ready
+
+    # Created bypassing the filter, e.g. by another process
+    await upstream.create_user(mother.create_user(email="new@localhost"))
+    await asyncio.sleep(0.05)
+    await email_filter.close()
+
+    assert email_filter.might_exist("new@localhost")
+    assert email_filter.stats().rebuilds > 1
+
+
+async def test_filter_is_resized_when_there_are_more_emails_than_capacity():
+    user = User(
+        id="1",
+        email="1@localhost",
+        location=Coordinates(50.45, 30.52),
+        hashed_password="",
+    )
+    upstream = FakeUserRepository(
+        [replace(user, email=f"{number}@localhost") for number in range(3000)]
+    )
+    email_filter = create_email_filter()
+
+    await email_filter.rebuild(upstream)
+    first_size = email_filter.stats().size
+    await email_filter.rebuild(upstream)
+
+    assert email_filter.stats().size > first_size
+    assert email_filter.stats().estimated_false_positive_rate < 0.001
+
+
+@pytest.mark.integration
+class TestSharedViaRedis:
+    @pytest.fixture()
+    async def redis_client(self):
+        url = os.getenv("DATABASE__SETTINGS__URL", "redis://localhost:6379/1")
+        async with aioredis.from_url(url) as client:  # type: ignore
+            # Database is shared with Redis-backed API tests
+            await client.flushdb()
+            yield client
+            await client.flushdb()
+
+    @pytest.fixture()
+    def store(self, redis_client):
+        return RedisEmailFilterStore(redis_client, key_prefix="test:bloom:")
+
+    async def test_filter_keys_are_not_taken_for_users(self, store, upstream, mother):
+        url = os.getenv("DATABASE__SETTINGS__URL", "redis://localhost:6379/1")
+        async with aioredis.from_url(url, decode_responses=True) as client:
+            user_repo = RedisUserRepository(client)
+            await user_repo.create_user(
+                mother.create_user(location=Coordinates(50.45, 30.52))
+            )
+            await create_email_filter(store).rebuild(upstream)
+
+            locations = await user_repo.get_locations()
+            emails = [email async for email in user_repo.iter_emails()]
+            filter_keys = [key async for key in client.scan_iter(match="test:bloom:*")]
+            found_by_filter_keys = [
+                await user_repo.get_user_by_email(key) for key in filter_keys
+            ]
+            found_by_filter_keys_batch = await user_repo.get_users_by_emails(
+                filter_keys
+            )
+
+        assert Coordinates(50.45, 30.52) in locations
+        assert "test_user@localhost.localhost" in emails
+        assert not any(key in emails for key in filter_keys)
+        assert filter_keys
+        assert found_by_filter_keys == [None] * len(filter_keys)
+        assert found_by_filter_keys_batch == {}
+
+    async def test_filter_rebuilt_by_one_worker_is_loaded_by_others(
+        self, store, upstream
+    ):
+        first = create_email_filter(store)
+        second = create_email_filter(store)
+
+        first.start(upstream)
+        await asyncio.sleep(0.05)
+        second.start(upstream)
+        await asyncio.sleep(0.05)
+        await first.close()
+        await second.close()
+
+        assert first.stats().rebuilds == 1
+        assert second.stats().rebuilds == 0
+        assert second.stats().syncs == 1
+        assert second.might_exist("1@localhost")
+        assert not second.might_exist("unknown@localhost")
+
+    async def test_emails_added_by_other_processes_are_visible_after_sync(
+        self, store, upstream
+    ):
+        worker = create_email_filter(store)
+        await worker.rebuild(upstream)
+        # E.g. `create_user` command, it doesn't build the filter
+        command = create_email_filter(store)
+
+        await command.add("new@localhost")
+        assert not worker.might_exist("new@localhost")
+        await worker.sync()
+
+        assert worker.might_exist("new@localhost")
+
+    async def test_emails_added_in_batch_are_visible_after_sync(self, store, upstream):
+        worker = create_email_filter(store)
+        await worker.rebuild(upstream)
+
+        await create_email_filter(store).add_many(["new1@localhost", "new2@localhost"])
+        await worker.sync()
+
+        assert worker.might_exist("new1@localhost")
+        assert worker.might_exist("new2@localhost")
+
+    async def test_rebuild_keeps_emails_added_to_store_meanwhile(self, store, upstream):
+        worker = create_email_filter(store)
+        await worker.rebuild(upstream)
+        await store.add("new@localhost")
+
+        await worker.rebuild(upstream)
+        await worker.sync()
+
+        assert worker.might_exist("new@localhost")
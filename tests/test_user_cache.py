@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from picodi_app.cache import TTLCache
+from picodi_app.data_access.user_cache import CachedUserRepository, WriteCounter
+from picodi_app.utils import SingleFlight
+
+from .fakes import FakeClock, FakeUserRepository
+
+
+class CountingUserRepository(FakeUserRepository):
+    def __init__(self, users=None) -> None:
+        super().__init__(users)
+        self.lookups = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def get_user_by_email(self, email):
+        self.lookups += 1
+        user = await super().get_user_by_email(email)
+        await self.release.wait()
+        return user
+
+    async def get_users_by_emails(self, emails):
+        self.lookups += 1
+        return await super().get_users_by_emails(emails)
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def cache(clock):
+    return TTLCache(max_size=10, clock=clock)
+
+
+@pytest.fixture()
+def upstream(mother):
+    return CountingUserRepository([mother.create_user(email="me@me.com")])
+
+
+@pytest.fixture()
+def single_flight():
+    return SingleFlight()
+
+
+@pytest.fixture()
+def writes():
+    return WriteCounter()
+
+
+@pytest.fixture()
+def create_repo(upstream, cache, single_flight, writes):
+    # Repository is created for every request,
+    #   cache and its state are shared between them
+    def create_repo():
+        return CachedUserRepository(
+            upstream,
+            cache=cache,
+            single_flight=single_flight,
+            writes=writes,
+            ttl=60,
+            negative_ttl=5,
+        )
+
+    return create_repo
+
+
+@pytest.fixture()
+def repo(create_repo):
+    return create_repo()
+
+
+async def test_user_is_looked_up_once(repo, upstream):
+    first = await repo.get_user_by_email("me@me.com")
+    second = await repo.get_user_by_email("me@me.com")
+
+    assert first is second
+    assert first.email == "me@me.com"
+    assert upstream.lookups == 1
+
+
+async def test_cached_user_expires(repo, upstream, clock):
+    await repo.get_user_by_email("me@me.com")
+
+    clock.now += 61
+    await repo.get_user_by_email("me@me.com")
+
+    assert upstream.lookups == 2
+
+
+async def test_unknown_email_is_cached_with_negative_ttl(repo, upstream, clock):
+    assert await repo.get_user_by_email("unknown@me.com") is None
+    assert await repo.get_user_by_email("unknown@me.com") is None
+
+    clock.now += 6
+    assert await repo.get_user_by_email("unknown@me.com") is None
+
+    assert upstream.lookups == 2
+
+
+async def test_concurrent_lookups_are_coalesced(repo, upstream):
+    users = await asyncio.gather(
+        *[repo.get_user_by_email("me@me.com") for _ in range(5)]
+    )
+
+    assert all(user is users[0] for user in users)
+    assert upstream.lookups == 1
+
+
+async def test_created_user_is_visible_right_away(repo, mother):
+    assert await repo.get_user_by_email("new@me.com") is None
+
+    await repo.create_user(mother.create_user(email="new@me.com"))
+
+    user = await repo.get_user_by_email("new@me.com")
+    assert user.email == "new@me.com"
+
+
+async def test_lookup_racing_with_write_is_not_cached(repo, upstream, cache, mother):
+    upstream.release.clear()
+    lookup = asyncio.create_task(repo.get_user_by_email("new@me.com"))
+    while not upstream.lookups:
+        await asyncio.sleep(0)
+    await repo.create_user(mother.create_user(email="new@me.com"))
+    upstream.release.set()
+
+    assert await lookup is None
+    assert len(cache) == 0
+    assert (await repo.get_user_by_email("new@me.com")).email == "new@me.com"
+    assert upstream.lookups == 2
+
+
+async def test_lookup_racing_with_write_of_other_request_is_not_cached(
+    create_repo, upstream, cache, mother
+):
+    lookup_repo = create_repo()
+    write_repo = create_repo()
+    upstream.release.clear()
+    lookup = asyncio.create_task(lookup_repo.get_user_by_email("new@me.com"))
+    while not upstream.lookups:
+        await asyncio.sleep(0)
+    await write_repo.create_user(mother.create_user(email="new@me.com"))
+    upstream.release.set()
+
+    assert await lookup is None
+    assert len(cache) == 0
+    assert (await lookup_repo.get_user_by_email("new@me.com")).email == "new@me.com"
+
+
+async def test_batch_lookup_loads_only_uncached_emails(repo, upstream):
+    await repo.get_user_by_email("me@me.com")
+
+    users = await repo.get_users_by_emails(["me@me.com", "unknown@me.com"])
+    # Unknown email is cached too
+    await repo.get_users_by_emails(["me@me.com", "unknown@me.com"])
+
+    assert list(users) == ["me@me.com"]
+    assert upstream.lookups == 2
+    assert await repo.get_user_by_email("unknown@me.com") is None
+    assert upstream.lookups == 2
@@ -1,6 +1,13 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from picodi_app.utils import (
+    PasswordHasher,
+    PasswordHasherOverloadedError,
+    SingleFlight,
     hash_password,
     rewrite_error,
     sync_to_async,
@@ -20,6 +27,44 @@ def test_not_verify_wrong_password():
     assert verify_password(hashed, "87654321") is False
 
 
+@pytest.fixture()
+def password_hasher():
+    hasher = PasswordHasher(ThreadPoolExecutor(max_workers=2), max_pending=2)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_password_hasher_hashes_and_verifies_in_executor(password_hasher):
+    hashed = await password_hasher.hash_password("12345678")
+
+    assert await password_hasher.verify_password(hashed, "12345678") is True
+    assert await password_hasher.verify_password(hashed, "87654321") is False
+    assert password_hasher.stats().completed == 3
+    assert password_hasher.stats().pending == 0
+
+
+async def test_password_hasher_rejects_jobs_above_max_pending():
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    # Occupy the only worker, so jobs stay pending
+    executor.submit(release.wait)
+    hasher = PasswordHasher(executor, max_pending=2)
+    hashed = hash_password("12345678")
+
+    pending = [
+        asyncio.create_task(hasher.verify_password(hashed, "12345678"))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordHasherOverloadedError, match="Too many pending"):
+        await hasher.verify_password(hashed, "12345678")
+    release.set()
+
+    assert await asyncio.gather(*pending) == [True, True]
+    assert hasher.stats().rejected == 1
+    hasher.shutdown()
+
+
 async def test_sync_to_async():
     @sync_to_async
     def sync_fn():
@@ -37,3 +82,38 @@ async def test_rewrite_error():
 
     with pytest.raises(ValueError, match="new error"):
         await raise_error()
+
+
+async def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*[single_flight.do("key", fetch) for _ in range(5)])
+
+    assert results == [1, 1, 1, 1, 1]
+    assert calls == 1
+    assert len(single_flight) == 0
+
+
+async def test_single_flight_cancelling_one_caller_dont_cancel_others():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(single_flight.do("key", fetch))
+    second = asyncio.create_task(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 42
+    assert first.cancelled()
@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+
+from picodi_app.data_access.weather import OpenMeteoWeatherClient
+from picodi_app.data_access.weather_batching import (
+    BatchingWeatherClient,
+    CurrentWeatherBatcher,
+)
+from picodi_app.weather import CantGetDataError, Coordinates
+
+from .fakes import FakeWeatherClient
+
+
+def location_data(latitude):
+    return {
+        "latitude": latitude,
+        "current_units": {"temperature_2m": "°C", "wind_speed_10m": "km/h"},
+        "current": {
+            "temperature_2m": latitude,
+            "relative_humidity_2m": 50,
+            "precipitation": 0.0,
+            "wind_speed_10m": 10.0,
+            "wind_direction_10m": 90,
+        },
+    }
+
+
+class OpenMeteoStub:
+    def __init__(self, invalid_latitude=None, broken_latitude=None):
+        self.requests = []
+        self.invalid_latitude = invalid_latitude
+        self.broken_latitude = broken_latitude
+
+    def __call__(self, request):
+        self.requests.append(request)
+        latitudes = [float(item) for item in request.url.params["latitude"].split(",")]
+        if self.invalid_latitude in latitudes:
+            return httpx.Response(400, json={"error": True, "reason": "Invalid"})
+        data = [
+            {"latitude": lat} if lat == self.broken_latitude else location_data(lat)
+            for lat in latitudes
+        ]
+        return httpx.Response(200, json=data[0] if len(data) == 1 else data)
+
+
+@pytest.fixture()
+def stub():
+    return OpenMeteoStub()
+
+
+@pytest.fixture()
+async def batcher(stub):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(stub)) as http_client:
+        batcher = CurrentWeatherBatcher(
+            OpenMeteoWeatherClient(http_client), window=0.01, max_batch_size=3
+        )
+        yield batcher
+        await batcher.close()
+
+
+async def get_weather(batcher, *latitudes):
+    return await asyncio.gather(
+        *[
+            batcher.get_current_weather(Coordinates(latitude, 30.0))
+            for latitude in latitudes
+        ],
+        return_exceptions=True,
+    )
+
+
+async def test_concurrent_lookups_are_sent_in_one_request(batcher, stub):
+    results = await get_weather(batcher, 10.0, 20.0, 30.0)
+
+    assert len(stub.requests) == 1
+    assert stub.requests[0].url.params["latitude"] == "10.0,20.0,30.0"
+    assert [result.temperature.value for result in results] == [10.0, 20.0, 30.0]
+
+
+async def test_lookups_are_split_by_max_batch_size(batcher, stub):
+    results = await get_weather(batcher, 10.0, 20.0, 30.0, 40.0)
+
+    assert len(stub.requests) == 2
+    assert [result.temperature.value for result in results] == [
+        10.0,
+        20.0,
+        30.0,
+        40.0,
+    ]
+
+
+async def test_lookup_with_broken_data_fails_only_for_its_caller(batcher, stub):
+    stub.broken_latitude = 20.0
+
+    results = await get_weather(batcher, 10.0, 20.0, 30.0)
+
+    assert len(stub.requests) == 1
+    assert results[0].temperature.value == 10.0
+    assert isinstance(results[1], CantGetDataError)
+    assert results[2].temperature.value == 30.0
+
+
+async def test_rejected_batch_is_retried_one_by_one(batcher, stub):
+    stub.invalid_latitude = 20.0
+
+    results = await get_weather(batcher, 10.0, 20.0, 30.0)
+
+    assert len(stub.requests) == 4
+    assert results[0].temperature.value == 10.0
+    assert isinstance(results[1], CantGetDataError)
+    assert results[2].temperature.value == 30.0
+
+
+class BrokenOpenMeteoClient(OpenMeteoWeatherClient):
+    async def get_current_weather_batch(self, coords):  # noqa: U100
+        raise RuntimeError("Unexpected error")
+
+
+async def test_unexpected_error_is_passed_to_all_callers():
+    async with httpx.AsyncClient() as http_client:
+        batcher = CurrentWeatherBatcher(
+            BrokenOpenMeteoClient(http_client), window=0.01, max_batch_size=3
+        )
+
+        results = await asyncio.wait_for(get_weather(batcher, 10.0, 20.0), timeout=1)
+        await batcher.close()
+
+    assert all(isinstance(result, CantGetDataError) for result in results)
+    assert batcher.stats().failed_items == 2
+
+
+async def test_batch_stats_are_recorded(batcher):
+    await get_weather(batcher, 10.0, 20.0, 30.0, 40.0)
+
+    stats = batcher.stats()
+    assert stats.batches == 2
+    assert stats.items == 4
+    assert stats.largest_batch_size == 3
+    assert stats.last_batch_size == 1
+    assert stats.avg_batch_size == 2.0
+
+
+async def test_batching_client_requests_forecast_with_wrapped_client(batcher):
+    upstream = FakeWeatherClient()
+    client = BatchingWeatherClient(upstream, batcher=batcher)
+
+    await client.get_forecast(Coordinates(10.0, 30.0), days=1)
+
+    assert upstream.forecast_calls == [(Coordinates(10.0, 30.0), 1)]
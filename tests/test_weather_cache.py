@@ -0,0 +1,179 @@
+import pytest
+
+from picodi_app.cache import TTLCache
+from picodi_app.data_access.weather_cache import (
+    CachedGeocoderClient,
+    CachedWeatherClient,
+)
+from picodi_app.weather import (
+    Coordinates,
+    force_refresh,
+    mark_data_as_stale,
+    track_data_freshness,
+)
+
+from .fakes import FakeClock, FakeGeocoderClient, FakeWeatherClient
+
+
+@pytest.fixture()
+def upstream():
+    return FakeWeatherClient()
+
+
+@pytest.fixture()
+def cache():
+    return TTLCache(max_size=100)
+
+
+@pytest.fixture()
+def weather_client(upstream, cache):
+    return CachedWeatherClient(
+        upstream,
+        cache=cache,
+        current_ttl=60,
+        forecast_ttl=60,
+        geohash_precision=6,
+    )
+
+
+async def test_current_weather_is_cached(weather_client, upstream):
+    first = await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    second = await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert first == second
+    assert len(upstream.current_weather_calls) == 1
+
+
+async def test_nearby_coordinates_share_cache_entry(weather_client, upstream, cache):
+    await weather_client.get_current_weather(Coordinates(50.45466, 30.5238))
+    await weather_client.get_current_weather(Coordinates(50.4547, 30.5239))
+
+    assert len(upstream.current_weather_calls) == 1
+    assert cache.stats().hits == 1
+
+
+async def test_distant_coordinates_dont_share_cache_entry(weather_client, upstream):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await weather_client.get_current_weather(Coordinates(51.50, 0.12))
+
+    assert len(upstream.current_weather_calls) == 2
+
+
+async def test_forecast_is_cached_by_days(weather_client, upstream):
+    await weather_client.get_forecast(Coordinates(50.45, 30.52), days=1)
+    await weather_client.get_forecast(Coordinates(50.45, 30.52), days=1)
+    forecast = await weather_client.get_forecast(Coordinates(50.45, 30.52), days=2)
+
+    assert len(forecast) == 48
+    assert upstream.forecast_calls == [
+        (Coordinates(50.45, 30.52), 1),
+        (Coordinates(50.45, 30.52), 2),
+    ]
+
+
+async def test_current_weather_and_forecast_dont_share_cache_entry(
+    weather_client, upstream
+):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await weather_client.get_forecast(Coordinates(50.45, 30.52), days=1)
+
+    assert len(upstream.current_weather_calls) == 1
+    assert len(upstream.forecast_calls) == 1
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def geocoder_upstream():
+    return FakeGeocoderClient(known_cities=("Kraków",))
+
+
+@pytest.fixture()
+def geocoder_client(geocoder_upstream, clock):
+    return CachedGeocoderClient(
+        geocoder_upstream,
+        cache=TTLCache(max_size=100, clock=clock),
+        ttl=600,
+        negative_ttl=60,
+    )
+
+
+async def test_geocode_results_are_cached_by_normalized_name(
+    geocoder_client, geocoder_upstream
+):
+    first = await geocoder_client.get_coordinates_by_city("  Kraków ")
+    second = await geocoder_client.get_coordinates_by_city("krakow")
+    third = await geocoder_client.get_coordinates_by_city("KRAKOW")
+
+    assert first == second == third
+    assert len(first) == 1
+    assert geocoder_upstream.calls == ["Kraków"]
+
+
+async def test_empty_geocode_results_are_cached_with_negative_ttl(
+    geocoder_client, geocoder_upstream, clock
+):
+    await geocoder_client.get_coordinates_by_city("Krakuw")
+    clock.now = 59
+    await geocoder_client.get_coordinates_by_city("Krakuw")
+    clock.now = 60
+    result = await geocoder_client.get_coordinates_by_city("Krakuw")
+
+    assert result == []
+    assert geocoder_upstream.calls == ["Krakuw", "Krakuw"]
+
+
+async def test_found_geocode_results_are_cached_with_ttl(
+    geocoder_client, geocoder_upstream, clock
+):
+    await geocoder_client.get_coordinates_by_city("Kraków")
+    clock.now = 599
+    await geocoder_client.get_coordinates_by_city("Kraków")
+    clock.now = 600
+    await geocoder_client.get_coordinates_by_city("Kraków")
+
+    assert geocoder_upstream.calls == ["Kraków", "Kraków"]
+
+
+async def test_blank_geocode_query_dont_reach_upstream(
+    geocoder_client, geocoder_upstream
+):
+    result = await geocoder_client.get_coordinates_by_city("   ")
+
+    assert result == []
+    assert geocoder_upstream.calls == []
+
+
+async def test_stale_values_are_not_cached(cache):
+    class StaleWeatherClient(FakeWeatherClient):
+        async def get_current_weather(self, coords):
+            mark_data_as_stale()
+            return await super().get_current_weather(coords)
+
+    upstream = StaleWeatherClient()
+    weather_client = CachedWeatherClient(
+        upstream, cache=cache, current_ttl=60, forecast_ttl=60, geohash_precision=6
+    )
+
+    with track_data_freshness() as tracker:
+        await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert tracker.stale is True
+    assert len(upstream.current_weather_calls) == 2
+    assert len(cache) == 0
+
+
+async def test_cached_value_is_refreshed_when_refresh_is_forced(
+    weather_client, upstream
+):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    with force_refresh():
+        await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 2
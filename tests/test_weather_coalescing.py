@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from picodi_app.data_access.weather_coalescing import (
+    CoalescingGeocoderClient,
+    CoalescingWeatherClient,
+)
+from picodi_app.utils import SingleFlight
+from picodi_app.weather import CantGetDataError, Coordinates
+
+from .fakes import FakeGeocoderClient, FakeWeatherClient
+
+
+class SlowWeatherClient(FakeWeatherClient):
+    def __init__(self, error: Exception | None = None) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+        self._error = error
+
+    async def get_current_weather(self, coords):
+        result = await super().get_current_weather(coords)
+        await self.release.wait()
+        if self._error:
+            raise self._error
+        return result
+
+
+async def test_concurrent_requests_for_same_coords_make_one_upstream_call():
+    upstream = SlowWeatherClient()
+    client = CoalescingWeatherClient(
+        upstream, single_flight=SingleFlight(), geohash_precision=6
+    )
+
+    tasks = [
+        asyncio.create_task(client.get_current_weather(Coordinates(50.45, 30.52)))
+        for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+    upstream.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(upstream.current_weather_calls) == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_requests_for_nearby_coords_are_coalesced():
+    upstream = SlowWeatherClient()
+    client = CoalescingWeatherClient(
+        upstream, single_flight=SingleFlight(), geohash_precision=6
+    )
+
+    tasks = [
+        asyncio.create_task(client.get_current_weather(Coordinates(50.45466, 30.5238))),
+        asyncio.create_task(client.get_current_weather(Coordinates(50.4547, 30.5239))),
+    ]
+    await asyncio.sleep(0)
+    upstream.release.set()
+    await asyncio.gather(*tasks)
+
+    assert len(upstream.current_weather_calls) == 1
+
+
+async def test_requests_for_different_coords_are_not_coalesced():
+    upstream = FakeWeatherClient()
+    client = CoalescingWeatherClient(
+        upstream, single_flight=SingleFlight(), geohash_precision=6
+    )
+
+    await asyncio.gather(
+        client.get_current_weather(Coordinates(50.45, 30.52)),
+        client.get_current_weather(Coordinates(51.50, 0.12)),
+    )
+
+    assert len(upstream.current_weather_calls) == 2
+
+
+@pytest.mark.parametrize(
+    "error", [CantGetDataError("upstream error"), KeyError("current")]
+)
+async def test_error_reaches_every_waiter_as_cant_get_data_error(error):
+    upstream = SlowWeatherClient(error=error)
+    client = CoalescingWeatherClient(
+        upstream, single_flight=SingleFlight(), geohash_precision=6
+    )
+
+    tasks = [
+        asyncio.create_task(client.get_current_weather(Coordinates(50.45, 30.52)))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    upstream.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, CantGetDataError) for result in results)
+    assert len({id(result) for result in results}) == 3
+
+
+async def test_cancelled_waiter_dont_cancel_shared_call():
+    upstream = SlowWeatherClient()
+    client = CoalescingWeatherClient(
+        upstream, single_flight=SingleFlight(), geohash_precision=6
+    )
+
+    first = asyncio.create_task(client.get_current_weather(Coordinates(50.45, 30.52)))
+    second = asyncio.create_task(client.get_current_weather(Coordinates(50.45, 30.52)))
+    await asyncio.sleep(0)
+    first.cancel()
+    upstream.release.set()
+
+    assert (await second).temperature.value == 50.45
+    assert first.cancelled()
+
+
+async def test_concurrent_geocode_requests_for_same_city_make_one_upstream_call():
+    upstream = FakeGeocoderClient()
+    client = CoalescingGeocoderClient(upstream, single_flight=SingleFlight())
+
+    await asyncio.gather(*[client.get_coordinates_by_city("Kyiv") for _ in range(5)])
+
+    assert upstream.calls == ["Kyiv"]
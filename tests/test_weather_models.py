@@ -1,11 +1,15 @@
+from datetime import datetime
+
 import pytest
 
 from picodi_app.weather import (
     Coordinates,
+    Forecast,
     Speed,
     SpeedUnit,
     Temperature,
     TemperatureUnit,
+    WeatherData,
     WindDirection,
 )
 
@@ -70,3 +74,107 @@ def test_coordinates_serialization_deserialization():
     deserialized = Coordinates.from_string(serialized)
 
     assert coordinates == deserialized
+
+
+@pytest.fixture()
+def forecast():
+    return Forecast(
+        time=[datetime(2024, 1, 1, hour) for hour in range(3)],
+        temperature=[32.0, 50.0, 128.0],
+        temperature_unit=TemperatureUnit.fahrenheit,
+        humidity=[10.0, 20.0, 30.0],
+        precipitation=[False, True, False],
+        wind_speed=[32.0, 0.0, 120.3333],
+        wind_speed_unit=SpeedUnit.km_h,
+        wind_direction=[0.0, 100.0, 350.0],
+    )
+
+
+def test_forecast_columns_conversions_match_scalar_conversions(forecast):
+    temperatures = [
+        Temperature(value, TemperatureUnit.fahrenheit).in_celsius()
+        for value in forecast.temperature
+    ]
+    speeds = [
+        Speed(value, SpeedUnit.km_h).in_meters_per_second()
+        for value in forecast.wind_speed
+    ]
+    directions = [WindDirection.from_degrees(value) for value in [0, 100, 350]]
+
+    assert list(forecast.temperatures_in_celsius()) == temperatures
+    assert list(forecast.wind_speeds_in_meters_per_second()) == speeds
+    assert forecast.wind_directions() == directions
+
+
+def test_forecast_rows_are_available_as_sequence(forecast):
+    time, weather = forecast[1]
+
+    assert len(forecast) == 3
+    assert time == datetime(2024, 1, 1, 1)
+    assert weather == WeatherData(
+        temperature=Temperature(50.0, TemperatureUnit.fahrenheit),
+        humidity=20.0,
+        precipitation=True,
+        wind_speed=Speed(0.0, SpeedUnit.km_h),
+        wind_direction=WindDirection.E,
+    )
+    assert forecast[-1] == forecast[2]
+    assert forecast[1:] == [forecast[1], forecast[2]]
+    assert [time for time, _ in forecast] == forecast.time
+
+
+def test_forecast_index_out_of_range(forecast):
+    with pytest.raises(IndexError):
+        forecast[3]
+
+
+def test_forecast_columns_must_have_same_length():
+    with pytest.raises(ValueError, match="same length"):
+        Forecast(
+            time=[datetime(2024, 1, 1)],
+            temperature=[1.0, 2.0],
+            temperature_unit=TemperatureUnit.celsius,
+            humidity=[1.0],
+            precipitation=[False],
+            wind_speed=[1.0],
+            wind_speed_unit=SpeedUnit.m_s,
+            wind_direction=[1.0],
+        )
+
+
+@pytest.mark.parametrize(
+    "degree,expected",
+    [
+        (22.4, WindDirection.N),
+        (22.6, WindDirection.NE),
+        (337.6, WindDirection.N),
+        (359.9, WindDirection.N),
+        (360, WindDirection.N),
+    ],
+)
+def test_convert_degree_to_wind_direction_between_sectors(degree, expected):
+    result = WindDirection.from_degrees(degree)
+
+    assert result == expected
+
+
+def test_weather_models_are_hashable_and_immutable():
+    weather = WeatherData(
+        temperature=Temperature(32.0, TemperatureUnit.fahrenheit),
+        humidity=20.0,
+        precipitation=True,
+        wind_speed=Speed(36.0, SpeedUnit.km_h),
+        wind_direction=WindDirection.E,
+    )
+    same_weather = WeatherData(
+        temperature=Temperature(32.0, TemperatureUnit.fahrenheit),
+        humidity=20.0,
+        precipitation=True,
+        wind_speed=Speed(36.0, SpeedUnit.km_h),
+        wind_direction=WindDirection.E,
+    )
+
+    assert hash(weather) == hash(same_weather)
+    assert {Coordinates(50.45, 30.52): 1}[Coordinates(50.45, 30.52)] == 1
+    with pytest.raises(AttributeError):
+        weather.humidity = 30.0  # type: ignore[misc]
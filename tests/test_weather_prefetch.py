@@ -0,0 +1,200 @@
+import asyncio
+
+import pytest
+
+from picodi_app.cache import TTLCache
+from picodi_app.data_access.weather_cache import CachedWeatherClient
+from picodi_app.data_access.weather_prefetch import (
+    WarmingUserRepository,
+    WeatherPrefetcher,
+)
+from picodi_app.weather import Coordinates
+
+from .fakes import FakeUserRepository, FakeWeatherClient
+
+KYIV_CELL = Coordinates.from_geohash("u8vxn8")
+LONDON_CELL = Coordinates.from_geohash("u10hfx")
+
+
+@pytest.fixture()
+def upstream():
+    return FakeWeatherClient()
+
+
+@pytest.fixture()
+def cache():
+    return TTLCache(max_size=100)
+
+
+@pytest.fixture()
+def user_repo(mother):
+    return FakeUserRepository(
+        [
+            mother.create_user(
+                email="1@localhost", location=Coordinates(50.451, 30.521)
+            ),
+            mother.create_user(
+                email="2@localhost", location=Coordinates(50.452, 30.522)
+            ),
+            mother.create_user(email="3@localhost", location=Coordinates(51.50, 0.12)),
+        ]
+    )
+
+
+@pytest.fixture()
+async def create_prefetcher(upstream, cache):
+    prefetchers = []
+
+    async def create_client():
+        return CachedWeatherClient(
+            upstream,
+            cache=cache,
+            current_ttl=60,
+            forecast_ttl=60,
+            geohash_precision=6,
+        )
+
+    def create_prefetcher():
+        prefetcher = WeatherPrefetcher(
+            client_factory=create_client,
+            current_interval=3600,
+            forecast_interval=3600,
+            forecast_days=[1, 3],
+            concurrency=2,
+            jitter=0,
+            geohash_precision=6,
+        )
+        prefetchers.append(prefetcher)
+        return prefetcher
+
+    yield create_prefetcher
+    for prefetcher in prefetchers:
+        await prefetcher.close()
+
+
+@pytest.fixture()
+def prefetcher(create_prefetcher):
+    return create_prefetcher()
+
+
+async def wait_for_background_tasks():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def test_current_weather_is_prefetched_once_per_cell(
+    prefetcher, user_repo, upstream, cache
+):
+    prefetcher.start(user_repo)
+    await wait_for_background_tasks()
+
+    assert sorted(upstream.current_weather_calls, key=str) == [
+        KYIV_CELL,
+        LONDON_CELL,
+    ]
+    assert cache.get(("current", "u8vxn8"))
+    assert prefetcher.stats().cells == 2
+
+
+async def test_forecasts_are_prefetched_for_configured_days(
+    prefetcher, user_repo, upstream
+):
+    prefetcher.start(user_repo)
+    await wait_for_background_tasks()
+
+    assert sorted(upstream.forecast_calls, key=str) == [
+        (KYIV_CELL, 1),
+        (KYIV_CELL, 3),
+        (LONDON_CELL, 1),
+        (LONDON_CELL, 3),
+    ]
+
+
+async def test_prefetch_refreshes_already_cached_values(
+    prefetcher, user_repo, upstream
+):
+    prefetcher.start(user_repo)
+    await wait_for_background_tasks()
+
+    await prefetcher.prefetch_current_weather()
+
+    assert len(upstream.current_weather_calls) == 4
+    assert prefetcher.stats().refreshed == 8
+
+
+async def test_new_user_location_is_warmed(prefetcher, user_repo, upstream, mother):
+    prefetcher.start(FakeUserRepository())
+    repo = WarmingUserRepository(user_repo, prefetcher=prefetcher)
+
+    await repo.create_user(mother.create_user(location=Coordinates(40.7128, -74.006)))
+    await wait_for_background_tasks()
+
+    assert upstream.current_weather_calls == [Coordinates.from_geohash("dr5reg")]
+    assert prefetcher.stats().warmed == 1
+
+
+async def test_new_user_location_is_not_warmed_if_prefetcher_is_not_running(
+    prefetcher, user_repo, upstream, mother
+):
+    repo = WarmingUserRepository(user_repo, prefetcher=prefetcher)
+
+    await repo.create_user(mother.create_user(location=Coordinates(40.7128, -74.006)))
+    await wait_for_background_tasks()
+
+    assert upstream.current_weather_calls == []
+    assert await repo.get_user_by_email("test_user@localhost.localhost")
+
+
+async def test_prefetch_is_done_only_by_process_holding_the_lock(
+    create_prefetcher, user_repo, upstream
+):
+    prefetcher = create_prefetcher()
+    other_prefetcher = create_prefetcher()
+    held_locks = set()
+
+    async def lock(name, _ttl):
+        if name in held_locks:
+            return False
+        held_locks.add(name)
+        return True
+
+    prefetcher.start(user_repo, lock=lock)
+    other_prefetcher.start(user_repo, lock=lock)
+    await wait_for_background_tasks()
+
+    assert len(upstream.current_weather_calls) == 2
+    assert prefetcher.stats().runs == 2
+    assert other_prefetcher.stats().runs == 0
+    assert other_prefetcher.stats().skipped == 2
+
+
+async def test_cached_location_of_new_user_is_not_refreshed(
+    prefetcher, user_repo, upstream, mother
+):
+    prefetcher.start(FakeUserRepository())
+    repo = WarmingUserRepository(user_repo, prefetcher=prefetcher)
+    await repo.create_user(mother.create_user(location=Coordinates(40.7128, -74.006)))
+    await wait_for_background_tasks()
+
+    await repo.create_user(
+        mother.create_user(email="2@localhost", location=Coordinates(40.7129, -74.006))
+    )
+    await wait_for_background_tasks()
+
+    assert len(upstream.current_weather_calls) == 1
+    assert prefetcher.stats().warmed == 2
+
+
+async def test_invalid_locations_are_skipped(prefetcher, user_repo, upstream, mother):
+    await user_repo.create_user(
+        mother.create_user(email="4@localhost", location=Coordinates(91.0, 30.52))
+    )
+
+    prefetcher.start(user_repo)
+    await wait_for_background_tasks()
+
+    assert sorted(upstream.current_weather_calls, key=str) == [
+        KYIV_CELL,
+        LONDON_CELL,
+    ]
+    assert prefetcher.stats().cells == 2
@@ -0,0 +1,293 @@
+import os
+
+import pytest
+from redis import asyncio as aioredis
+
+from picodi_app.cache import TTLCache
+from picodi_app.data_access.weather_cache import CachedWeatherClient
+from picodi_app.data_access.weather_redis_cache import RedisCache
+from picodi_app.data_access.weather_shared_cache import (
+    SharedCachedGeocoderClient,
+    SharedCachedWeatherClient,
+    deserialize_cities,
+    deserialize_forecast,
+    deserialize_weather,
+    serialize_cities,
+    serialize_forecast,
+    serialize_weather,
+)
+from picodi_app.weather import (
+    City,
+    Coordinates,
+    Speed,
+    SpeedUnit,
+    Temperature,
+    TemperatureUnit,
+    WeatherData,
+    WindDirection,
+    force_refresh,
+    mark_data_as_stale,
+    track_data_freshness,
+)
+
+from .fakes import (
+    FakeClock,
+    FakeGeocoderClient,
+    FakeWeatherClient,
+    create_forecast,
+)
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture()
+async def redis_client():
+    url = os.getenv("REDIS_CACHE__URL", "redis://localhost:6379/2")
+    async with aioredis.from_url(url) as client:  # type: ignore
+        yield client
+        await client.flushdb()
+
+
+@pytest.fixture()
+def redis_cache(redis_client):
+    return RedisCache(redis_client, key_prefix="test:", compress_min_size=512)
+
+
+@pytest.fixture()
+def upstream():
+    return FakeWeatherClient()
+
+
+@pytest.fixture()
+def weather_client(upstream, redis_cache):
+    return SharedCachedWeatherClient(
+        upstream,
+        cache=redis_cache,
+        current_ttl=60,
+        forecast_ttl=60,
+        geohash_precision=6,
+    )
+
+
+def test_weather_serialization_round_trip():
+    weather = WeatherData(
+        temperature=Temperature(68.5, TemperatureUnit.fahrenheit),
+        humidity=40.0,
+        precipitation=True,
+        wind_speed=Speed(12.0, SpeedUnit.km_h),
+        wind_direction=WindDirection.SW,
+    )
+
+    assert deserialize_weather(serialize_weather(weather)) == weather
+
+
+def test_forecast_serialization_round_trip():
+    forecast = create_forecast(hours=48)
+
+    assert deserialize_forecast(serialize_forecast(forecast)) == forecast
+
+
+def test_cities_serialization_round_trip():
+    cities = [
+        City(
+            name="Kraków",
+            coordinates=Coordinates(50.06, 19.94),
+            description="Poland",
+        )
+    ]
+
+    assert deserialize_cities(serialize_cities(cities)) == cities
+
+
+async def test_current_weather_is_cached(weather_client, upstream, redis_cache):
+    first = await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    second = await weather_client.get_current_weather(Coordinates(50.4502, 30.5198))
+
+    assert first == second
+    assert len(upstream.current_weather_calls) == 1
+    assert redis_cache.stats().hits == 1
+
+
+async def test_forecast_is_cached_by_days(weather_client, upstream):
+    await weather_client.get_forecast(Coordinates(50.45, 30.52), days=1)
+    forecast = await weather_client.get_forecast(Coordinates(50.45, 30.52), days=1)
+    await weather_client.get_forecast(Coordinates(50.45, 30.52), days=2)
+
+    assert forecast == create_forecast(hours=24)
+    assert upstream.forecast_calls == [
+        (Coordinates(50.45, 30.52), 1),
+        (Coordinates(50.45, 30.52), 2),
+    ]
+
+
+async def test_big_payloads_are_compressed(weather_client, redis_cache):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await weather_client.get_forecast(Coordinates(50.45, 30.52), days=7)
+
+    assert redis_cache.stats().compressed == 1
+    assert await weather_client.get_forecast(
+        Coordinates(50.45, 30.52), days=7
+    ) == create_forecast(hours=24 * 7)
+
+
+async def test_entries_expire_with_redis_ttl(upstream, redis_client, redis_cache):
+    client = SharedCachedWeatherClient(
+        upstream,
+        cache=redis_cache,
+        current_ttl=60,
+        forecast_ttl=60,
+        geohash_precision=6,
+    )
+
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert 0 < await redis_client.pttl("test:current:u8vxn2") <= 60_000
+
+
+async def test_lock_is_taken_by_one_process(redis_client, redis_cache):
+    other_process_cache = RedisCache(
+        redis_client, key_prefix="test:", compress_min_size=512
+    )
+
+    assert await redis_cache.acquire_lock("job", ttl=60)
+    assert not await other_process_cache.acquire_lock("job", ttl=60)
+    assert await other_process_cache.acquire_lock("other-job", ttl=60)
+    assert 0 < await redis_client.pttl("test:lock:job") <= 60_000
+
+
+async def test_cache_is_shared_between_processes(redis_cache):
+    # Every worker process has its own in-process cache
+    #   and its own upstream client, but the same Redis
+    upstream = FakeWeatherClient()
+    clients = [
+        CachedWeatherClient(
+            SharedCachedWeatherClient(
+                upstream,
+                cache=redis_cache,
+                current_ttl=60,
+                forecast_ttl=60,
+                geohash_precision=6,
+            ),
+            cache=TTLCache(max_size=100),
+            current_ttl=60,
+            forecast_ttl=60,
+            geohash_precision=6,
+        )
+        for _ in range(2)
+    ]
+
+    for client in clients:
+        await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 1
+
+
+async def test_in_process_cache_doesnt_outlive_shared_cache(upstream, redis_cache):
+    await redis_cache.get_or_fetch(
+        "current:u8vxn2",
+        fetch=lambda: upstream.get_current_weather(Coordinates(50.45, 30.52)),
+        ttl=lambda _: 5,
+        serializer=serialize_weather,
+        deserializer=deserialize_weather,
+    )
+    clock = FakeClock()
+    client = CachedWeatherClient(
+        SharedCachedWeatherClient(
+            upstream,
+            cache=redis_cache,
+            current_ttl=60,
+            forecast_ttl=60,
+            geohash_precision=6,
+        ),
+        cache=TTLCache(max_size=100, clock=clock),
+        current_ttl=60,
+        forecast_ttl=60,
+        geohash_precision=6,
+    )
+
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 6
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    # Second lookup went to Redis, because in-process entry
+    #   expired together with the shared one
+    assert redis_cache.stats().hits == 2
+
+
+async def test_remaining_ttl_is_reported(weather_client):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    with track_data_freshness() as freshness:
+        await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert freshness.ttl is not None
+    assert 0 < freshness.ttl <= 60
+
+
+async def test_stale_data_is_not_cached(redis_cache):
+    class StaleWeatherClient(FakeWeatherClient):
+        async def get_current_weather(self, coords):
+            mark_data_as_stale()
+            return await super().get_current_weather(coords)
+
+    upstream = StaleWeatherClient()
+    client = SharedCachedWeatherClient(
+        upstream,
+        cache=redis_cache,
+        current_ttl=60,
+        forecast_ttl=60,
+        geohash_precision=6,
+    )
+
+    with track_data_freshness() as freshness:
+        await client.get_current_weather(Coordinates(50.45, 30.52))
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert freshness.stale
+    assert len(upstream.current_weather_calls) == 2
+
+
+async def test_cached_value_is_skipped_when_refresh_is_forced(weather_client, upstream):
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    with force_refresh():
+        await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+    await weather_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 2
+
+
+async def test_redis_errors_are_treated_as_cache_misses(upstream):
+    async with aioredis.from_url(
+        "redis://localhost:1/0", socket_connect_timeout=0.1
+    ) as unavailable_redis:
+        redis_cache = RedisCache(
+            unavailable_redis, key_prefix="test:", compress_min_size=512
+        )
+        client = SharedCachedWeatherClient(
+            upstream,
+            cache=redis_cache,
+            current_ttl=60,
+            forecast_ttl=60,
+            geohash_precision=6,
+        )
+
+        result = await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert result.temperature.value == 50.45
+    assert redis_cache.stats().errors == 2
+
+
+async def test_geocoder_results_are_cached(redis_cache):
+    upstream = FakeGeocoderClient()
+    client = SharedCachedGeocoderClient(
+        upstream, cache=redis_cache, ttl=60, negative_ttl=10
+    )
+
+    first = await client.get_coordinates_by_city("Kyiv")
+    second = await client.get_coordinates_by_city(" kyiv ")
+    await client.get_coordinates_by_city("Atlantis")
+    not_found = await client.get_coordinates_by_city("Atlantis")
+
+    assert first == second
+    assert not_found == []
+    assert upstream.calls == ["Kyiv", "Atlantis"]
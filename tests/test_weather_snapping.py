@@ -0,0 +1,16 @@
+from picodi_app.data_access.weather_snapping import SnappingWeatherClient
+from picodi_app.weather import Coordinates
+
+from .fakes import FakeWeatherClient
+
+
+async def test_upstream_is_called_for_cell_centroid():
+    upstream = FakeWeatherClient()
+    client = SnappingWeatherClient(upstream, geohash_precision=6)
+
+    await client.get_current_weather(Coordinates(50.45466, 30.5238))
+    await client.get_forecast(Coordinates(50.4547, 30.5239), days=3)
+
+    cell = Coordinates.from_geohash("u8vxn8")
+    assert upstream.current_weather_calls == [cell]
+    assert upstream.forecast_calls == [(cell, 3)]
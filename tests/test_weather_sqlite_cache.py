@@ -0,0 +1,234 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from picodi_app.cache import TTLCache
+from picodi_app.data_access.weather_cache import CachedWeatherClient
+from picodi_app.data_access.weather_shared_cache import SharedCachedWeatherClient
+from picodi_app.data_access.weather_sqlite_cache import SqliteCache
+from picodi_app.weather import Coordinates, track_data_freshness
+
+from .fakes import FakeClock, FakeWeatherClient, create_forecast
+
+
+@pytest.fixture()
+def clock():
+    clock = FakeClock()
+    clock.now = 1_700_000_000.0
+    return clock
+
+
+@pytest.fixture()
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+@pytest.fixture()
+async def create_cache(cache_path, clock):
+    caches = []
+
+    def create_cache(max_entries=100, compaction_interval=300):
+        cache = SqliteCache(
+            cache_path,
+            max_entries=max_entries,
+            compaction_interval=compaction_interval,
+            compress_min_size=512,
+            clock=clock,
+        )
+        caches.append(cache)
+        return cache
+
+    yield create_cache
+    for cache in caches:
+        await cache.close()
+
+
+@pytest.fixture()
+def upstream():
+    return FakeWeatherClient()
+
+
+def create_client(upstream, cache):
+    return SharedCachedWeatherClient(
+        upstream,
+        cache=cache,
+        current_ttl=60,
+        forecast_ttl=600,
+        geohash_precision=6,
+    )
+
+
+async def test_weather_is_cached(create_cache, upstream):
+    client = create_client(upstream, create_cache())
+
+    first = await client.get_current_weather(Coordinates(50.45, 30.52))
+    second = await client.get_current_weather(Coordinates(50.4502, 30.5198))
+    await client.get_forecast(Coordinates(50.45, 30.52), days=7)
+    forecast = await client.get_forecast(Coordinates(50.45, 30.52), days=7)
+
+    assert first == second
+    assert forecast == create_forecast(hours=24 * 7)
+    assert len(upstream.current_weather_calls) == 1
+    assert len(upstream.forecast_calls) == 1
+
+
+async def test_cache_is_shared_between_processes(create_cache, upstream):
+    # Every worker process opens its own connection to the same file
+    first_process_client = create_client(upstream, create_cache())
+    second_process_client = create_client(upstream, create_cache())
+
+    await first_process_client.get_current_weather(Coordinates(50.45, 30.52))
+    await second_process_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 1
+
+
+async def test_cache_survives_restarts(create_cache, upstream):
+    cache = create_cache()
+    await create_client(upstream, cache).get_current_weather(Coordinates(50.45, 30.52))
+    await cache.close()
+
+    restarted_client = create_client(upstream, create_cache())
+    await restarted_client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 1
+
+
+async def test_database_is_in_wal_mode(create_cache, cache_path):
+    create_cache()
+
+    with sqlite3.connect(cache_path) as conn:
+        (journal_mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+
+    assert journal_mode == "wal"
+
+
+async def test_entries_expire(create_cache, upstream, clock):
+    client = create_client(upstream, create_cache())
+
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 61
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 2
+
+
+async def test_remaining_ttl_is_reported(create_cache, upstream, clock):
+    client = create_client(upstream, create_cache())
+
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 20
+    with track_data_freshness() as freshness:
+        await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert freshness.ttl == 40
+
+
+async def test_in_process_cache_doesnt_outlive_shared_cache(
+    create_cache, upstream, clock
+):
+    cache = create_cache()
+    await create_client(upstream, cache).get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 50
+    client = CachedWeatherClient(
+        create_client(upstream, cache),
+        cache=TTLCache(max_size=100, clock=clock),
+        current_ttl=60,
+        forecast_ttl=600,
+        geohash_precision=6,
+    )
+
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 11
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert len(upstream.current_weather_calls) == 2
+
+
+async def test_expired_entries_are_deleted_on_compaction(create_cache, upstream, clock):
+    cache = create_cache()
+    client = create_client(upstream, cache)
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    await client.get_forecast(Coordinates(50.45, 30.52), days=1)
+
+    clock.now += 61
+    await cache.compact()
+
+    assert cache.stats().expirations == 1
+
+
+async def test_compaction_runs_periodically(create_cache, upstream, clock):
+    cache = create_cache(compaction_interval=100)
+    client = create_client(upstream, cache)
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    clock.now += 101
+    await client.get_current_weather(Coordinates(51.50, 0.12))
+
+    assert cache.stats().expirations == 1
+
+
+async def test_compaction_runs_in_background_without_writes(
+    create_cache, upstream, clock
+):
+    cache = create_cache(compaction_interval=0.01)
+    cache.start()
+    client = create_client(upstream, cache)
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    clock.now += 61
+    await asyncio.sleep(0.1)
+
+    assert cache.stats().expirations == 1
+
+
+async def test_least_recently_used_entries_are_evicted(create_cache, upstream, clock):
+    cache = create_cache(max_entries=2)
+    client = create_client(upstream, cache)
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 1
+    await client.get_current_weather(Coordinates(51.50, 0.12))
+    clock.now += 1
+    # Make the first entry recently used
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    clock.now += 1
+    await client.get_current_weather(Coordinates(48.85, 2.35))
+    evictions = cache.stats().evictions
+
+    await client.get_current_weather(Coordinates(50.45, 30.52))
+    await client.get_current_weather(Coordinates(51.50, 0.12))
+
+    assert evictions == 1
+    assert upstream.current_weather_calls == [
+        Coordinates(50.45, 30.52),
+        Coordinates(51.50, 0.12),
+        Coordinates(48.85, 2.35),
+        Coordinates(51.50, 0.12),
+    ]
+
+
+async def test_lock_is_taken_by_one_process_until_it_expires(create_cache, clock):
+    first_process_cache = create_cache()
+    second_process_cache = create_cache()
+
+    assert await first_process_cache.acquire_lock("job", ttl=60)
+    assert not await second_process_cache.acquire_lock("job", ttl=60)
+    assert await second_process_cache.acquire_lock("other-job", ttl=60)
+    clock.now += 61
+    assert await second_process_cache.acquire_lock("job", ttl=60)
+    assert not await first_process_cache.acquire_lock("job", ttl=60)
+
+
+async def test_database_errors_are_treated_as_cache_misses(
+    create_cache, upstream, cache_path
+):
+    cache = create_cache()
+    client = create_client(upstream, cache)
+    with sqlite3.connect(cache_path) as conn:
+        conn.execute("DROP TABLE weather_cache")
+
+    result = await client.get_current_weather(Coordinates(50.45, 30.52))
+
+    assert result.temperature.value == 50.45
+    assert cache.stats().errors == 2